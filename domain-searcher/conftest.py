@@ -0,0 +1,4 @@
+"""
+pytest root: tests import `core` / `utils` from this folder.
+@developer: Run with `python -m pytest tests` from domain-searcher/.
+"""
@@ -0,0 +1,146 @@
+"""
+Sticky account → proxy affinity.
+@developer: Each account keeps a preferred proxy plus a few fallbacks (AccountProxyAffinity),
+            so its session cookies keep seeing the same IP and typed re-logins stay rare.
+@analyst: LoginEvent records reuse vs. re-login per account; relogin_stats() summarizes it.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, func, select
+
+from core.logger import setup_logger
+from core.models import Account, AccountProxyAffinity, LoginEvent, engine
+
+logger = setup_logger("affinity")
+
+MAX_FALLBACKS = 2  # Proxies kept per account besides the preferred one
+DEMOTE_AFTER = 2  # Consecutive failures before a proxy moves behind the account's other proxies
+# Failed logins that are the proxy's fault; bad credentials say nothing about the proxy
+PROXY_FAILURE_CAUSES = {"network", "banned"}
+
+
+def _bindings(session: Session, account_id: int) -> list[AccountProxyAffinity]:
+    statement = select(AccountProxyAffinity).where(AccountProxyAffinity.account_id == account_id)
+    return sorted(session.exec(statement).all(), key=lambda b: b.rank)
+
+
+def _failing(binding: AccountProxyAffinity) -> bool:
+    return binding.failure_streak >= DEMOTE_AFTER
+
+
+def _rerank(session: Session, bindings: list[AccountProxyAffinity]):
+    for rank, binding in enumerate(bindings):
+        binding.rank = rank
+        session.add(binding)
+
+
+def choose_proxy(account_id: int, proxy_manager, exclude: str | None = None) -> str | None:
+    """
+    The account's best bound proxy that is in the pool and not cooling down.
+    If none qualifies, pick one from the pool and bind it as the next fallback.
+    """
+    if not proxy_manager or not proxy_manager.proxies:
+        return None
+    now_usable = [p for p in proxy_manager.proxies if p != exclude and proxy_manager.is_available(p)]
+    with Session(engine) as session:
+        bindings = _bindings(session, account_id)
+        for binding in sorted(bindings, key=lambda b: (_failing(b), b.rank)):
+            if binding.proxy in now_usable:
+                binding.last_used = datetime.utcnow()
+                session.add(binding)
+                session.commit()
+                if binding.rank:
+                    logger.info("📌 Account %d on fallback proxy #%d", account_id, binding.rank)
+                return binding.proxy
+
+        taken = {b.proxy for b in bindings}
+        proxy = proxy_manager.pick(exclude=exclude)
+        # Prefer a proxy no other binding of this account already failed on
+        if proxy in taken:
+            fresh = [p for p in now_usable if p not in taken]
+            proxy = fresh[0] if fresh else proxy
+        if not proxy:
+            return None
+        if proxy not in taken:
+            if len(bindings) > MAX_FALLBACKS:
+                session.delete(bindings[-1])  # Drop the worst-ranked fallback
+                bindings = bindings[:-1]
+            session.add(AccountProxyAffinity(
+                account_id=account_id, proxy=proxy, rank=len(bindings), last_used=datetime.utcnow(),
+            ))
+            session.commit()
+            logger.info("📌 Bound account %d to proxy %s (rank %d)", account_id, proxy, len(bindings))
+        return proxy
+
+
+def record_proxy_result(account_id: int, proxy: str | None, ok: bool):
+    """
+    Update the binding. A proxy that keeps failing moves to the back;
+    a fallback that works while everything ranked above it is failing becomes preferred.
+    """
+    if not proxy:
+        return
+    with Session(engine) as session:
+        bindings = _bindings(session, account_id)
+        binding = next((b for b in bindings if b.proxy == proxy), None)
+        if not binding:
+            return
+        index = bindings.index(binding)
+        if ok:
+            binding.successes += 1
+            binding.failure_streak = 0
+            if index and all(_failing(b) for b in bindings[:index]):
+                bindings.insert(0, bindings.pop(index))
+                logger.info("📌 Account %d: proxy %s promoted to preferred", account_id, proxy)
+        else:
+            binding.failures += 1
+            binding.failure_streak += 1
+            if _failing(binding) and index + 1 < len(bindings):
+                bindings.append(bindings.pop(index))
+                logger.info("📌 Account %d: proxy %s demoted after %d failures", account_id, proxy, binding.failure_streak)
+        _rerank(session, bindings)
+        session.commit()
+
+
+def record_login(account_id: int | None, kind: str, proxy: str | None = None, cause: str | None = None):
+    """
+    kind: 'reuse' (session cookies still valid), 'relogin' (typed credentials) or 'failed'.
+    A working session confirms the proxy binding; a failed one counts against it only
+    when `cause` is in PROXY_FAILURE_CAUSES (network error, ban), not for bad credentials.
+    """
+    if account_id is None:
+        return
+    try:
+        with Session(engine) as session:
+            session.add(LoginEvent(account_id=account_id, kind=kind, proxy=proxy))
+            session.commit()
+    except Exception as e:
+        logger.error("❌ Failed to record login event: %s", e)
+    if kind != "failed":
+        record_proxy_result(account_id, proxy, ok=True)
+    elif cause in PROXY_FAILURE_CAUSES:
+        record_proxy_result(account_id, proxy, ok=False)
+    else:
+        logger.info("🔑 Login of account %d failed (%s), proxy binding kept", account_id, cause or "unknown")
+
+
+def relogin_stats(days: int = 7) -> list[dict]:
+    """Per account over the last `days`: sessions, typed re-logins, failures and re-login rate."""
+    since = datetime.utcnow() - timedelta(days=days)
+    with Session(engine) as session:
+        statement = (
+            select(Account.username, LoginEvent.kind, func.count(LoginEvent.id))
+            .select_from(LoginEvent)
+            .join(Account, Account.id == LoginEvent.account_id)
+            .where(LoginEvent.at >= since)
+            .group_by(Account.username, LoginEvent.kind)
+        )
+        per_account: dict[str, dict] = {}
+        for username, kind, count in session.exec(statement):
+            row = per_account.setdefault(username, {"username": username, "reuse": 0, "relogin": 0, "failed": 0})
+            row[kind] = count
+    for row in per_account.values():
+        sessions = row["reuse"] + row["relogin"]
+        row["relogin_rate"] = round(row["relogin"] / sessions, 3) if sessions else 0.0
+    return sorted(per_account.values(), key=lambda r: -r["relogin_rate"])
@@ -0,0 +1,233 @@
+"""
+Disk-backed HTTP cache for static assets (JS, CSS, fonts, images).
+@developer: Shared by the local proxy (plain HTTP requests) and the scraper's context.route
+            interception, so repeated pages/searches stop re-downloading assets through paid proxies.
+            Freshness follows Cache-Control (no-store/private/no-cache skip, s-maxage/max-age, Expires,
+            Last-Modified heuristic); size-bounded with LRU eviction (file mtime = last use, kept across restarts).
+            Entries are only served while fresh and never revalidated (no conditional requests), which is
+            why no-cache responses are not stored at all. Hits are read from disk off the event loop.
+@analyst: stats() → hits, misses, hit_ratio, bytes_saved.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from core.background import BackgroundWriter
+from core.logger import setup_logger
+
+logger = setup_logger("asset_cache")
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "cache" / "assets"
+MAX_ENTRY_BYTES = 8 * 1024 * 1024  # Bigger responses are relayed but never stored
+HEURISTIC_MAX_AGE = 86400.0  # Cap for the 10%-of-Last-Modified-age heuristic
+CACHEABLE_STATUS = {200, 203, 301, 404, 410}
+# Response headers never replayed from the cache
+_HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "te", "trailer", "upgrade",
+               "set-cookie", "content-length", "age", "date"}
+
+
+@dataclass
+class CachedAsset:
+    url: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    stored_at: float
+    expires_at: float
+
+    def response_headers(self, now: float) -> dict[str, str]:
+        headers = dict(self.headers)
+        headers["content-length"] = str(len(self.body))
+        headers["age"] = str(int(max(now - self.stored_at, 0)))
+        return headers
+
+
+def _directives(value: str | None) -> dict[str, str]:
+    result = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            result[name.lower()] = arg.strip().strip('"')
+    return result
+
+
+def _http_date(value: str | None) -> float | None:
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: dict[str, str], now: float) -> float | None:
+    """
+    Seconds a response may be served from a shared cache, or None if it must not be stored.
+    no-cache means "revalidate before every use"; without revalidation such responses are skipped.
+    """
+    cc = _directives(headers.get("cache-control"))
+    if {"no-store", "private", "no-cache"} & cc.keys() or "set-cookie" in headers:
+        return None
+    for name in ("s-maxage", "max-age"):
+        if name in cc:
+            try:
+                return float(cc[name]) or None
+            except ValueError:
+                return None
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        served = _http_date(headers.get("date")) or now
+        return (expires - served) if expires > served else None
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None and last_modified < now:
+        return min((now - last_modified) * 0.1, HEURISTIC_MAX_AGE)
+    return None
+
+
+def cache_key(url: str, variant: str = "") -> str:
+    return hashlib.sha256(f"{variant}\n{url}".encode("utf-8")).hexdigest()
+
+
+class AssetCache:
+    def __init__(self, root: Path | str = CACHE_DIR, max_mb: float = 256, clock=time.time):
+        self.root = Path(root)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.clock = clock
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_saved": 0}
+        self._lru: OrderedDict[str, int] = OrderedDict()  # key → size on disk, oldest first
+        self._size = 0
+        self._lock = threading.Lock()
+        self._writer: BackgroundWriter | None = None
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _load_index(self):
+        """Rebuild LRU order from disk: least recently used (oldest mtime) first."""
+        if not self.root.exists():
+            return
+        files = sorted((p for p in self.root.glob("*/*") if p.is_file()), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._lru[path.name] = size
+            self._size += size
+        if files:
+            logger.info("📦 Asset cache: %d entries, %.1f MB", len(files), self._size / 1024 / 1024)
+
+    @staticmethod
+    def request_cacheable(method: str, request_headers: dict[str, str]) -> bool:
+        """Only plain GETs the client is willing to take from a cache."""
+        if method != "GET" or "range" in request_headers or "authorization" in request_headers:
+            return False
+        cc = _directives(request_headers.get("cache-control"))
+        return not ({"no-store", "no-cache"} & cc.keys()) and "no-cache" not in request_headers.get("pragma", "")
+
+    async def lookup(self, url: str, variant: str = "") -> CachedAsset | None:
+        """Fresh cached response for url (and variant), counting a hit or a miss."""
+        key = cache_key(url, variant)
+        with self._lock:
+            known = key in self._lru
+        # Entries go up to MAX_ENTRY_BYTES: read in a thread so a big hit doesn't stall the event loop
+        asset = await asyncio.to_thread(self._read, key) if known else None
+        now = self.clock()
+        if asset is None or asset.expires_at <= now or asset.url != url:
+            self.counters["misses"] += 1
+            return None
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+        self.counters["hits"] += 1
+        self.counters["bytes_saved"] += len(asset.body)
+        return asset
+
+    def _read(self, key: str) -> CachedAsset | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+            asset = CachedAsset(body=body, **meta)
+        except (OSError, ValueError, TypeError):
+            return None
+        try:
+            os.utime(path)  # LRU position survives restarts
+        except OSError:
+            pass
+        return asset
+
+    def store(self, url: str, status: int, headers: dict[str, str], body: bytes, variant: str = "") -> bool:
+        """Queue a response for storage if its status and Cache-Control allow it."""
+        headers = {k.lower(): v for k, v in headers.items()}
+        if status not in CACHEABLE_STATUS or len(body) > MAX_ENTRY_BYTES or len(body) > self.max_bytes // 4:
+            return False
+        vary = {v.strip().lower() for v in headers.get("vary", "").split(",") if v.strip()}
+        if vary - {"accept-encoding"}:
+            return False  # Variants other than the encoding (which the caller puts in `variant`) aren't tracked
+        now = self.clock()
+        lifetime = freshness_lifetime(headers, now)
+        if not lifetime or lifetime <= 0:
+            return False
+        stored = {k: v for k, v in headers.items() if k not in _HOP_BY_HOP}
+        meta = {"url": url, "status": status, "headers": stored, "stored_at": now, "expires_at": now + lifetime}
+        if self._writer is None:
+            self._writer = BackgroundWriter("asset-cache", maxsize=256)
+        return self._writer.submit(self._write, cache_key(url, variant), meta, body)
+
+    # --- Writer thread ---
+
+    def _write(self, key: str, meta: dict, body: bytes):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(meta).encode("utf-8") + b"\n")
+            f.write(body)
+        os.replace(tmp, path)
+        size = path.stat().st_size
+        with self._lock:
+            self._size += size - self._lru.pop(key, 0)
+            self._lru[key] = size
+            self.counters["stores"] += 1
+            evicted = []
+            while self._size > self.max_bytes and self._lru:
+                old_key, old_size = self._lru.popitem(last=False)
+                self._size -= old_size
+                evicted.append(old_key)
+            self.counters["evictions"] += len(evicted)
+        for old_key in evicted:
+            self._path(old_key).unlink(missing_ok=True)
+
+    def flush(self):
+        if self._writer:
+            self._writer.flush()
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        with self._lock:
+            entries, size = len(self._lru), self._size
+        return {
+            **self.counters,
+            "hit_ratio": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "size_mb": round(size / 1024 / 1024, 2),
+            "max_mb": round(self.max_bytes / 1024 / 1024, 1),
+        }
+
+
+_cache: AssetCache | None = None
+
+
+def get_asset_cache() -> AssetCache | None:
+    """Process-wide cache sized by ASSET_CACHE_MB (0 or unset = disabled)."""
+    global _cache
+    max_mb = float(os.getenv("ASSET_CACHE_MB", "0") or 0)
+    if _cache is None and max_mb > 0:
+        _cache = AssetCache(max_mb=max_mb)
+    return _cache
@@ -0,0 +1,58 @@
+"""
+Background writer thread for disk I/O off the event loop.
+@developer: Jobs are plain callables; submit() never blocks the scraper.
+"""
+
+import queue
+import threading
+
+from core.logger import setup_logger
+
+logger = setup_logger("background")
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """Single daemon thread draining a bounded job queue."""
+
+    def __init__(self, name: str, maxsize: int = 256):
+        self.name = name
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args) -> bool:
+        """Queue a job; returns False (and drops it) if the queue is full."""
+        try:
+            self._queue.put_nowait((fn, args))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("⚠️ %s queue full, dropped a job (%d total)", self.name, self.dropped)
+            return False
+
+    def put(self, fn, *args, timeout: float | None = None):
+        """Queue a job that must not be dropped, waiting for room (raises queue.Full on timeout)."""
+        self._queue.put((fn, args), timeout=timeout)
+
+    def flush(self):
+        """Block until every queued job has been processed."""
+        self._queue.join()
+
+    def close(self, timeout: float = 10.0):
+        self._queue.put((_STOP, ()))
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            fn, args = self._queue.get()
+            try:
+                if fn is _STOP:
+                    return
+                fn(*args)
+            except Exception as e:
+                logger.error("❌ %s job failed: %s", self.name, e)
+            finally:
+                self._queue.task_done()
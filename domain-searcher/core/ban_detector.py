@@ -0,0 +1,148 @@
+"""
+Session health monitor for the Playwright scraper.
+@developer: Classifies bans, 429s, challenges and logouts from response events
+            (status, headers, redirects) and small DOM probes as they happen.
+            In-flight waits race against the verdict, so a dead session aborts immediately.
+"""
+
+import asyncio
+from urllib.parse import urlparse
+
+from core.logger import setup_logger
+
+logger = setup_logger("ban_detector")
+
+BANNED = "banned"
+RATE_LIMITED = "rate_limited"
+CHALLENGE = "challenge"
+LOGGED_OUT = "logged_out"
+
+BAN_PHRASES = ["ip address is blocked", "too many requests", "access denied", "robot"]
+
+# Evaluated in the page: a few selectors and short strings instead of the whole document
+_DOM_PROBE = """() => ({
+    title: document.title || "",
+    h1: ((document.querySelector("h1") || {}).textContent || "").slice(0, 200),
+    hasListing: !!document.querySelector("table#listing"),
+    hasLogout: !!document.querySelector("a[href*='logout']"),
+    hasPassword: !!document.querySelector("input[type='password']"),
+    hasCaptcha: !!document.querySelector(
+        "#challenge-form, .g-recaptcha, .h-captcha, iframe[src*='captcha'], iframe[src*='challenges.cloudflare.com']"
+    ),
+})"""
+
+
+class SessionBlocked(Exception):
+    """Raised inside the scraper as soon as the session is flagged."""
+
+    def __init__(self, verdict: str, reason: str = ""):
+        super().__init__(f"{verdict}: {reason}" if reason else verdict)
+        self.verdict = verdict
+        self.reason = reason
+
+
+def classify_response(status: int, headers: dict, url: str) -> tuple[str, str] | None:
+    """(verdict, reason) for a document response, or None if it looks healthy."""
+    if status == 429:
+        return RATE_LIMITED, f"HTTP 429 {url}"
+    if status in (403, 503):
+        if headers.get("cf-mitigated") == "challenge" or ("cf-ray" in headers and status == 503):
+            return CHALLENGE, f"HTTP {status} Cloudflare challenge"
+        if status == 403:
+            return BANNED, f"HTTP 403 {url}"
+    if 300 <= status < 400 and "/login" in headers.get("location", ""):
+        return LOGGED_OUT, f"redirect to {headers['location']}"
+    return None
+
+
+def classify_probe(probe: dict) -> tuple[str, str] | None:
+    """(verdict, reason) from the DOM probe result."""
+    if probe.get("hasCaptcha"):
+        return CHALLENGE, "captcha on page"
+    text = f"{probe.get('title', '')} {probe.get('h1', '')}".lower()
+    for phrase in BAN_PHRASES:
+        if phrase in text:
+            return BANNED, f"page says '{phrase}'"
+    if probe.get("hasPassword") and not probe.get("hasLogout") and not probe.get("hasListing"):
+        return LOGGED_OUT, "login form instead of listing"
+    return None
+
+
+class SessionHealthMonitor:
+    """
+    Watches a BrowserContext's responses for one site.
+    Logout redirects only count while armed (i.e. while scraping, not during login).
+    """
+
+    def __init__(self, base_url: str):
+        self.host = urlparse(base_url).hostname
+        self.armed = False
+        self.verdict: str | None = None
+        self.reason = ""
+        self._blocked = asyncio.Event()
+
+    def attach(self, context):
+        context.on("response", self._on_response)
+
+    def reset(self):
+        self.verdict = None
+        self.reason = ""
+        self._blocked = asyncio.Event()
+
+    def flag(self, verdict: str, reason: str):
+        if self.verdict:
+            return
+        if verdict == LOGGED_OUT and not self.armed:
+            return
+        self.verdict, self.reason = verdict, reason
+        logger.warning("🚨 Session flagged: %s (%s)", verdict, reason)
+        self._blocked.set()
+
+    def _on_response(self, response):
+        try:
+            if response.request.resource_type != "document":
+                return
+            if urlparse(response.url).hostname != self.host:
+                return
+            result = classify_response(response.status, response.headers, response.url)
+            if result:
+                self.flag(*result)
+        except Exception as e:
+            logger.debug("⚠️ Response classification failed: %s", e)
+
+    async def probe(self, page):
+        """Cheap DOM check of the current page; raises SessionBlocked if flagged."""
+        self.raise_if_blocked()
+        try:
+            result = classify_probe(await page.evaluate(_DOM_PROBE))
+        except Exception as e:
+            logger.debug("⚠️ DOM probe failed: %s", e)
+            result = None
+        if result:
+            self.flag(*result)
+        self.raise_if_blocked()
+
+    def raise_if_blocked(self):
+        if self.verdict:
+            raise SessionBlocked(self.verdict, self.reason)
+
+    async def guard(self, awaitable):
+        """Await `awaitable`, aborting with SessionBlocked as soon as the session is flagged."""
+        self.raise_if_blocked()
+        task = asyncio.ensure_future(awaitable)
+        blocked = asyncio.ensure_future(self._blocked.wait())
+        try:
+            await asyncio.wait({task, blocked}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            blocked.cancel()
+        if task.done():
+            return task.result()
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+        self.raise_if_blocked()
@@ -0,0 +1,61 @@
+"""
+Injectable clocks for stealth timing.
+@developer: All human-imitation delays go through clock.sleep(); tests and benchmarks
+            swap in VirtualClock to run on simulated time while keeping the delay schedule.
+"""
+
+import asyncio
+import re
+import time
+from collections import defaultdict
+
+
+class RealClock:
+    """Wall-clock time. Optionally records the delay schedule (for overhead measurements)."""
+
+    virtual = False
+
+    def __init__(self, record: bool = False):
+        self.record_schedule = record
+        self.schedule: list[tuple[float, float, str]] = []  # (at, seconds, label)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def record(self, seconds: float, label: str = ""):
+        """Log a delay without sleeping (e.g. typing delays handled by the browser)."""
+        if self.record_schedule:
+            self.schedule.append((self.monotonic(), seconds, label))
+
+    async def sleep(self, seconds: float, label: str = ""):
+        self.record(seconds, label)
+        await asyncio.sleep(seconds)
+
+    def total(self) -> float:
+        """Seconds of recorded stealth delay."""
+        return sum(seconds for _, seconds, _ in self.schedule)
+
+    def by_label(self) -> dict[str, float]:
+        """Recorded delay grouped by label (page numbers stripped)."""
+        totals = defaultdict(float)
+        for _, seconds, label in self.schedule:
+            totals[re.sub(r"\d+", "N", label)] += seconds
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+class VirtualClock(RealClock):
+    """Simulated time: sleep() advances the clock instantly and only yields to the event loop."""
+
+    virtual = True
+
+    def __init__(self, start: float = 0.0):
+        super().__init__(record=True)
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float, label: str = ""):
+        self.record(seconds, label)
+        self.now += max(0.0, seconds)
+        await asyncio.sleep(0)
@@ -0,0 +1,255 @@
+"""
+Multi-account sharded scraping for expireddomains.net.
+@developer: Splits a page range across healthy accounts, runs them concurrently, merges the streams.
+@analyst: Pages of a banned shard are handed back to the remaining accounts.
+"""
+
+import asyncio
+from typing import AsyncGenerator, List
+
+from sqlmodel import Session, select
+
+from core.logger import setup_logger
+from core.models import Account, engine
+from core.proxy_manager import ProxyManager
+from core.scraper import DomainScraper
+
+logger = setup_logger("coordinator")
+
+_SHARD_DONE = object()  # Marker put on the output queue when a shard worker exits
+RSS_SAMPLE_INTERVAL = 2.0  # Seconds between combined browser RSS samples across shards
+
+
+def split_pages(start_page: int, max_pages: int, shards: int) -> List[range]:
+    """Split [start_page, start_page + max_pages) into up to `shards` contiguous chunks."""
+    shards = max(1, min(shards, max_pages))
+    size, extra = divmod(max_pages, shards)
+    chunks = []
+    page = start_page
+    for i in range(shards):
+        length = size + (1 if i < extra else 0)
+        if length:
+            chunks.append(range(page, page + length))
+        page += length
+    return chunks
+
+
+def healthy_accounts(limit: int, preferred: Account | None = None) -> List[Account]:
+    """Active accounts with a stored session, least recently used first."""
+    accounts = [preferred] if preferred else []
+    with Session(engine) as session:
+        statement = (
+            select(Account)
+            .where(Account.status == "active", Account.storage_state_json != "{}")
+            .order_by(Account.last_used)
+        )
+        for acc in session.exec(statement):
+            if len(accounts) >= limit:
+                break
+            if preferred and acc.id == preferred.id:
+                continue
+            accounts.append(acc)
+    return accounts
+
+
+class ShardedScraper:
+    """
+    Coordinator with the DomainScraper interface (start/login/fetch_candidates/close).
+    Each account gets its own scraper (browser context + proxy); candidates are deduped by name.
+    """
+
+    def __init__(
+        self,
+        accounts: List[Account] | None = None,
+        shards: int = 3,
+        scraper_cls: type = DomainScraper,
+        proxy_manager: ProxyManager | None = None,
+        headless: bool = True,
+    ):
+        self.accounts = accounts or []
+        self.shards = shards
+        self.scraper_cls = scraper_cls
+        self.proxy_manager = proxy_manager
+        self.headless = headless
+        self.on_stealth_action = None  # Relayed to every shard scraper
+        self.site_filters: dict | None = None  # Relayed to every shard scraper
+        self.seen_index = None  # Domains stored by earlier tasks; shards' own finds are deduped by name
+        self.max_seen_pages = 0
+        self.page_archive = None
+        self.task_id: int | None = None
+        # Recycles summed over shards; browser RSS is the peak of all running shards sampled together
+        self.resource_stats = {"recycles": 0, "peak_js_heap_mb": 0.0, "peak_browser_rss_mb": 0.0}
+        self._scrapers: List[DomainScraper] = []
+        self._shard_sorted: dict[int, bool] = {}  # Shard → its listing is sorted by BL (once it yields)
+        self._page_cutoff: float = float("inf")  # Pages past this one are no longer needed (ranked mode)
+
+    @property
+    def sorted_by_bl(self) -> bool:
+        """True while every shard that has yielded so far pages a listing sorted by BL descending."""
+        return bool(self._shard_sorted) and all(self._shard_sorted.values())
+
+    def cut_pages_after(self, page: int):
+        """
+        Ranked mode on a BL-sorted listing: rows past `page` cannot enter the top K.
+        Shards drop later page ranges and stop paging past it; earlier ranges still finish.
+        """
+        if page < self._page_cutoff:
+            logger.info("✂️ Dropping pages after %d across shards", page)
+            self._page_cutoff = page
+
+    async def start(self):
+        """Resolve the account pool. Browsers are started lazily by the shard workers."""
+        if not self.accounts:
+            self.accounts = healthy_accounts(self.shards)
+        logger.info("🧩 Sharding across %d accounts", len(self.accounts))
+        return bool(self.accounts)
+
+    async def login(self) -> bool:
+        return bool(self.accounts)
+
+    async def check_ban_and_rotate(self) -> bool:
+        return False
+
+    async def fetch_candidates(
+        self,
+        target_count: int = 10,
+        start_page: int = 2,
+        max_pages: int = 2,
+        resume: bool = False,
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Run all shards concurrently and yield unique candidates as they arrive.
+        resume is rejected: cursors are per account, shards walk page ranges split from start_page.
+        """
+        if resume:
+            raise ValueError("resume is not supported in sharded mode")
+        if not self.accounts:
+            logger.warning("⚠️ No healthy accounts to shard across.")
+            return
+
+        self._page_cutoff = float("inf")
+        self._shard_sorted.clear()
+        work: asyncio.Queue = asyncio.Queue()
+        for chunk in split_pages(start_page, max_pages, len(self.accounts)):
+            work.put_nowait(chunk)
+        out: asyncio.Queue = asyncio.Queue()
+
+        workers = [
+            asyncio.create_task(self._run_shard(account, work, out, target_count))
+            for account in self.accounts
+        ]
+        # Once every page range is processed, idle workers are stopped
+        all_done = asyncio.create_task(work.join())
+        all_done.add_done_callback(lambda _: [w.cancel() for w in workers])
+        sampler = asyncio.create_task(self._sample_rss())
+
+        seen = set()
+        alive = len(workers)
+        try:
+            while alive and len(seen) < target_count:
+                item = await out.get()
+                if item is _SHARD_DONE:
+                    alive -= 1
+                    continue
+                if item["name"] in seen or item["source_page"] > self._page_cutoff:
+                    continue
+                seen.add(item["name"])
+                yield item
+        finally:
+            all_done.cancel()
+            sampler.cancel()
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            logger.info("🏁 Sharded scraping complete: %d unique candidates.", len(seen))
+
+    async def _run_shard(self, account: Account, work: asyncio.Queue, out: asyncio.Queue, target_count: int):
+        """Worker: take page ranges off the queue until done, banned or cancelled."""
+        scraper = self.scraper_cls(headless=self.headless)
+        scraper.current_account = account
+        scraper.on_stealth_action = self.on_stealth_action
+        if self.site_filters is not None:
+            scraper.site_filters = self.site_filters
+        scraper.seen_index = self.seen_index
+        scraper.max_seen_pages = self.max_seen_pages
+        scraper.page_archive = self.page_archive
+        scraper.task_id = self.task_id
+        if self.proxy_manager:
+            # The shard picks the account's sticky proxy from this pool in start()
+            scraper.proxy_manager = self.proxy_manager
+        self._scrapers.append(scraper)
+
+        try:
+            await scraper.start()
+            if not await scraper.login():
+                logger.warning("🔑 Shard %s could not log in, leaving its pages to others", account.username)
+                return
+
+            while True:
+                chunk = await work.get()
+                if chunk.start > self._page_cutoff:
+                    work.task_done()
+                    continue
+                scraper.last_page_done = None
+                try:
+                    logger.info("🧩 %s takes pages %d-%d", account.username, chunk.start, chunk.stop - 1)
+                    stream = scraper.fetch_candidates(target_count, chunk.start, len(chunk))
+                    try:
+                        async for candidate in stream:
+                            if candidate["source_page"] > self._page_cutoff:
+                                break
+                            self._shard_sorted[id(scraper)] = scraper.sorted_by_bl
+                            await out.put(candidate)
+                    finally:
+                        await stream.aclose()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("❌ Shard %s failed on pages %d-%d: %s", account.username, chunk.start, chunk.stop - 1, e)
+
+                try:
+                    banned = await scraper.check_ban_and_rotate()
+                    if banned:
+                        done = scraper.last_page_done
+                        remaining = range(done + 1, chunk.stop) if done is not None else chunk
+                        if remaining:
+                            logger.warning("🚨 %s banned, handing back pages %d-%d", account.username, remaining.start, remaining.stop - 1)
+                            work.put_nowait(remaining)
+                        return
+                finally:
+                    work.task_done()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error("❌ Shard %s crashed: %s", account.username, e)
+        finally:
+            await self._close_scraper(scraper)
+            out.put_nowait(_SHARD_DONE)
+
+    async def _sample_rss(self):
+        while True:
+            self._record_rss()
+            await asyncio.sleep(RSS_SAMPLE_INTERVAL)
+
+    def _record_rss(self):
+        """One sample of the summed browser RSS of every running shard."""
+        total = sum(scraper.browser_rss_mb() for scraper in self._scrapers)
+        stats = self.resource_stats
+        stats["peak_browser_rss_mb"] = max(stats["peak_browser_rss_mb"], round(total, 1))
+
+    async def _close_scraper(self, scraper: DomainScraper):
+        if scraper in self._scrapers:
+            self._record_rss()
+            self._scrapers.remove(scraper)
+            try:
+                await scraper.close()
+            except Exception as e:
+                logger.debug("⚠️ Shard close failed: %s", e)
+            shard_stats = scraper.resource_stats
+            self.resource_stats["recycles"] += shard_stats["recycles"]
+            self.resource_stats["peak_js_heap_mb"] = max(self.resource_stats["peak_js_heap_mb"], shard_stats["peak_js_heap_mb"])
+
+    async def close(self):
+        """Close any shard scrapers still running."""
+        for scraper in list(self._scrapers):
+            await self._close_scraper(scraper)
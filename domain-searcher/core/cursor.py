@@ -0,0 +1,77 @@
+"""
+Resumable scraping cursor, persisted per account and filter signature.
+@developer: Lets a new task continue through fresh pages instead of redoing home/filter/sort navigation.
+            Reset once a run reaches the end of the listing; ignored after CURSOR_TTL_HOURS
+            (the listing has changed by then, so old page numbers point at different rows).
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, select
+
+from core.logger import setup_logger
+from core.models import ScrapeCursor, engine
+
+logger = setup_logger("cursor")
+
+CURSOR_TTL_HOURS = float(os.getenv("CURSOR_TTL_HOURS", "24"))
+
+
+def filter_signature(filters: dict, sort: str = "bl") -> str:
+    """Stable short hash of the pushed filters and the sort column."""
+    payload = json.dumps({"filters": filters, "sort": sort}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_cursor(account_id: int, signature: str, ttl_hours: float = CURSOR_TTL_HOURS) -> ScrapeCursor | None:
+    """Stored cursor for this account + filters, unless it is older than ttl_hours."""
+    with Session(engine) as session:
+        statement = select(ScrapeCursor).where(
+            ScrapeCursor.account_id == account_id,
+            ScrapeCursor.filter_signature == signature,
+        )
+        cursor = session.exec(statement).first()
+    if cursor and ttl_hours > 0 and cursor.updated_at < datetime.utcnow() - timedelta(hours=ttl_hours):
+        logger.info("⌛ Cursor of account %d is older than %.0fh, starting over", account_id, ttl_hours)
+        return None
+    return cursor
+
+
+def save_cursor(account_id: int, signature: str, next_page: int, template: dict | None, sorted_by_bl: bool):
+    """Upsert the cursor after a page has been parsed."""
+    try:
+        with Session(engine) as session:
+            statement = select(ScrapeCursor).where(
+                ScrapeCursor.account_id == account_id,
+                ScrapeCursor.filter_signature == signature,
+            )
+            cursor = session.exec(statement).first() or ScrapeCursor(account_id=account_id, filter_signature=signature)
+            cursor.next_page = next_page
+            cursor.sorted_by_bl = sorted_by_bl
+            if template:
+                cursor.listing_template = template
+            cursor.updated_at = datetime.utcnow()
+            session.add(cursor)
+            session.commit()
+    except Exception as e:
+        logger.error("❌ Failed to save cursor: %s", e)
+
+
+def reset_cursor(account_id: int, signature: str):
+    """Forget the cursor: the run reached the end of the listing."""
+    try:
+        with Session(engine) as session:
+            statement = select(ScrapeCursor).where(
+                ScrapeCursor.account_id == account_id,
+                ScrapeCursor.filter_signature == signature,
+            )
+            cursor = session.exec(statement).first()
+            if cursor:
+                session.delete(cursor)
+                session.commit()
+                logger.info("⏮️ Cursor of account %d reset (end of listing)", account_id)
+    except Exception as e:
+        logger.error("❌ Failed to reset cursor: %s", e)
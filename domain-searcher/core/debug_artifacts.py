@@ -0,0 +1,137 @@
+"""
+Sampled debug artifacts (screenshot + HTML) for scraper runs.
+@developer: Errors are always captured, everything else at DEBUG_SAMPLE_RATE.
+            Files are written by a background thread into debug/<task_id>/ with an index.jsonl;
+            the oldest files are rotated out once the folder passes DEBUG_QUOTA_MB.
+"""
+
+import gzip
+import json
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+
+from core.background import BackgroundWriter
+from core.logger import setup_logger
+
+logger = setup_logger("debug_artifacts")
+
+DEBUG_DIR = Path(__file__).resolve().parent.parent / "debug"
+INDEX_FILE = "index.jsonl"
+
+
+class DebugArtifacts:
+    def __init__(self, root: Path | str = DEBUG_DIR, sample_rate: float = 0.0, quota_mb: float = 200, rng=None):
+        self.root = Path(root)
+        self.sample_rate = sample_rate
+        self.quota_bytes = int(quota_mb * 1024 * 1024)
+        self.rng = rng or random.Random()
+        self._writer: BackgroundWriter | None = None
+        self._used_bytes: int | None = None  # Computed lazily on the writer thread
+
+    def should_capture(self, error: bool = False) -> bool:
+        return error or (self.sample_rate > 0 and self.rng.random() < self.sample_rate)
+
+    async def capture(self, page, task_id: int | None, label: str, error: bool = False, html: str | None = None) -> bool:
+        """Grab a screenshot (+ HTML) if sampled; the disk write happens off the event loop."""
+        if not self.should_capture(error):
+            return False
+        try:
+            screenshot = await page.screenshot(type="jpeg", quality=60)
+            if html is None:
+                html = await page.content()
+            url = page.url
+        except Exception as e:
+            logger.debug("⚠️ Debug capture failed (%s): %s", label, e)
+            return False
+        if self._writer is None:
+            self._writer = BackgroundWriter("debug-artifacts", maxsize=32)
+        return self._writer.submit(self._write, task_id, label, error, url, screenshot, html)
+
+    # --- Writer thread ---
+
+    def _write(self, task_id, label, error, url, screenshot: bytes, html: str):
+        task_dir = self.root / (str(task_id) if task_id is not None else "adhoc")
+        task_dir.mkdir(parents=True, exist_ok=True)
+        # Milliseconds + random suffix: bursts (bans, several shards) reuse labels within a second
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}"
+        stem = f"{stamp}_{uuid.uuid4().hex[:6]}_{label}"
+        shot_path = task_dir / f"{stem}.jpg"
+        html_path = task_dir / f"{stem}.html.gz"
+        shot_path.write_bytes(screenshot)
+        html_path.write_bytes(gzip.compress(html.encode("utf-8"), compresslevel=6))
+        entry = {
+            "at": now, "task_id": task_id, "label": label, "error": error, "url": url,
+            "screenshot": shot_path.name, "html": html_path.name,
+        }
+        with open(task_dir / INDEX_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        logger.info("🧾 Debug artifact saved: %s", shot_path)
+
+        if self._used_bytes is None:
+            self._used_bytes = self._disk_usage()
+        else:
+            self._used_bytes += shot_path.stat().st_size + html_path.stat().st_size
+        if self._used_bytes > self.quota_bytes:
+            self._rotate()
+
+    def _artifact_files(self) -> list[Path]:
+        return [p for p in self.root.rglob("*") if p.is_file() and p.name != INDEX_FILE]
+
+    def _disk_usage(self) -> int:
+        return sum(p.stat().st_size for p in self._artifact_files())
+
+    def _rotate(self):
+        """Delete the oldest artifacts until usage is back under 90% of the quota."""
+        target = int(self.quota_bytes * 0.9)
+        removed = 0
+        for path in sorted(self._artifact_files(), key=lambda p: p.stat().st_mtime):
+            if self._used_bytes <= target:
+                break
+            size = path.stat().st_size
+            path.unlink(missing_ok=True)
+            self._used_bytes -= size
+            removed += 1
+        for task_dir in self.root.iterdir():
+            if task_dir.is_dir() and not any(p.name != INDEX_FILE for p in task_dir.iterdir()):
+                (task_dir / INDEX_FILE).unlink(missing_ok=True)
+                task_dir.rmdir()
+        logger.info("🧹 Debug quota reached: removed %d old artifacts", removed)
+
+    # --- Reading ---
+
+    def entries(self, task_id: int | None = None) -> list[dict]:
+        """Index rows for a task (or all tasks) whose files are still on disk."""
+        task_dirs = [self.root / str(task_id)] if task_id is not None else sorted(self.root.glob("*"))
+        rows = []
+        for task_dir in task_dirs:
+            index = task_dir / INDEX_FILE
+            if not index.exists():
+                continue
+            for line in index.read_text(encoding="utf-8").splitlines():
+                entry = json.loads(line)
+                if (task_dir / entry["screenshot"]).exists():
+                    entry["dir"] = str(task_dir)
+                    rows.append(entry)
+        return rows
+
+    def flush(self):
+        if self._writer:
+            self._writer.flush()
+
+
+_artifacts: DebugArtifacts | None = None
+
+
+def get_debug_artifacts() -> DebugArtifacts:
+    """Process-wide instance configured from DEBUG_SAMPLE_RATE / DEBUG_QUOTA_MB."""
+    global _artifacts
+    if _artifacts is None:
+        _artifacts = DebugArtifacts(
+            sample_rate=float(os.getenv("DEBUG_SAMPLE_RATE", "0") or 0),
+            quota_mb=float(os.getenv("DEBUG_QUOTA_MB", "200") or 200),
+        )
+    return _artifacts
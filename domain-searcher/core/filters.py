@@ -5,6 +5,7 @@ Domain name filtering engine.
 """
 
 import re
+from datetime import datetime
 from typing import List
 
 # --- Stop-word categories (expandable) ---
@@ -87,3 +88,78 @@ def filter_candidates(domains: List[str], extra_stop_words: List[str] | None = N
         d for d in domains
         if is_valid_domain_format(d) and is_clean_domain(d, extra_stop_words)
     ]
+
+
+# --- Server-side pushdown (expireddomains.net filter form) ---
+# Candidate input names per constraint; the first one present on the form is used.
+SITE_FILTER_FIELDS = {
+    "min_bl": ["fbl", "fblmin", "f_bl_min"],
+    "min_length": ["fminlength", "flength_min"],
+    "max_length": ["fmaxlength", "flength_max"],
+    "exclude": ["fnotcontains", "fdomainnot", "fexclude"],
+}
+AGE_FILTER_FIELD = "fwhoisage"
+MAX_PUSHDOWN_WORDS = 100
+
+
+def pushdown_exclude_words(words: List[str] | None = None, limit: int = MAX_PUSHDOWN_WORDS) -> List[str]:
+    """
+    Normalize stop-words for the site's 'does not contain' field.
+    Only ASCII keywords can match a .com name; spam prefixes lose their dash.
+    """
+    result = []
+    for word in words if words is not None else ALL_STOP_WORDS:
+        word = word.strip("-").lower()
+        if word and word.isascii() and word not in result:
+            result.append(word)
+        if len(result) >= limit:
+            break
+    return result
+
+
+def build_site_filters(
+    min_bl: int = 0,
+    min_age_years: int = 0,
+    min_length: int | None = None,
+    max_length: int | None = None,
+    exclude_words: List[str] | None = None,
+) -> dict:
+    """
+    Map our constraints onto the site's filter form.
+
+    Returns:
+        Dict of constraint -> value; unset constraints are dropped.
+        "exclude" is a space-separated keyword list (all stop-words by default).
+    """
+    filters = {
+        "min_bl": min_bl or None,
+        "min_age": min_age_years or None,
+        "min_length": min_length,
+        "max_length": max_length,
+        "exclude": " ".join(pushdown_exclude_words(exclude_words)) or None,
+    }
+    return {k: v for k, v in filters.items() if v is not None}
+
+
+def site_filter_params(filters: dict, current_year: int | None = None) -> List[tuple]:
+    """Query parameters equivalent to submitting the filter form (primary input names)."""
+    params = []
+    for key, value in filters.items():
+        if key == "min_age":
+            year = current_year or datetime.utcnow().year
+            params.append((AGE_FILTER_FIELD, str(year - value)))
+        elif key in SITE_FILTER_FIELDS:
+            params.append((SITE_FILTER_FIELDS[key][0], str(value)))
+    return params
+
+
+def passes_site_filters(candidate: dict, filters: dict) -> bool:
+    """Local double-check of the pushed constraints (the site may ignore some fields)."""
+    label = candidate["name"].split(".")[0]
+    if candidate.get("bl", 0) < filters.get("min_bl", 0):
+        return False
+    if "min_length" in filters and len(label) < filters["min_length"]:
+        return False
+    if "max_length" in filters and len(label) > filters["max_length"]:
+        return False
+    return True
@@ -0,0 +1,239 @@
+"""
+HTTP-only scraping backend for expireddomains.net.
+@developer: Reuses a browser session (storage_state cookies + matching UA) over a pooled httpx client.
+@analyst: Falls back to the Playwright DomainScraper as soon as a challenge/ban/logout page shows up.
+"""
+
+import json
+from typing import AsyncGenerator
+from urllib.parse import urlencode
+
+import httpx
+
+from core.filters import site_filter_params
+from core.logger import setup_logger
+from core.pagination import build_page_url, capture_listing_template, sorted_by_bl_desc
+from core.parser import parse_listing_html
+from core.scraper import BASE_URL, DELETED_COM_URL, USER_AGENT, DomainScraper
+
+logger = setup_logger("http_scraper")
+
+# Default listing query when no template was captured by a browser run: sort by BL, descending
+DEFAULT_LISTING_QUERY = [("o", "bl"), ("r", "d")]
+
+CHALLENGE_STATUSES = {403, 429, 503}
+CHALLENGE_MARKERS = [
+    "cf-chl", "challenge-platform", "cf-turnstile", "just a moment",
+    "ip address is blocked", "too many requests", "access denied",
+]
+
+
+class ChallengeDetected(Exception):
+    """Response looks like a bot challenge, ban or logout: only a real browser can continue."""
+
+
+def cookies_from_storage_state(state: dict | None) -> httpx.Cookies:
+    """Convert a Playwright storage_state dict into an httpx cookie jar."""
+    jar = httpx.Cookies()
+    for cookie in (state or {}).get("cookies", []):
+        jar.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/"),
+        )
+    return jar
+
+
+def detect_challenge(response: httpx.Response) -> str | None:
+    """Return a short reason if the response is a challenge/ban/logout page, else None."""
+    if response.status_code in CHALLENGE_STATUSES:
+        return f"HTTP {response.status_code}"
+    if response.headers.get("cf-mitigated"):
+        return "cf-mitigated"
+    if "/login" in response.url.path:
+        return "redirected to login"
+
+    head = response.text[:8192].lower()
+    for marker in CHALLENGE_MARKERS:
+        if marker in head:
+            return marker
+    return None
+
+
+class HttpScraper(DomainScraper):
+    """
+    Same interface as DomainScraper, but listing pages are fetched over plain HTTP.
+    The browser is only launched if the site starts challenging us.
+    """
+
+    def __init__(self, username: str = None, password: str = None, headless: bool = True):
+        super().__init__(username=username, password=password, headless=headless)
+        self._client: httpx.AsyncClient | None = None
+        self._browser_mode = False
+
+    async def start(self):
+        """Build a pooled HTTP client carrying the session cookies. No Chromium yet."""
+        await self._prepare_identity()
+
+        state = self._resolve_storage_state()
+        if isinstance(state, str):
+            with open(state, "r", encoding="utf-8") as f:
+                state = json.load(f)
+
+        self._client = httpx.AsyncClient(
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9",
+            },
+            cookies=cookies_from_storage_state(state),
+            proxy=self._proxy_url(),
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+            timeout=20.0,
+            follow_redirects=True,
+        )
+        logger.info("✅ HTTP client started for %s", self.current_account.username if self.current_account else "guest")
+        return True
+
+    async def login(self) -> bool:
+        """Check the session over HTTP; hand over to the browser if it is challenged or logged out."""
+        if self._browser_mode:
+            return await super().login()
+
+        try:
+            resp = await self._get(f"{BASE_URL}/")
+            if "logout" in resp.text:
+                logger.info("✅ Session persistent (HTTP)!")
+                self._record_login("reuse")
+                return True
+            logger.warning("🔑 No logout link over HTTP, switching to browser...")
+        except ChallengeDetected as e:
+            logger.warning("🚧 Challenge on home page (%s), switching to browser...", e)
+        except httpx.HTTPError as e:
+            logger.warning("🕒 HTTP nav error: %s, switching to browser...", e)
+
+        await self._fallback_to_browser()
+        return await super().login()
+
+    async def check_ban_and_rotate(self) -> bool:
+        if self._browser_mode:
+            return await super().check_ban_and_rotate()
+        return False
+
+    async def _switch_context(self):
+        """Rotation over HTTP: rebuild the client with the new proxy/account cookies."""
+        if self._browser_mode:
+            return await super()._switch_context()
+        await self._close_client()
+        await self.start()
+
+    async def fetch_candidates(
+        self,
+        target_count: int = 10,
+        start_page: int = 2,
+        max_pages: int = 2,
+        resume: bool = False,
+    ) -> AsyncGenerator[dict, None]:
+        """Yield domain candidates page by page over HTTP, switching to the browser on a challenge."""
+        if self._browser_mode:
+            async for candidate in super().fetch_candidates(target_count, start_page, max_pages, resume):
+                yield candidate
+            return
+
+        assert self._client is not None, "Call start() first"
+        if resume:
+            start_page = self._apply_cursor(start_page)
+
+        template = self.listing_template or capture_listing_template(
+            f"{DELETED_COM_URL}?{urlencode(site_filter_params(self.site_filters) + DEFAULT_LISTING_QUERY)}"
+        )
+        self.sorted_by_bl = sorted_by_bl_desc(template["params"])
+        referer = build_page_url(template, max(start_page - 1, 1))
+
+        found_count = 0
+        self._seen_streak = 0
+        end_page = start_page + max_pages
+        for page_num in range(start_page, end_page):
+            if found_count >= target_count:
+                break
+
+            if self.delay_scheduler:
+                self.delay_scheduler.page_started()
+            url = build_page_url(template, page_num)
+            logger.info("📄 Fetching page %d over HTTP...", page_num)
+            try:
+                resp = await self._get(url, referer=referer)
+            except ChallengeDetected as e:
+                logger.warning("🚧 Challenge on page %d (%s), switching to browser...", page_num, e)
+                if self.delay_scheduler:
+                    self.delay_scheduler.record_ban()
+                    self.delay_scheduler.page_aborted()  # The browser starts this page again
+                await self._fallback_to_browser()
+                async for candidate in super().fetch_candidates(target_count - found_count, page_num, end_page - page_num):
+                    yield candidate
+                return
+            except httpx.HTTPError as e:
+                logger.error("❌ Failed to load page %d: %s", page_num, e)
+                if self.delay_scheduler:
+                    self.delay_scheduler.page_finished()
+                continue
+
+            referer = url
+            self._archive_page(resp.text, page_num)
+            rows = parse_listing_html(resp.text, page_num)
+            self.last_page_done = page_num
+            self.listing_template = template
+            if rows:
+                self._save_cursor(page_num + 1)
+            else:
+                self._reset_cursor()  # Past the end of the listing
+            logger.info("   Found %d rows on page %d", len(rows), page_num)
+            if self._seen_limit_reached(rows):
+                break
+
+            for candidate in self._select_candidates(rows, target_count - found_count):
+                found_count += 1
+                logger.info("   ✅ [%d/%d] %s (BL: %d, Age: %d)", found_count, target_count, candidate["name"], candidate["bl"], candidate["age_years"])
+                yield candidate
+
+            if page_num < end_page - 1 and found_count < target_count:
+                if self.delay_scheduler:
+                    pause = self.delay_scheduler.next_break() + self.delay_scheduler.next_read()
+                    await self._human_wait(base=pause, sigma=0, action="Pacing requests...")
+                else:
+                    await self._human_wait(base=2, sigma=0.7, action="Pacing requests...")
+            if self.delay_scheduler:
+                self.delay_scheduler.page_finished()
+
+        logger.info("🏁 HTTP Flow: Scraping complete.")
+
+    async def _get(self, url: str, referer: str | None = None) -> httpx.Response:
+        headers = {"Referer": referer} if referer else None
+        resp = await self._client.get(url, headers=headers)
+        reason = detect_challenge(resp)
+        if reason:
+            raise ChallengeDetected(reason)
+        return resp
+
+    async def _fallback_to_browser(self):
+        """Launch the Playwright browser with the same account/proxy/session."""
+        if self._browser_mode:
+            return
+        await self._close_client()
+        self._browser_mode = True
+        await super().start()
+
+    async def _close_client(self):
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def close(self):
+        await self._close_client()
+        if self._browser_mode:
+            await super().close()
+        else:
+            if self.delay_scheduler:
+                self.delay_scheduler.save_run()
+            logger.info("🔒 HTTP client closed")
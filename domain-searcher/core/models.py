@@ -42,6 +42,64 @@ class DomainResult(SQLModel, table=True):
     task_id: Optional[int] = Field(default=None, foreign_key="searchtask.id")
     task: Optional[SearchTask] = Relationship(back_populates="results")
 
+class ScrapeCursor(SQLModel, table=True):
+    """Where an account stopped in the listing for a given filter/sort combination."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    account_id: int = Field(foreign_key="account.id", index=True)
+    filter_signature: str = Field(index=True)
+    listing_template_json: str = Field(default="{}")  # core.pagination template
+    sorted_by_bl: bool = Field(default=False)
+    next_page: int = Field(default=1)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    @property
+    def listing_template(self) -> dict:
+        return json.loads(self.listing_template_json)
+
+    @listing_template.setter
+    def listing_template(self, value: dict):
+        self.listing_template_json = json.dumps(value)
+
+class StealthRun(SQLModel, table=True):
+    """One scraping session under a delay profile, used to tune speed vs. ban rate."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    profile: str = Field(index=True)
+    target_pages_per_hour: float
+    achieved_pages_per_hour: float = Field(default=0.0)
+    pages: int = Field(default=0)
+    banned: bool = Field(default=False)
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+class ProxyHealth(SQLModel, table=True):
+    """Last known health of a proxy, so restarts only re-probe stale entries."""
+    proxy: str = Field(primary_key=True)
+    latency_ewma: Optional[float] = None  # Seconds
+    failures: int = Field(default=0)  # Consecutive failures
+    cooldown_until: Optional[datetime] = None
+    last_checked: Optional[datetime] = None
+    checks: int = Field(default=0)
+    successes: int = Field(default=0)
+
+class AccountProxyAffinity(SQLModel, table=True):
+    """Sticky proxies per account: rank 0 is preferred, higher ranks are fallbacks."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    account_id: int = Field(foreign_key="account.id", index=True)
+    proxy: str
+    rank: int = Field(default=0)
+    failure_streak: int = Field(default=0)
+    successes: int = Field(default=0)
+    failures: int = Field(default=0)
+    last_used: Optional[datetime] = None
+
+class LoginEvent(SQLModel, table=True):
+    """How a scraper session was authenticated: reused cookies, typed re-login or failure."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    account_id: int = Field(foreign_key="account.id", index=True)
+    kind: str  # reuse, relogin, failed
+    proxy: Optional[str] = None
+    at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
 # Database setup
 DB_FILE = Path(__file__).resolve().parent.parent / "domains.db"
 sqlite_url = f"sqlite:///{DB_FILE}"
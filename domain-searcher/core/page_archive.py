@@ -0,0 +1,142 @@
+"""
+Compressed raw-page archive for replay and re-parsing.
+@developer: zstd-compressed, content-addressed HTML files + a small SQLite index.
+@analyst: Lets us re-derive columns from pages we already paid for (see reparse_archive.py).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+import zstandard
+
+from core.background import BackgroundWriter
+from core.logger import setup_logger
+
+logger = setup_logger("page_archive")
+
+ARCHIVE_DIR = Path(__file__).resolve().parent.parent / "archive"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sha256 TEXT NOT NULL,
+    task_id INTEGER,
+    account TEXT,
+    page_num INTEGER NOT NULL,
+    captured_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pages_task ON pages (task_id);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id INTEGER PRIMARY KEY,
+    site_filters TEXT NOT NULL
+);
+"""
+
+
+class PageArchive:
+    """Writes listing pages on a background thread; reads are synchronous."""
+
+    def __init__(self, root: Path | str = ARCHIVE_DIR, level: int = 10):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.index_path = self.root / "index.sqlite"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.level = level
+        self._writer: BackgroundWriter | None = None
+        self._conn: sqlite3.Connection | None = None  # Owned by the writer thread
+
+    def submit(self, html: str, page_num: int, task_id: int | None = None, account: str | None = None) -> bool:
+        """Queue a page for archiving. Never blocks the caller."""
+        if self._writer is None:
+            self._writer = BackgroundWriter("page-archive")
+        captured_at = datetime.utcnow().isoformat(timespec="seconds")
+        return self._writer.submit(self._store, html, page_num, task_id, account, captured_at)
+
+    def record_task(self, task_id: int, site_filters: dict) -> bool:
+        """Queue the filters a task scrapes with, so re-parsing applies the same ones."""
+        if self._writer is None:
+            self._writer = BackgroundWriter("page-archive")
+        return self._writer.submit(self._store_task, task_id, json.dumps(site_filters, sort_keys=True))
+
+    def object_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256[:2] / f"{sha256}.html.zst"
+
+    def _index(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.index_path)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _store_task(self, task_id: int, site_filters: str):
+        conn = self._index()
+        conn.execute("INSERT OR REPLACE INTO tasks (task_id, site_filters) VALUES (?, ?)", (task_id, site_filters))
+        conn.commit()
+
+    def _store(self, html: str, page_num: int, task_id: int | None, account: str | None, captured_at: str):
+        data = html.encode("utf-8")
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.object_path(sha256)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(zstandard.ZstdCompressor(level=self.level).compress(data))
+            os.replace(tmp, path)
+
+        conn = self._index()
+        conn.execute(
+            "INSERT INTO pages (sha256, task_id, account, page_num, captured_at) VALUES (?, ?, ?, ?, ?)",
+            (sha256, task_id, account, page_num, captured_at),
+        )
+        conn.commit()
+        logger.debug("🗄️ Archived page %d (%s, %d bytes)", page_num, sha256[:12], len(data))
+
+    def entries(self, task_id: int | None = None) -> list[dict]:
+        """Index rows, optionally for a single task, in capture order."""
+        if not self.index_path.exists():
+            return []
+        with sqlite3.connect(self.index_path) as conn:
+            conn.row_factory = sqlite3.Row
+            conn.executescript(_SCHEMA)
+            if task_id is None:
+                rows = conn.execute("SELECT * FROM pages ORDER BY id")
+            else:
+                rows = conn.execute("SELECT * FROM pages WHERE task_id = ? ORDER BY id", (task_id,))
+            return [dict(r) for r in rows]
+
+    def task_filters(self, task_id: int) -> dict | None:
+        """Site filters recorded for a task (None for tasks archived before they were recorded)."""
+        if not self.index_path.exists():
+            return None
+        with sqlite3.connect(self.index_path) as conn:
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT site_filters FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def read(self, sha256: str) -> str:
+        data = self.object_path(sha256).read_bytes()
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+
+    def iter_pages(self, task_id: int | None = None) -> Iterator[tuple[dict, str]]:
+        for entry in self.entries(task_id):
+            yield entry, self.read(entry["sha256"])
+
+    def flush(self):
+        if self._writer:
+            self._writer.flush()
+
+    def close(self):
+        """Drain queued pages, close the index and stop the writer thread."""
+        if self._writer:
+            self._writer.put(self._close_index)  # Must run even when the queue is full
+            self._writer.close()
+            self._writer = None
+
+    def _close_index(self):
+        if self._conn:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,69 @@
+"""
+Listing URL builder for expireddomains.net pagination.
+@developer: Pure functions, no side effects. Capture the query once, then jump to any page.
+@analyst: The site paginates with an offset (`start=`) on top of the filter/sort query.
+"""
+
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+DEFAULT_PAGE_SIZE = 25
+OFFSET_PARAM = "start"
+
+
+def capture_listing_template(current_url: str, next_href: str | None = None) -> dict | None:
+    """
+    Build a pagination template from the current listing URL and its 'Next' link.
+
+    The 'Next' link carries the filter and sort parameters plus the offset of
+    the following page, which gives us the page size without hardcoding it.
+
+    Args:
+        current_url: URL of the filtered/sorted listing page.
+        next_href: Raw href of `a.next` on that page (may be relative).
+
+    Returns:
+        {"url": str, "params": list[tuple], "page_size": int, "fragment": str}
+        or None if the URL does not look like a listing.
+    """
+    source = urljoin(current_url, next_href) if next_href else current_url
+    parts = urlsplit(source)
+    if not parts.scheme or not parts.netloc:
+        return None
+
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    page_size = DEFAULT_PAGE_SIZE
+    if next_href:
+        # Page size = next offset - current offset (the current page may not be page 1)
+        step = _offset(params) - _offset(parse_qsl(urlsplit(current_url).query))
+        if step > 0:
+            page_size = step
+
+    return {
+        "url": urlunsplit((parts.scheme, parts.netloc, parts.path, "", "")),
+        "params": [(k, v) for k, v in params if k != OFFSET_PARAM],
+        "page_size": page_size,
+        "fragment": parts.fragment,
+    }
+
+
+def _offset(params: list) -> int:
+    for key, value in params:
+        if key == OFFSET_PARAM and value.isdigit():
+            return int(value)
+    return 0
+
+
+def build_page_url(template: dict, page_num: int) -> str:
+    """Return the listing URL for a 1-based page number."""
+    params = list(template["params"])
+    if page_num > 1:
+        params.append((OFFSET_PARAM, str((page_num - 1) * template["page_size"])))
+    query = urlencode(params)
+    parts = urlsplit(template["url"])
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, template.get("fragment", "")))
+
+
+def sorted_by_bl_desc(params: list) -> bool:
+    """True if the listing query sorts by backlinks, highest first (`o=bl&r=d`)."""
+    query = dict(params)
+    return query.get("o") == "bl" and query.get("r") == "d"
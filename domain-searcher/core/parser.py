@@ -0,0 +1,125 @@
+"""
+Listing table parser for expireddomains.net pages.
+@developer: Pure functions over raw HTML. Shared by the browser and HTTP backends.
+@analyst: Column classes: a.namelinks (domain), td.field_bl (backlinks), td.field_abirth (birth year).
+"""
+
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import List
+
+MIN_BIRTH_YEAR = 1980
+
+
+class _ListingParser(HTMLParser):
+    """Collect name/BL/birth-year cells from rows of table#listing."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[dict] = []
+        self._table_depth = 0  # >0 while inside table#listing
+        self._row: dict | None = None
+        self._field: str | None = None
+        self._field_tag: str | None = None
+        self._field_depth = 0
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "table":
+            if self._table_depth:
+                self._table_depth += 1
+            elif attrs.get("id") == "listing":
+                self._table_depth = 1
+            return
+        if not self._table_depth:
+            return
+
+        if tag == "tr" and self._table_depth == 1:  # Rows of nested tables belong to the outer row
+            self._row = {}
+            return
+        if self._row is None:
+            return
+
+        if self._field:
+            if tag == self._field_tag:
+                self._field_depth += 1
+            return
+
+        classes = (attrs.get("class") or "").split()
+        if tag == "a" and "namelinks" in classes and "name" not in self._row:
+            self._open_field("name", tag)
+        elif tag == "td" and "field_bl" in classes:
+            self._open_field("bl", tag)
+        elif tag == "td" and "field_abirth" in classes:
+            self._open_field("abirth", tag)
+
+    def handle_endtag(self, tag):
+        if not self._table_depth:
+            return
+        if tag == "table":
+            self._table_depth -= 1
+            return
+
+        if self._field and tag == self._field_tag:
+            if self._field_depth:
+                self._field_depth -= 1
+            else:
+                self._row[self._field] = "".join(self._text).strip()
+                self._field = None
+            return
+
+        if tag == "tr" and self._table_depth == 1 and self._row is not None:
+            if self._row.get("name"):
+                self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._field:
+            self._text.append(data)
+
+    def _open_field(self, field: str, tag: str):
+        self._field = field
+        self._field_tag = tag
+        self._field_depth = 0
+        self._text = []
+
+
+def parse_bl(text: str) -> int:
+    """Parse a backlinks cell ('1,234' -> 1234). Non-numeric values count as 0."""
+    text = (text or "").strip().replace(",", "")
+    return int(text) if text.isdigit() else 0
+
+
+def parse_age(text: str, current_year: int | None = None) -> int:
+    """Convert a Whois birth-year cell into an age in years (0 if unknown)."""
+    text = (text or "").strip()
+    if not text.isdigit():
+        return 0
+    year = current_year or datetime.utcnow().year
+    birth_year = int(text)
+    if MIN_BIRTH_YEAR <= birth_year <= year:
+        return year - birth_year
+    return 0
+
+
+def parse_listing_html(html: str, page_num: int) -> List[dict]:
+    """
+    Extract domain rows from a listing page.
+
+    Returns:
+        List of {"name", "bl", "age_years", "source_page"} dicts in page order.
+        Filtering (stop-words, age) is left to the caller.
+    """
+    parser = _ListingParser()
+    parser.feed(html or "")
+    parser.close()
+    return [
+        {
+            "name": row["name"].lower(),
+            "bl": parse_bl(row.get("bl", "")),
+            "age_years": parse_age(row.get("abirth", "")),
+            "source_page": page_num,
+        }
+        for row in parser.rows
+    ]
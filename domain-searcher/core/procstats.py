@@ -0,0 +1,79 @@
+"""
+Process memory stats (RSS) for the scraper and its browser processes.
+@developer: Reads /proc on Linux; falls back to getrusage (self only) elsewhere.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+_PROC = Path("/proc")
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        for line in (_PROC / str(pid) / "status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _children_map() -> dict[int, list[int]]:
+    children: dict[int, list[int]] = {}
+    for entry in _PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            # Field 4 of /proc/<pid>/stat is the parent pid (after the "(comm)" field)
+            stat = (entry / "stat").read_text()
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry.name))
+    return children
+
+
+def descendant_pids(pid: int | None = None) -> list[int]:
+    """All descendants of a process (Chromium and its renderers for the scraper process)."""
+    if not _PROC.exists():
+        return []
+    children = _children_map()
+    result, stack = [], [pid or os.getpid()]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            result.append(child)
+            stack.append(child)
+    return result
+
+
+def rss_mb(pid: int | None = None) -> float:
+    """Resident memory of a single process in MB."""
+    if _PROC.exists():
+        return _rss_kb(pid or os.getpid()) / 1024
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def process_tree_rss_mb(pid: int | None = None) -> dict:
+    """{"self": MB, "children": MB, "total": MB} for a process and its descendants."""
+    own = rss_mb(pid)
+    children = sum(_rss_kb(child) for child in descendant_pids(pid)) / 1024
+    return {"self": round(own, 1), "children": round(children, 1), "total": round(own + children, 1)}
+
+
+def subtree_rss_mb(roots: list[int]) -> float:
+    """RSS of the given processes plus all their descendants (e.g. one scraper's Chromium)."""
+    if not _PROC.exists() or not roots:
+        return 0.0
+    children = _children_map()
+    seen, stack = set(), list(roots)
+    while stack:
+        pid = stack.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        stack.extend(children.get(pid, []))
+    return round(sum(_rss_kb(pid) for pid in seen) / 1024, 1)
@@ -1,15 +1,86 @@
 """
 Proxy Manager for Domain Searcher.
 @developer: Handles proxy rotation from a list and verifies proxy health.
+            Health checks race concurrently: TCP pre-probe, then an HTTP GET of PROXY_TEST_URL.
+            A background monitor keeps per-proxy latency EWMA, failure streaks and cooldowns;
+            pick() serves a latency-weighted healthy proxy instantly.
+            Scores are persisted in ProxyHealth (domains.db) and merged back by from_file().
+            LOCAL_PROXY_URL points the scraper at utils/async_proxy.py, which balances this pool
+            behind one stable port (sticky per session key, rotated via its control host).
 """
 
 import asyncio
 import httpx
+import os
 import random
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from urllib.parse import quote, urlsplit
+from sqlmodel import Session, select
 from core.logger import setup_logger
+from core.models import ProxyHealth, engine
 
 logger = setup_logger("proxy_manager")
 
+# Local runs can point this at the stand-in site: http://127.0.0.1:8765/health
+PROXY_TEST_URL = os.getenv("PROXY_TEST_URL", "https://www.google.com")
+TCP_PROBE_TIMEOUT = 2.0
+DEFAULT_PORTS = {"http": 80, "https": 443, "socks5": 1080, "socks5h": 1080}
+LATENCY_ALPHA = 0.3  # EWMA weight of the newest probe
+UNKNOWN_LATENCY = 2.0  # Assumed latency (s) for proxies not probed yet
+BASE_COOLDOWN = 30.0  # Seconds benched after the first failure, doubled per consecutive failure
+MAX_COOLDOWN = 1800.0
+MONITOR_INTERVAL = float(os.getenv("PROXY_MONITOR_INTERVAL", "60"))
+# A comment starts a line or follows whitespace; a bare '#' inside a password is kept
+_COMMENT_RE = re.compile(r"(?:^|\s)#")
+CONTROL_HOST = "local.proxy"  # Requests to http://local.proxy/... are answered by the local proxy itself
+
+
+def split_proxy_line(line: str) -> tuple[str, str]:
+    """'proxy  # note' → (proxy, note). Full-line comments give an empty proxy."""
+    match = _COMMENT_RE.search(line)
+    if not match:
+        return line.strip(), ""
+    return line[:match.start()].strip(), line[match.end():].strip()
+
+
+@dataclass
+class ProxyStats:
+    latency_ewma: float | None = None
+    failures: int = 0  # Consecutive failures
+    cooldown_until: float = 0.0  # Unix time
+    last_checked: float = 0.0  # Unix time, 0 = never
+    checks: int = 0
+    successes: int = 0
+
+    def available(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    @classmethod
+    def from_row(cls, row: ProxyHealth) -> "ProxyStats":
+        return cls(
+            latency_ewma=row.latency_ewma,
+            failures=row.failures,
+            cooldown_until=row.cooldown_until.timestamp() if row.cooldown_until else 0.0,
+            last_checked=row.last_checked.timestamp() if row.last_checked else 0.0,
+            checks=row.checks,
+            successes=row.successes,
+        )
+
+    def to_row(self, proxy: str) -> ProxyHealth:
+        return ProxyHealth(
+            proxy=proxy,
+            latency_ewma=self.latency_ewma,
+            failures=self.failures,
+            cooldown_until=datetime.fromtimestamp(self.cooldown_until) if self.cooldown_until else None,
+            last_checked=datetime.fromtimestamp(self.last_checked) if self.last_checked else None,
+            checks=self.checks,
+            successes=self.successes,
+        )
+
+
 class ProxyManager:
     def __init__(self, proxy_list: list[str] = None):
         """
@@ -18,18 +89,71 @@ class ProxyManager:
         """
         self.proxies = proxy_list or []
         self._current_index = 0
+        self.stats: dict[str, ProxyStats] = {proxy: ProxyStats() for proxy in self.proxies}
+        self._monitor_task: asyncio.Task | None = None
 
     @classmethod
     def from_file(cls, file_path: str):
-        """Load proxies from a text file (one per line)."""
+        """
+        Load proxies from a text file (one per line, # comments allowed) merged with stored health.
+        A `# score=<seconds>` note (vet_proxies.py output) seeds the latency of never-checked proxies.
+        """
         try:
+            proxies, scores = [], {}
             with open(file_path, "r") as f:
-                proxies = [line.strip() for line in f if line.strip()]
+                for line in f:
+                    proxy, note = split_proxy_line(line)
+                    if not proxy or proxy in scores:
+                        continue
+                    proxies.append(proxy)
+                    match = re.search(r"score=([\d.]+)", note)
+                    scores[proxy] = float(match.group(1)) if match else None
             logger.info("📡 Loaded %d proxies from %s", len(proxies), file_path)
-            return cls(proxies)
         except Exception as e:
             logger.error("❌ Failed to load proxies: %s", e)
             return cls([])
+        manager = cls(proxies)
+        for proxy, seed in scores.items():
+            if seed is not None:
+                manager.stats[proxy].latency_ewma = seed
+        manager.load_health()
+        return manager
+
+    def load_health(self):
+        """Merge stored ProxyHealth rows into the in-memory stats (entries not in the list are ignored)."""
+        if not self.proxies:
+            return
+        try:
+            with Session(engine) as session:
+                rows = session.exec(select(ProxyHealth).where(ProxyHealth.proxy.in_(self.proxies))).all()
+        except Exception as e:
+            logger.debug("⚠️ Could not load proxy health: %s", e)
+            return
+        for row in rows:
+            self.stats[row.proxy] = ProxyStats.from_row(row)
+        if rows:
+            logger.info("📡 Restored health for %d/%d proxies (%d usable)", len(rows), len(self.proxies), self.healthy_count())
+
+    def save_health(self):
+        """Upsert the current stats of every checked proxy into ProxyHealth."""
+        try:
+            with Session(engine) as session:
+                for proxy in self.proxies:
+                    stats = self.stats.get(proxy)
+                    if stats and stats.checks:
+                        session.merge(stats.to_row(proxy))
+                session.commit()
+        except Exception as e:
+            logger.error("❌ Failed to save proxy health: %s", e)
+
+    @classmethod
+    def from_env(cls):
+        """proxies.txt next to the app if present, otherwise PROXY_URL (possibly empty)."""
+        proxies_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "proxies.txt")
+        if os.path.exists(proxies_file):
+            return cls.from_file(proxies_file)
+        env_proxy = os.getenv("PROXY_URL")
+        return cls([env_proxy] if env_proxy else [])
 
     def get_next(self) -> str | None:
         """Get the next proxy in the list (round-robin)."""
@@ -46,30 +170,197 @@ class ProxyManager:
             return None
         return random.choice(self.proxies)
 
-    async def verify_proxy(self, proxy_url: str, test_url: str = "https://www.google.com", timeout: int = 10) -> bool:
-        """Check if a proxy is working."""
+    # --- Scored pool ---
+
+    def record_result(self, proxy: str, latency: float | None):
+        """Update a proxy's score: latency in seconds on success, None on failure."""
+        stats = self.stats.setdefault(proxy, ProxyStats())
+        now = time.time()
+        stats.last_checked = now
+        stats.checks += 1
+        if latency is None:
+            stats.failures += 1
+            stats.cooldown_until = now + min(BASE_COOLDOWN * 2 ** (stats.failures - 1), MAX_COOLDOWN)
+            return
+        stats.successes += 1
+        stats.failures = 0
+        stats.cooldown_until = 0.0
+        if stats.latency_ewma is None:
+            stats.latency_ewma = latency
+        else:
+            stats.latency_ewma = LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * stats.latency_ewma
+
+    def report_failure(self, proxy: str | None):
+        """Consumers call this when a proxy failed on the request path (bench it, no inline re-check)."""
+        if proxy:
+            self.record_result(proxy, None)
+
+    def pick(self, exclude: str | set[str] | None = None) -> str | None:
+        """Latency-weighted choice among proxies not cooling down. Never blocks on checks."""
+        if not self.proxies:
+            return None
+        now = time.time()
+        excluded = {exclude} if isinstance(exclude, str) else set(exclude or ())
+        pool = [p for p in self.proxies if p not in excluded] or list(self.proxies)
+        ready = [p for p in pool if self.stats.setdefault(p, ProxyStats()).available(now)]
+        if not ready:
+            # Everything is benched: take whichever comes back first
+            return min(pool, key=lambda p: self.stats[p].cooldown_until)
+        weights = [1.0 / max(self.stats[p].latency_ewma or UNKNOWN_LATENCY, 0.05) for p in ready]
+        return random.choices(ready, weights=weights)[0]
+
+    def is_available(self, proxy: str) -> bool:
+        """In the pool's view right now: not cooling down after failures."""
+        return self.stats.setdefault(proxy, ProxyStats()).available(time.time())
+
+    def healthy_count(self) -> int:
+        now = time.time()
+        return sum(1 for p in self.proxies if self.stats.setdefault(p, ProxyStats()).available(now))
+
+    async def probe(self, proxy: str, test_url: str | None = None) -> float | None:
+        """Check one proxy and record the result; returns latency or None."""
+        started = time.monotonic()
+        latency = time.monotonic() - started if await self.verify_proxy(proxy, test_url) else None
+        self.record_result(proxy, latency)
+        return latency
+
+    def stale_proxies(self, max_age: float) -> list[str]:
+        """Proxies never checked or last checked more than max_age seconds ago."""
+        cutoff = time.time() - max_age
+        return [p for p in self.proxies if self.stats.setdefault(p, ProxyStats()).last_checked < cutoff]
+
+    async def refresh_all(self, concurrency: int = 10, test_url: str | None = None, max_age: float | None = None):
+        """Probe the pool (only entries older than max_age, if given) and persist the results."""
+        targets = self.stale_proxies(max_age) if max_age is not None else list(self.proxies)
+        if not targets:
+            return
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def guarded(proxy: str):
+            async with semaphore:
+                await self.probe(proxy, test_url)
+
+        await asyncio.gather(*(guarded(p) for p in targets))
+        self.save_health()
+        logger.info("📡 Proxy pool refreshed (%d probed): %d/%d healthy", len(targets), self.healthy_count(), len(self.proxies))
+
+    def start_monitor(self, interval: float = MONITOR_INTERVAL):
+        """Re-probe the pool every `interval` seconds on a background task."""
+        if not self.proxies or self._monitor_task:
+            return
+
+        async def loop():
+            while True:
+                try:
+                    # Right after a restart this skips everything the stored state says is fresh
+                    await self.refresh_all(max_age=interval)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("❌ Proxy monitor error: %s", e)
+                await asyncio.sleep(interval)
+
+        self._monitor_task = asyncio.create_task(loop())
+
+    async def stop_monitor(self):
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+        self.save_health()
+
+    # --- Health checks ---
+
+    async def tcp_probe(self, proxy_url: str, timeout: float = TCP_PROBE_TIMEOUT) -> bool:
+        """Cheap pre-check: can we open a TCP connection to the proxy at all?"""
         try:
-            async with httpx.AsyncClient(proxies={"all://": proxy_url}, timeout=timeout) as client:
-                resp = await client.get(test_url)
+            parts = urlsplit(proxy_url)
+            host, port = parts.hostname, parts.port or DEFAULT_PORTS.get(parts.scheme)
+            if not host or not port:
+                return False
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+            return True
+        except (OSError, ValueError, asyncio.TimeoutError) as e:
+            logger.debug("   ⚠️ TCP probe failed for %s: %s", proxy_url, e)
+            return False
+
+    async def verify_proxy(self, proxy_url: str, test_url: str | None = None, timeout: int = 10) -> bool:
+        """Check if a proxy is working (TCP pre-probe, then a GET of test_url through it)."""
+        if not await self.tcp_probe(proxy_url):
+            return False
+        try:
+            async with httpx.AsyncClient(proxy=proxy_url, timeout=timeout) as client:
+                resp = await client.get(test_url or PROXY_TEST_URL)
                 return resp.status_code == 200
         except Exception as e:
             logger.debug("   ⚠️ Proxy check failed for %s: %s", proxy_url, e)
             return False
 
-    async def get_healthy_proxy(self, retries: int = 3) -> str | None:
-        """Attempt to find a working proxy from the list."""
+    async def get_healthy_proxy(self, retries: int = 3, test_url: str | None = None) -> str | None:
+        """Check candidates concurrently; the first healthy proxy wins and the other checks are cancelled."""
         if not self.proxies:
             return None
             
         # Shuffle for randomness
         available_proxies = list(self.proxies)
         random.shuffle(available_proxies)
+        candidates = available_proxies[:retries*2] # Limit checks
+
+        async def check(proxy: str) -> str | None:
+            return proxy if await self.probe(proxy, test_url) is not None else None
+
+        logger.info("📡 Checking %d proxies concurrently...", len(candidates))
+        tasks = [asyncio.create_task(check(proxy)) for proxy in candidates]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                proxy = await next_done
+                if proxy:
+                    logger.info("   ✅ Proxy is healthy: %s", proxy)
+                    return proxy
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.save_health()
         
-        for proxy in available_proxies[:retries*2]: # Limit checks
-            logger.info("📡 Checking proxy: %s", proxy)
-            if await self.verify_proxy(proxy):
-                logger.info("   ✅ Proxy is healthy")
-                return proxy
-        
-        logger.warning("❌ No healthy proxies found after %d attempts", retries)
+        logger.warning("❌ No healthy proxies found among %d candidates", len(candidates))
         return None
+
+
+_pool: ProxyManager | None = None
+
+
+def get_proxy_pool() -> ProxyManager:
+    """Process-wide scored pool shared by the scraper, shards and verifier."""
+    global _pool
+    if _pool is None:
+        _pool = ProxyManager.from_env()
+    return _pool
+
+
+def session_proxy_url(local_proxy: str, session_key: str) -> str:
+    """Local proxy URL carrying the sticky session key as the Basic-auth username."""
+    parts = urlsplit(local_proxy)
+    return f"{parts.scheme}://{quote(session_key, safe='')}:-@{parts.netloc}"
+
+
+async def rotate_local_session(local_proxy: str, session_key: str) -> bool:
+    """Ask the local proxy to move this session to another upstream (its open tunnels are closed)."""
+    try:
+        async with httpx.AsyncClient(proxy=session_proxy_url(local_proxy, session_key), timeout=5.0) as client:
+            resp = await client.post(f"http://{CONTROL_HOST}/rotate")
+        if resp.status_code == 200:
+            logger.info("🔄 Local proxy moved session %s: %s", session_key, resp.json())
+            return True
+        logger.warning("⚠️ Local proxy rotate returned HTTP %d", resp.status_code)
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("⚠️ Local proxy rotate failed: %s", e)
+    return False
@@ -0,0 +1,101 @@
+"""
+Top-K ranking of scraped candidates by backlinks and age.
+@developer: Bounded min-heap over a page budget; early stop on BL-sorted listings.
+@analyst: Results no longer depend on where paging stopped, only on the page budget.
+"""
+
+import heapq
+from typing import AsyncGenerator, List
+
+from core.logger import setup_logger
+
+logger = setup_logger("ranking")
+
+
+def rank_key(candidate: dict) -> tuple:
+    """Higher BL first, older domain breaks ties."""
+    return (candidate.get("bl", 0), candidate.get("age_years", 0))
+
+
+class TopKCollector:
+    """Keep the K best candidates seen so far (by rank_key)."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[tuple] = []  # (key, seq, candidate), worst on top
+        self._seq = 0
+
+    def offer(self, candidate: dict) -> bool:
+        """Add a candidate; returns True if it made it into the current top K."""
+        if self.k <= 0:
+            return False
+        item = (rank_key(candidate), self._seq, candidate)
+        self._seq += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+            return True
+        if item[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+            return True
+        return False
+
+    @property
+    def full(self) -> bool:
+        return len(self._heap) >= self.k
+
+    def threshold(self) -> tuple | None:
+        """Key of the current K-th best candidate (None until the heap is full)."""
+        return self._heap[0][0] if self.full else None
+
+    def can_improve(self, bl: int) -> bool:
+        """Whether a row with this BL could still enter the top K."""
+        threshold = self.threshold()
+        return threshold is None or bl >= threshold[0]
+
+    def ranked(self) -> List[dict]:
+        """Best first; earlier-seen wins exact ties."""
+        return [c for _, _, c in sorted(self._heap, key=lambda item: (item[0], -item[1]), reverse=True)]
+
+
+async def fetch_top_candidates(
+    scraper,
+    k: int = 10,
+    start_page: int = 2,
+    page_budget: int = 5,
+    sorted_by_bl: bool | None = None,
+    **fetch_kwargs,
+) -> AsyncGenerator[dict, None]:
+    """
+    Scan up to `page_budget` pages and yield the K best candidates in ranked order.
+
+    Args:
+        scraper: Any backend exposing fetch_candidates (DomainScraper, HttpScraper, ...).
+        sorted_by_bl: Whether the listing is sorted by BL descending. Defaults to the
+            scraper's own `sorted_by_bl` flag, read once paging has started. Backends that page
+            out of order (ShardedScraper) expose cut_pages_after() instead of being stopped.
+        fetch_kwargs: Extra backend options passed to fetch_candidates (e.g. resume=True).
+    """
+    collector = TopKCollector(k)
+    scanned = 0
+    stream = scraper.fetch_candidates(target_count=10**9, start_page=start_page, max_pages=page_budget, **fetch_kwargs)
+    try:
+        async for candidate in stream:
+            scanned += 1
+            is_sorted = sorted_by_bl if sorted_by_bl is not None else getattr(scraper, "sorted_by_bl", False)
+            if is_sorted and not collector.can_improve(candidate["bl"]):
+                cut_pages_after = getattr(scraper, "cut_pages_after", None)
+                if cut_pages_after:
+                    # Sharded: earlier page ranges may still be running, only later ones are dropped
+                    cut_pages_after(candidate["source_page"])
+                    continue
+                logger.info("✂️ Early stop on page %d: BL %d cannot beat the current top %d",
+                            candidate["source_page"], candidate["bl"], k)
+                break
+            collector.offer(candidate)
+    finally:
+        await stream.aclose()
+
+    ranked = collector.ranked()
+    logger.info("🏆 Top %d selected out of %d scanned candidates", len(ranked), scanned)
+    for candidate in ranked:
+        yield candidate
@@ -6,8 +6,12 @@ Playwright-based scraper for expireddomains.net (Deleted .com section).
 
 import asyncio
 import json
+import os
 import random
+import re
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
 from typing import AsyncGenerator
 
@@ -16,10 +20,19 @@ if sys.platform == 'win32':
 
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 
-from core.filters import is_clean_domain
+from core.affinity import choose_proxy, record_login, record_proxy_result
+from core.asset_cache import get_asset_cache
+from core.ban_detector import BAN_PHRASES, LOGGED_OUT, SessionBlocked, SessionHealthMonitor
+from core.clock import RealClock
+from core.debug_artifacts import get_debug_artifacts
+from core.cursor import filter_signature, load_cursor, reset_cursor, save_cursor
+from core.filters import SITE_FILTER_FIELDS, build_site_filters, is_clean_domain, passes_site_filters
 from core.logger import setup_logger
 from core.models import Account, engine
-from core.proxy_manager import ProxyManager
+from core.pagination import build_page_url, capture_listing_template
+from core.parser import parse_listing_html
+from core.procstats import subtree_rss_mb
+from core.proxy_manager import ProxyManager, rotate_local_session, session_proxy_url
 from sqlmodel import Session, select
 
 logger = setup_logger("scraper")
@@ -31,11 +44,33 @@ async def apply_stealth(page: Page):
     await stealth(page)
 
 # --- Constants ---
-BASE_URL = "https://member.expireddomains.net"
+BASE_URL = os.getenv("ED_BASE_URL", "https://member.expireddomains.net")  # Overridden by local benchmarks
 LOGIN_URL = f"{BASE_URL}/login/"
 DELETED_COM_URL = f"{BASE_URL}/domains/expiredcom/"
 AUTH_STATE_FILE = Path(__file__).resolve().parent.parent / "auth.json"
 MIN_AGE_YEARS = 5
+# Context recycling: fresh context after N listing pages or once the JS heap passes the cap (0 = off)
+CONTEXT_MAX_PAGES = int(os.getenv("CONTEXT_MAX_PAGES", "40"))
+CONTEXT_MAX_HEAP_MB = float(os.getenv("CONTEXT_MAX_HEAP_MB", "256"))
+# Static assets answered from the disk cache (ASSET_CACHE_MB) through context.route
+STATIC_ASSET_RE = re.compile(r"\.(?:js|mjs|css|woff2?|ttf|otf|eot|svg|png|jpe?g|gif|webp|ico)(?:\?|$)", re.IGNORECASE)
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/131.0.0.0 Safari/537.36"
+)
+
+
+def _driver_pid(pw) -> int | None:
+    """
+    Pid of this Playwright instance's driver process. Every scraper starts its own driver and
+    Chromium runs under it, so its subtree is this scraper's browser even when shards or
+    concurrent searches launch browsers from the same process.
+    """
+    try:
+        return pw._impl_obj._connection._transport._proc.pid
+    except AttributeError:
+        return None
 
 
 class DomainScraper:
@@ -56,9 +91,34 @@ class DomainScraper:
         self._pw = None
         self.proxy_manager: ProxyManager | None = None
         self.current_proxy: str | None = None
+        # LOCAL_PROXY_URL: stable local port (utils/async_proxy.py); upstreams rotate behind it
+        self.local_proxy: str | None = os.getenv("LOCAL_PROXY_URL") or None
         self.current_account: Account | None = None
         self.storage_state: dict | None = None
         self.on_stealth_action = None # Optional callback: func(action_name: str)
+        self.clock = RealClock()  # Swap for VirtualClock in tests/benchmarks
+        self.direct_pagination = True  # Jump to start_page via URL instead of 'Next' clicks
+        self.listing_template: dict | None = None  # Captured once per session from the filter form
+        self.last_page_done: int | None = None  # Last listing page fully parsed by fetch_candidates
+        self.sorted_by_bl = False  # True once the listing is sorted by BL descending
+        # Constraints pushed into the site's filter form (and re-checked locally)
+        self.site_filters: dict = build_site_filters(min_age_years=MIN_AGE_YEARS)
+        self.seen_index = None  # Optional SeenDomainIndex: skip domains earlier tasks already stored
+        self.max_seen_pages = 0  # Stop after N consecutive pages with nothing new to select (0 = never)
+        self._seen_streak = 0
+        self._collected: set[str] = set()  # Names selected by this task (the index only learns stored ones)
+        self.page_archive = None  # Optional PageArchive: raw HTML of every listing page
+        self.task_id: int | None = None  # SearchTask id, used to index archived pages
+        self.delay_scheduler = None  # Optional DelayScheduler: plans waits for a pages-per-hour target
+        self.health_monitor = SessionHealthMonitor(BASE_URL)  # Flags bans/logouts from response events
+        self.max_pages_per_context = CONTEXT_MAX_PAGES
+        self.max_js_heap_mb = CONTEXT_MAX_HEAP_MB
+        self.resource_stats = {"recycles": 0, "peak_js_heap_mb": 0.0, "peak_browser_rss_mb": 0.0}
+        self._pages_in_context = 0
+        self._cdp = None
+        self._browser_pids: list[int] = []  # This scraper's Playwright driver (Chromium runs under it)
+        self.debug_artifacts = get_debug_artifacts()  # Sampled screenshots/HTML; always on errors
+        self.asset_cache = get_asset_cache()  # Shared JS/CSS/font cache (None when ASSET_CACHE_MB=0)
 
     async def _human_wait(self, base: float = 2.0, sigma: float = 1.0, action: str = "Thinking..."):
         """Asymmetric natural delay based on Gaussian distribution."""
@@ -66,7 +126,14 @@ class DomainScraper:
             self.on_stealth_action(action)
         delay = max(0.5, random.gauss(base, sigma))
         logger.debug("⏳ Human wait: %.2fs", delay)
-        await asyncio.sleep(delay)
+        # Cut short (SessionBlocked) the moment the session is flagged
+        await self.health_monitor.guard(self.clock.sleep(delay, action))
+
+    async def _type(self, locator, text: str, min_delay_ms: int, max_delay_ms: int):
+        """Type like a human. Keystroke delays are recorded on the clock (and skipped on a virtual one)."""
+        delay = random.randint(min_delay_ms, max_delay_ms)
+        self.clock.record(len(text) * delay / 1000, "Typing...")
+        await locator.press_sequentially(text, delay=0 if self.clock.virtual else delay)
 
     async def _jitter_move(self):
         """Micro-movements of the mouse to simulate human jitter."""
@@ -100,14 +167,14 @@ class DomainScraper:
             next_step += random.randint(-15, 15)
             await self._page.mouse.wheel(0, next_step)
             current_y += next_step
-            await asyncio.sleep(random.uniform(0.05, 0.2))
+            await self.clock.sleep(random.uniform(0.05, 0.2), "Scrolling...")
             
             # 10% chance to scroll back a little
             if random.random() < 0.1:
                 back = random.randint(20, 50)
                 await self._page.mouse.wheel(0, -back)
                 current_y -= back
-                await asyncio.sleep(0.1)
+                await self.clock.sleep(0.1, "Scrolling...")
 
     async def _random_delay(self, min_s: float = 1.0, max_s: float = 3.5):
         """Legacy wrapper for natural delay."""
@@ -116,31 +183,16 @@ class DomainScraper:
     async def start(self):
         """Launch browser and initialize context using DB account pool."""
         self._pw = await async_playwright().start()
-        
-        # 1. Get an account if not explicitly provided
-        if self.username and self.password:
-            # Create a temporary in-memory account object
-            self.current_account = Account(username=self.username, password=self.password, email="", status="active")
-        elif not self.username:
-            await self._refresh_account_from_pool()
-            
-        if not self.current_account:
-            logger.warning("⚠️ No active accounts in pool and no credentials provided. Starting in guest mode.")
-                
-        # Initialize proxy manager if not set
-        if not self.proxy_manager:
-            import os
-            proxies_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "proxies.txt")
-            if os.path.exists(proxies_file):
-                 self.proxy_manager = ProxyManager.from_file(proxies_file)
-            else:
-                 env_proxy = os.getenv("PROXY_URL")
-                 self.proxy_manager = ProxyManager([env_proxy] if env_proxy else [])
-            
-            # Select proxy
-            self.current_proxy = await self.proxy_manager.get_healthy_proxy(retries=1)
-        
-        # 2. Browser launch args
+        await self._prepare_identity()
+        await self._launch_browser()
+        driver_pid = _driver_pid(self._pw)
+        self._browser_pids = [driver_pid] if driver_pid else []
+        await self._new_context()
+        logger.info("✅ Browser started for %s", self.current_account.username if self.current_account else "guest")
+        return True
+
+    async def _launch_browser(self):
+        """Start Chromium once; proxy and session live on the context so they can rotate without a relaunch."""
         launch_args = [
             "--disable-blink-features=AutomationControlled",
             "--no-sandbox",
@@ -159,47 +211,204 @@ class DomainScraper:
             args=launch_args,
         )
 
-        # 3. Context configuration
+    async def _new_context(self):
+        """Open a BrowserContext with the current proxy and account session."""
         context_kwargs = {
             "viewport": {"width": 1366, "height": 768},
-            "user_agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
+            "user_agent": USER_AGENT,
             "device_scale_factor": 1,
             "has_touch": False,
             "is_mobile": False,
             "java_script_enabled": True,
         }
 
-        if self.current_proxy:
-            context_kwargs["proxy"] = {"server": self.current_proxy}
-        elif self.proxy:
-            context_kwargs["proxy"] = {"server": self.proxy}
+        proxy = self.current_proxy or self.proxy
+        if self.local_proxy:
+            # The local proxy keeps this session key on one upstream and swaps it without a new context
+            context_kwargs["proxy"] = {"server": self.local_proxy, "username": self._session_key(), "password": "-"}
+        elif proxy:
+            context_kwargs["proxy"] = {"server": proxy}
+
+        storage_state = self._resolve_storage_state()
+        if storage_state:
+            context_kwargs["storage_state"] = storage_state
+
+        self._context = await self._browser.new_context(**context_kwargs)
+        self.health_monitor.reset()
+        self.health_monitor.attach(self._context)
+        if self.asset_cache:
+            await self._context.route(STATIC_ASSET_RE, self._route_asset)
+        self._page = await self._context.new_page()
+        await apply_stealth(self._page)
+        self._pages_in_context = 0
+        try:
+            self._cdp = await self._context.new_cdp_session(self._page)
+            await self._cdp.send("Performance.enable")
+        except Exception as e:
+            self._cdp = None
+            logger.debug("⚠️ CDP metrics unavailable: %s", e)
+
+    async def _route_asset(self, route):
+        """Serve a static asset from the disk cache, or fetch it once (through the proxy) and store it."""
+        request = route.request
+        try:
+            if request.method != "GET":
+                await route.continue_()
+                return
+            # Playwright hands over decoded bodies, so they are stored without Content-Encoding
+            asset = await self.asset_cache.lookup(request.url, variant="decoded")
+            if asset:
+                await route.fulfill(status=asset.status, headers=asset.response_headers(time.time()), body=asset.body)
+                return
+            response = await route.fetch()
+            body = await response.body()
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length")}
+            self.asset_cache.store(request.url, response.status, headers, body, variant="decoded")
+            await route.fulfill(status=response.status, headers=headers, body=body)
+        except Exception as e:
+            logger.debug("⚠️ Asset route failed for %s: %s", request.url, e)
+            try:
+                await route.continue_()
+            except Exception:
+                pass
+
+    async def _close_context(self):
+        """Save the session of the current context, then close it (the browser keeps running)."""
+        if not self._context:
+            return
+        try:
+            # The next context (proxy rotation, recycle) reopens with these live cookies,
+            # not the injected or earlier ones
+            self.storage_state = await self._context.storage_state()
+        except Exception as e:
+            logger.debug("⚠️ Storage state capture failed: %s", e)
+        await self._save_session_to_db()
+        try:
+            await self._context.close()
+        except Exception as e:
+            logger.debug("⚠️ Context close failed: %s", e)
+        self._context = None
+        self._page = None
+        self._cdp = None
+
+    async def _switch_context(self):
+        """Replace the context with one for the current proxy/account on the same browser."""
+        if not self._browser:
+            await self.start()
+            return
+        started = time.perf_counter()
+        await self._close_context()
+        await self._new_context()
+        logger.info("🔄 New context in %.0f ms", (time.perf_counter() - started) * 1000)
+
+    async def _js_heap_mb(self) -> float:
+        """Renderer JS heap in use (CDP Performance.getMetrics), 0 if unavailable."""
+        if not self._cdp:
+            return 0.0
+        try:
+            metrics = await self._cdp.send("Performance.getMetrics")
+        except Exception as e:
+            logger.debug("⚠️ CDP getMetrics failed: %s", e)
+            return 0.0
+        for metric in metrics.get("metrics", []):
+            if metric["name"] == "JSHeapUsedSize":
+                return metric["value"] / (1024 * 1024)
+        return 0.0
+
+    def browser_rss_mb(self) -> float:
+        """RSS of this scraper's Playwright driver, Chromium and renderer processes."""
+        return subtree_rss_mb(self._browser_pids)
+
+    async def _maybe_recycle_context(self, page: Page) -> Page:
+        """
+        Recreate the context (same proxy/account, live cookies carried over, same URL)
+        once it has served too many pages or its JS heap is over the cap.
+        """
+        heap_mb = await self._js_heap_mb()
+        stats = self.resource_stats
+        stats["peak_js_heap_mb"] = max(stats["peak_js_heap_mb"], round(heap_mb, 1))
+        stats["peak_browser_rss_mb"] = max(stats["peak_browser_rss_mb"], self.browser_rss_mb())
+
+        too_many_pages = self.max_pages_per_context and self._pages_in_context >= self.max_pages_per_context
+        heap_over_cap = self.max_js_heap_mb and heap_mb >= self.max_js_heap_mb
+        if not (too_many_pages or heap_over_cap):
+            return page
+
+        logger.info("♻️ Recycling context after %d pages (JS heap %.0f MB)", self._pages_in_context, heap_mb)
+        url = page.url
+        await self._switch_context()  # _close_context carries the live cookies over
+        stats["recycles"] += 1
+        await self._page.goto(url, wait_until="networkidle")
+        return self._page
+
+    async def _prepare_identity(self):
+        """Pick the account (explicit credentials or DB pool) and a healthy proxy."""
+        # 1. Get an account if not explicitly provided
+        if self.username and self.password:
+            # Create a temporary in-memory account object
+            self.current_account = Account(username=self.username, password=self.password, email="", status="active")
+        elif not self.username and not self.current_account:
+            await self._refresh_account_from_pool()
+
+        if not self.current_account:
+            logger.warning("⚠️ No active accounts in pool and no credentials provided. Starting in guest mode.")
+
+        if self.local_proxy:
+            logger.info("🔀 Using local proxy %s (session %s)", self.local_proxy, self._session_key())
+            return
 
+        # Shared scored pool (kept healthy in the background): instant pick, no inline checks.
+        # Standalone run: own pool from proxies.txt / PROXY_URL (stored health), one racing check
+        standalone = not self.proxy_manager
+        if standalone:
+            self.proxy_manager = ProxyManager.from_env()
+        if self.current_proxy:
+            return
+        if self._account_id() is not None:
+            # Same account → same IP where possible, so its session cookies stay valid
+            self.current_proxy = choose_proxy(self._account_id(), self.proxy_manager)
+        elif standalone:
+            self.current_proxy = await self.proxy_manager.get_healthy_proxy(retries=1)
+        else:
+            self.current_proxy = self.proxy_manager.pick()
+
+    def _account_id(self) -> int | None:
+        """DB id of the current account (None for guests and in-memory credentials)."""
+        return self.current_account.id if self.current_account else None
+
+    def _session_key(self) -> str:
+        """Sticky key for the local proxy: one upstream per account."""
+        if self._account_id() is not None:
+            return f"account-{self._account_id()}"
+        return self.current_account.username if self.current_account else "guest"
+
+    def _proxy_url(self) -> str | None:
+        """Proxy URL for non-browser clients: the local proxy (keyed by session) or the chosen proxy."""
+        if self.local_proxy:
+            return session_proxy_url(self.local_proxy, self._session_key())
+        return self.current_proxy or self.proxy
+
+    def _resolve_storage_state(self) -> dict | str | None:
+        """Return the session to reuse: injected state, DB account state or legacy auth.json path."""
         # Use storage state if explicitly provided (e.g. from Chrome extension via API)
         if self.storage_state:
             logger.info("♻️  Using injected session")
-            context_kwargs["storage_state"] = self.storage_state
+            return self.storage_state
         # Use storage state from DB if available
-        elif self.current_account and self.current_account.storage_state_json != "{}":
+        if self.current_account and self.current_account.storage_state_json != "{}":
             logger.info("♻️  Using session for account: %s", self.current_account.username)
-            context_kwargs["storage_state"] = self.current_account.storage_state
-        elif AUTH_STATE_FILE.exists():
+            return self.current_account.storage_state
+        if AUTH_STATE_FILE.exists():
             logger.info("♻️  Legacy reuse: auth.json")
-            context_kwargs["storage_state"] = str(AUTH_STATE_FILE)
+            return str(AUTH_STATE_FILE)
+        return None
 
-        self._context = await self._browser.new_context(**context_kwargs)
-        self._page = await self._context.new_page()
-        await apply_stealth(self._page)
-        logger.info("✅ Browser started for %s", self.current_account.username if self.current_account else "guest")
-        return True
-
-    async def _refresh_account_from_pool(self):
+    async def _refresh_account_from_pool(self, exclude_id: int | None = None):
         """Fetch the least recently used active account from DB."""
         with Session(engine) as session:
             statement = select(Account).where(Account.status == "active").order_by(Account.last_used)
+            if exclude_id is not None:
+                statement = statement.where(Account.id != exclude_id)
             results = session.exec(statement)
             self.current_account = results.first()
             if self.current_account:
@@ -207,7 +416,7 @@ class DomainScraper:
 
     async def _save_session_to_db(self):
         """Save current browser storage state to the database."""
-        if not self._context or not self.current_account:
+        if not self._context or not self.current_account or self.current_account.id is None:
             return
         
         try:
@@ -235,16 +444,19 @@ class DomainScraper:
             return False
 
         logger.info("🕵️ Verifying session for %s...", self.current_account.username)
+        error = None
         try:
             await page.goto(f"{BASE_URL}/", wait_until="networkidle", timeout=30000)
             await self._jitter_move()
             await self._human_wait(1, 0.5)
         except Exception as e:
+            error = e
             logger.warning("🕒 Nav error: %s", e)
         
         # Check if already logged in by looking for logout link
         if await page.query_selector('a[href*="logout"]'):
             logger.info("✅ Session persistent!")
+            self._record_login("reuse")
             await self._save_session_to_db()
             return True
 
@@ -253,6 +465,7 @@ class DomainScraper:
         # Let's try once if we have password
         if self.current_account.password:
             logger.info("🔑 Attempting auto-login for %s...", self.current_account.username)
+            error = None
             try:
                 await page.goto(LOGIN_URL, wait_until="networkidle")
                 await self._human_wait(1, 0.5)
@@ -260,14 +473,14 @@ class DomainScraper:
                 logger.info("⌨️ Typing username...")
                 await page.locator('input[name="username"]').click()
                 await self._human_wait(0.2, 0.1)
-                await page.locator('input[name="username"]').press_sequentially(self.current_account.username, delay=random.randint(60, 150))
+                await self._type(page.locator('input[name="username"]'), self.current_account.username, 60, 150)
                 
                 await self._human_wait(0.5, 0.2)
                 
                 logger.info("⌨️ Typing password...")
                 await page.locator('input[name="password"]').click()
                 await self._human_wait(0.2, 0.1)
-                await page.locator('input[name="password"]').press_sequentially(self.current_account.password, delay=random.randint(60, 150))
+                await self._type(page.locator('input[name="password"]'), self.current_account.password, 60, 150)
                 
                 await self._human_wait(1.5, 0.5)
                 await page.locator('button[type="submit"], input[type="submit"]').click()
@@ -275,45 +488,69 @@ class DomainScraper:
                 
                 if await page.query_selector('a[href*="logout"]'):
                     logger.info("🎉 Login SUCCESS!")
+                    self._record_login("relogin")
                     await self._save_session_to_db()
                     return True
             except Exception as e:
+                error = e
                 logger.error("❌ Login failed: %s", e)
         
+        self._record_login("failed", await self._login_failure_cause(page, error))
         return False
 
+    async def _login_failure_cause(self, page: Page, error: Exception | None) -> str:
+        """'banned' (block/challenge page), 'network' (navigation error) or 'credentials'."""
+        verdict = self.health_monitor.verdict
+        if verdict and verdict != LOGGED_OUT:
+            return "banned"
+        try:
+            content = (await page.content()).lower()
+        except Exception:
+            return "network"
+        if any(p in content for p in BAN_PHRASES):
+            return "banned"
+        return "network" if error is not None else "credentials"
+
+    def _record_login(self, kind: str, cause: str | None = None):
+        """Login metric + affinity feedback for the account's sticky proxy."""
+        record_login(self._account_id(), kind, self.current_proxy or self.proxy, cause)
+
     async def check_ban_and_rotate(self) -> bool:
-        """Enhanced health check: detect bans vs logouts."""
+        """Enhanced health check: detect bans vs logouts (monitor verdict first, page scan as fallback)."""
         if not self._page: return False
-        
-        curr_url = self._page.url
-        content = (await self._page.content()).lower()
-        
-        ban_indicators = ["ip address is blocked", "too many requests", "access denied", "robot"]
-        
-        if any(p in content for p in ban_indicators):
-            logger.warning("🚨 BAN DETECTED for %s", self.current_account.username if self.current_account else "IP")
-            if self.current_account:
-                with Session(engine) as session:
-                    db_acc = session.get(Account, self.current_account.id)
-                    if db_acc:
-                        db_acc.status = "banned"
-                        session.add(db_acc)
-                        session.commit()
-            return True
-            
-        if "/login/" in curr_url or "login" in content and "logout" not in content:
-            logger.warning("🔑 Session expired / Logout for %s", self.current_account.username if self.current_account else "guest")
-            if self.current_account:
-                with Session(engine) as session:
-                    db_acc = session.get(Account, self.current_account.id)
-                    if db_acc:
-                        db_acc.status = "needs_relogin"
-                        session.add(db_acc)
-                        session.commit()
-            return True
-            
-        return False
+
+        verdict = self.health_monitor.verdict
+        if verdict is None:
+            curr_url = self._page.url
+            content = (await self._page.content()).lower()
+            if any(p in content for p in BAN_PHRASES):
+                verdict = "banned"
+            elif "/login/" in curr_url or "login" in content and "logout" not in content:
+                verdict = LOGGED_OUT
+
+        if verdict is None:
+            return False
+
+        who = self.current_account.username if self.current_account else "IP"
+        if verdict == LOGGED_OUT:
+            logger.warning("🔑 Session expired / Logout for %s", who)
+            self._mark_account("needs_relogin")
+        else:
+            logger.warning("🚨 BAN DETECTED for %s (%s)", who, verdict)
+            if self.delay_scheduler:
+                self.delay_scheduler.record_ban()
+            self._mark_account("banned")
+        return True
+
+    def _mark_account(self, status: str):
+        if not self.current_account:
+            return
+        with Session(engine) as session:
+            db_acc = session.get(Account, self.current_account.id)
+            if db_acc:
+                db_acc.status = status
+                session.add(db_acc)
+                session.commit()
 
 
     async def fetch_candidates(
@@ -321,14 +558,207 @@ class DomainScraper:
         target_count: int = 10,
         start_page: int = 2,
         max_pages: int = 2,
+        resume: bool = False,
     ) -> AsyncGenerator[dict, None]:
         """
         Navigate to Deleted .com, apply filters, and yield domain candidates.
         Uses SIE (Stealth Interaction Engine) for human imitation.
+        With resume=True, continue from the account's stored cursor instead of start_page.
         """
         page = self._page
         assert page is not None, "Call start() first"
 
+        # From here on a redirect to /login/ means the session died mid-scrape
+        self.health_monitor.armed = True
+        try:
+            async for candidate in self._fetch_pages(page, target_count, start_page, max_pages, resume):
+                yield candidate
+        except SessionBlocked as e:
+            await self._capture_debug(self._page, f"blocked_{e.verdict}", error=True)
+            raise
+        finally:
+            self.health_monitor.armed = False
+
+    async def _fetch_pages(
+        self, page: Page, target_count: int, start_page: int, max_pages: int, resume: bool
+    ) -> AsyncGenerator[dict, None]:
+        resumed = False
+        if resume:
+            start_page = self._apply_cursor(start_page)
+            if self.listing_template:
+                resumed = await self._jump_to_page(page, start_page)
+        if not resumed:
+            await self._open_listing(page, start_page)
+        await self.health_monitor.probe(page)
+        await self._capture_listing_template(page)
+
+        found_count = 0
+        self._seen_streak = 0
+        for page_num in range(start_page, start_page + max_pages):
+            if found_count >= target_count:
+                break
+
+            logger.info("📄 Scraping page %d...", page_num)
+            
+            if self.delay_scheduler:
+                self.delay_scheduler.page_started()
+                pause = self.delay_scheduler.next_break()
+                if pause:
+                    logger.info("☕ Taking a big break (%.0fs)...", pause)
+                    await self._human_wait(base=pause, sigma=0, action="Taking a coffee break...")
+            elif (page_num - start_page) > 0 and (page_num - start_page) % 3 == 0:
+                logger.info("☕ Taking a big break...")
+                await self._human_wait(base=45, sigma=10, action="Taking a coffee break...")
+
+            try:
+                # Use standard 'Next' clicks for subsequent pages
+                if page_num > start_page:
+                    page = await self._maybe_recycle_context(page)
+                    logger.info("📄 Clicking 'Next' page ...")
+                    next_link = page.locator("a.next").first
+                    if await next_link.count() > 0:
+                        await self._human_wait(1.5, 0.5, action="Going to next page...")
+                        await next_link.click()
+                        await page.wait_for_load_state("networkidle")
+                    else:
+                        logger.warning("No 'Next' link found for scraping.")
+                        self._reset_cursor()  # Last page of the listing: the next run starts over
+                        break
+
+                await self.health_monitor.probe(page)
+                read_time = self.delay_scheduler.next_read() if self.delay_scheduler else None
+                await self._simulate_human_interaction(page, read_time)
+                
+                # Wait for the listing table specifically
+                try:
+                    await self.health_monitor.guard(page.wait_for_selector("table#listing", timeout=10000))
+                except SessionBlocked:
+                    raise
+                except Exception:
+                    logger.warning("   🕒 Timeout waiting for table#listing on page %d", page_num)
+
+                html = await page.content()
+            except SessionBlocked:
+                raise
+            except Exception as e:
+                logger.error("❌ Failed to load page %d: %s", page_num, e)
+                await self._capture_debug(page, f"load_fail_p{page_num}", error=True)
+                if self.delay_scheduler:
+                    self.delay_scheduler.page_finished()  # Its delays were spent: keep the plan in step
+                continue
+
+            # Parse domain table rows
+            self._archive_page(html, page_num)
+            rows = parse_listing_html(html, page_num)
+            self.last_page_done = page_num
+            self._pages_in_context += 1
+            if self.delay_scheduler:
+                self.delay_scheduler.page_finished()
+
+            if rows:
+                self._save_cursor(page_num + 1)
+            else:
+                logger.warning("   ⚠️ No rows found on page %d", page_num)
+                self._reset_cursor()
+                await self._capture_debug(page, f"no_rows_p{page_num}", error=True, html=html)
+
+            logger.info("   Found %d rows on page %d", len(rows), page_num)
+            if self._seen_limit_reached(rows):
+                break
+
+            for candidate in self._select_candidates(rows, target_count - found_count):
+                found_count += 1
+                logger.info("   ✅ [%d/%d] %s (BL: %d, Age: %d)", found_count, target_count, candidate["name"], candidate["bl"], candidate["age_years"])
+                yield candidate
+
+        logger.info("🏁 Human Flow: Scraping complete.")
+
+    def _select_candidates(self, rows: list[dict], limit: int) -> list[dict]:
+        """Apply the seen-domain, stop-word, age and site filters to parsed rows (at most `limit` results)."""
+        selected = []
+        for row in rows:
+            if len(selected) >= limit:
+                break
+
+            reason = self._reject_reason(row)
+            if reason:
+                logger.debug("   %s: %s", reason, row["name"])
+                continue
+
+            self._collected.add(row["name"])
+            selected.append({**row, "status": "pending"})
+        return selected
+
+    def _reject_reason(self, row: dict) -> str | None:
+        """Why a parsed row is dropped locally, or None if it would be selected."""
+        domain_name = row["name"]
+        if domain_name in self._collected or self.seen_index is not None and domain_name in self.seen_index:
+            return "⏭️ Already collected earlier"
+
+        # Apply local stop-word filter
+        if not is_clean_domain(domain_name):
+            return "🚫 Filtered out (stop-word)"
+
+        # Age check (double-verify)
+        if row["age_years"] > 0 and row["age_years"] < MIN_AGE_YEARS:
+            return f"🚫 Filtered out (too young, {row['age_years']} years)"
+
+        if not passes_site_filters(row, self.site_filters):
+            return "🚫 Filtered out (BL/length)"
+        return None
+
+    def _archive_page(self, html: str, page_num: int):
+        if self.page_archive is not None:
+            account = self.current_account.username if self.current_account else None
+            self.page_archive.submit(html, page_num, task_id=self.task_id, account=account)
+
+    def _apply_cursor(self, start_page: int) -> int:
+        """Load the stored cursor for this account + filters; returns the page to start from."""
+        if not self.current_account or self.current_account.id is None:
+            return start_page
+        cursor = load_cursor(self.current_account.id, filter_signature(self.site_filters))
+        if not cursor:
+            return start_page
+        if cursor.listing_template_json != "{}":
+            self.listing_template = cursor.listing_template
+            self.sorted_by_bl = cursor.sorted_by_bl
+        logger.info("⏯️ Resuming %s from page %d", self.current_account.username, cursor.next_page)
+        return max(start_page, cursor.next_page)
+
+    def _save_cursor(self, next_page: int):
+        if not self.current_account or self.current_account.id is None:
+            return
+        save_cursor(
+            self.current_account.id,
+            filter_signature(self.site_filters),
+            next_page,
+            self.listing_template,
+            self.sorted_by_bl,
+        )
+
+    def _reset_cursor(self):
+        if not self.current_account or self.current_account.id is None:
+            return
+        reset_cursor(self.current_account.id, filter_signature(self.site_filters))
+
+    def _seen_limit_reached(self, rows: list[dict]) -> bool:
+        """
+        Track consecutive exhausted pages: no row both unseen and passing the filters.
+        True once the limit is hit.
+        """
+        if self.seen_index is None or not self.max_seen_pages or not rows:
+            return False
+        if any(self._reject_reason(row) is None for row in rows):
+            self._seen_streak = 0
+        else:
+            self._seen_streak += 1
+        if self._seen_streak >= self.max_seen_pages:
+            logger.info("⏹️ %d pages in a row had nothing new, stopping.", self._seen_streak)
+            return True
+        return False
+
+    async def _open_listing(self, page: Page, start_page: int):
+        """Human-like navigation: home page, Deleted .com tab, filters, BL sort, then start_page."""
         # 1. Natural Navigation: Start at Home, wait, then go to Section
         logger.info("🌐 Human Flow: Visiting home page first...")
         await page.goto(f"{BASE_URL}/", wait_until="networkidle")
@@ -348,8 +778,8 @@ class DomainScraper:
             
         await self._simulate_human_interaction(page)
         
-        # Debug: capture state before filters to verify auth
-        await page.screenshot(path="debug_before_filters.png")
+        # Debug: capture state before filters to verify auth (sampled)
+        await self._capture_debug(page, "before_filters")
         await self._human_wait(base=3, sigma=1, action="Analyzing domain list...")
 
         # Apply filters: .com, age >= 5
@@ -373,10 +803,13 @@ class DomainScraper:
                     if age_input:
                         await age_input.click()
                         await self._human_wait(0.2, 0.1)
-                        await page.locator(f'input[name="{age_name}"]').press_sequentially(str(MIN_AGE_YEARS), delay=random.randint(50, 150))
+                        await self._type(page.locator(f'input[name="{age_name}"]'), str(MIN_AGE_YEARS), 50, 150)
                         age_set = True
                         break
 
+            if await self._apply_filter_pushdown(page):
+                age_set = True
+
             apply_btn = await page.query_selector('input[name="button_submit"], button[type="submit"]')
             if apply_btn:
                 logger.info("🚀 Human Flow: Submitting filters...")
@@ -404,12 +837,18 @@ class DomainScraper:
                 await self._human_wait(1.5, 0.5, action="Sorting by BL...")
                 await bl_sort_link.click()
                 await page.wait_for_load_state("networkidle")
+                self.sorted_by_bl = True
                 await self._simulate_human_interaction(page)
         except Exception as e:
             logger.warning("Error clicking BL sort: %s", e)
 
         current_page_on_site = 1
-        logger.info("🚶‍♂️ Human Flow: Navigating to start page %d via clicks...", start_page)
+        if start_page > 1 and self.direct_pagination:
+            if await self._jump_to_page(page, start_page):
+                current_page_on_site = start_page
+
+        if current_page_on_site < start_page:
+            logger.info("🚶‍♂️ Human Flow: Navigating to start page %d via clicks...", start_page)
         while current_page_on_site < start_page:
             try:
                 next_link = page.locator("a.next").first
@@ -426,192 +865,147 @@ class DomainScraper:
                 logger.error("Error navigating: %s", e)
                 break
 
-        found_count = 0
-        for page_num in range(start_page, start_page + max_pages):
-            if found_count >= target_count:
+    async def _apply_filter_pushdown(self, page: Page) -> bool:
+        """
+        Fill the site's own filter inputs (min BL, length, excluded keywords)
+        so rows we would drop locally are never sent. Returns True if any field was set.
+        """
+        pushed = []
+        for key, value in self.site_filters.items():
+            for field_name in SITE_FILTER_FIELDS.get(key, []):
+                selector = f'input[name="{field_name}"], textarea[name="{field_name}"]'
+                field = await page.query_selector(selector)
+                if not field:
+                    continue
+                await field.click()
+                await self._human_wait(0.2, 0.1)
+                if key == "exclude":
+                    # Long keyword list: pasted, not typed
+                    await page.locator(selector).first.fill(str(value))
+                else:
+                    await self._type(page.locator(selector).first, str(value), 50, 150)
+                pushed.append(field_name)
                 break
 
-            logger.info("📄 Scraping page %d...", page_num)
-            
-            if (page_num - start_page) > 0 and (page_num - start_page) % 3 == 0:
-                logger.info("☕ Taking a big break...")
-                await self._human_wait(base=45, sigma=10, action="Taking a coffee break...")
-
-            try:
-                # Use standard 'Next' clicks for subsequent pages
-                if page_num > start_page:
-                    logger.info("📄 Clicking 'Next' page ...")
-                    next_link = page.locator("a.next").first
-                    if await next_link.count() > 0:
-                        await self._human_wait(1.5, 0.5, action="Going to next page...")
-                        await next_link.click()
-                        await page.wait_for_load_state("networkidle")
-                    else:
-                        logger.warning("No 'Next' link found for scraping.")
-                        break
-                        
-                await self._simulate_human_interaction(page)
-                
-                # Wait for the listing table specifically
-                try:
-                    await page.wait_for_selector("table#listing", timeout=10000)
-                except Exception:
-                    logger.warning("   🕒 Timeout waiting for table#listing on page %d", page_num)
-                
-                rows = await page.query_selector_all("table#listing tr")
-                for row in rows:
-                    if found_count >= target_count:
-                        break
-
-                    try:
-                        name_cell = await row.query_selector("a.namelinks")
-                        if not name_cell: continue
-                        
-                        domain_name = (await name_cell.inner_text()).strip().lower()
-                        
-                        bl_cell = await row.query_selector("td.field_bl")
-                        bl_value = 0
-                        if bl_cell:
-                            bl_text = (await bl_cell.inner_text()).strip().replace(",", "")
-                            bl_value = int(bl_text) if bl_text.isdigit() else 0
-
-                        age_cell = await row.query_selector("td.field_abirth")
-                        age_value = 0
-                        if age_cell:
-                            age_text = (await age_cell.inner_text()).strip()
-                            if age_text.isdigit():
-                                birth_year = int(age_text)
-                                age_value = 2026 - birth_year
-
-                        if not is_clean_domain(domain_name): continue
-                        if age_value > 0 and age_value < MIN_AGE_YEARS: continue
-
-                        candidate = {
-                            "name": domain_name,
-                            "bl": bl_value,
-                            "age_years": age_value,
-                            "source_page": page_num,
-                            "status": "pending",
-                        }
-                        found_count += 1
-                        yield candidate
-
-                    except Exception as e:
-                        continue
-
-            except Exception as e:
-                logger.error("❌ Failed to load page %d: %s", page_num, e)
-                continue
-
-            # Parse domain table rows
-            rows = await page.query_selector_all("table#listing tr")
-
-            if not rows:
-                debug_path = Path(__file__).resolve().parent.parent / f"search_fail_p{page_num}.png"
-                await page.screenshot(path=str(debug_path))
-                logger.warning("   ⚠️ No rows found on page %d. Screenshot saved to %s", page_num, debug_path)
-                # Log a bit of HTML to see what's up
-                content = await page.content()
-                logger.debug("   📄 Content snippet: %s...", content[:500].replace('\n', ' '))
-
-            logger.info("   Found %d rows on page %d", len(rows), page_num)
-
-            for row in rows:
-                if found_count >= target_count:
-                    break
+        if pushed:
+            logger.info("🧹 Human Flow: Pushed filters to site: %s", ", ".join(pushed))
+        return bool(pushed)
+
+    async def _capture_listing_template(self, page: Page) -> bool:
+        """Capture the filter/sort/offset URL template from the current listing page (once per session)."""
+        if not self.listing_template:
+            next_href = None
+            next_link = page.locator("a.next").first
+            if await next_link.count() > 0:
+                next_href = await next_link.get_attribute("href")
+            self.listing_template = capture_listing_template(page.url, next_href)
+        return bool(self.listing_template)
+
+    async def _jump_to_page(self, page: Page, page_num: int) -> bool:
+        """
+        Navigate straight to a listing page by URL.
+        The offset/sort template is captured from the filtered page 1 once per session;
+        the referer points at the previous page so the chain looks like a 'Next' click.
+        """
+        try:
+            if not await self._capture_listing_template(page):
+                logger.warning("Could not capture listing URL template from %s", page.url)
+                return False
 
-                try:
-                    # Extract domain name
-                    name_cell = await row.query_selector("a.namelinks")
-                    if not name_cell:
-                        continue
-
-                    domain_name = (await name_cell.inner_text()).strip().lower()
-
-                    # Extract BL (backlinks)
-                    bl_cell = await row.query_selector("td.field_bl")
-                    bl_value = 0
-                    if bl_cell:
-                        bl_text = (await bl_cell.inner_text()).strip().replace(",", "")
-                        bl_value = int(bl_text) if bl_text.isdigit() else 0
-
-                    # Extract age (Whois Birth Year)
-                    age_cell = await row.query_selector("td.field_abirth")
-                    age_value = 0
-                    if age_cell:
-                        age_text = (await age_cell.inner_text()).strip()
-                        if age_text.isdigit():
-                            birth_year = int(age_text)
-                            if 1980 <= birth_year <= 2026:
-                                age_value = 2026 - birth_year
-                        elif "Page Content" in age_text: # Handle potential placeholders
-                            age_value = 0
-
-                    # Apply local stop-word filter
-                    if not is_clean_domain(domain_name):
-                        logger.debug("   🚫 Filtered out (stop-word): %s", domain_name)
-                        continue
-
-                    # Age check (double-verify)
-                    if age_value > 0 and age_value < MIN_AGE_YEARS:
-                        logger.debug("   🚫 Filtered out (too young): %s (%d years)", domain_name, age_value)
-                        continue
-
-                    candidate = {
-                        "name": domain_name,
-                        "bl": bl_value,
-                        "age_years": age_value,
-                        "source_page": page_num,
-                        "status": "pending",
-                    }
-                    found_count += 1
-                    logger.info("   ✅ [%d/%d] %s (BL: %d, Age: %d)", found_count, target_count, domain_name, bl_value, age_value)
-                    yield candidate
-
-                except Exception as e:
-                    logger.debug("   ⚠️ Error parsing row: %s", e)
-                    continue
+            target_url = build_page_url(self.listing_template, page_num)
+            referer = build_page_url(self.listing_template, page_num - 1)
+            logger.info("⏭️ Human Flow: Jumping to page %d via URL...", page_num)
+            await self._human_wait(2, 0.5, action=f"Going to page {page_num}...")
+            await page.goto(target_url, wait_until="networkidle", referer=referer)
+            return True
+        except SessionBlocked:
+            raise
+        except Exception as e:
+            logger.warning("Direct jump to page %d failed, falling back to clicks: %s", page_num, e)
+            return False
 
-        logger.info("🏁 Human Flow: Scraping complete.")
+    async def _capture_debug(self, page: Page | None, label: str, error: bool = False, html: str | None = None):
+        """Hand a screenshot/HTML to the debug artifact writer (sampled unless error=True)."""
+        if page is None or not self.debug_artifacts:
+            return
+        await self.debug_artifacts.capture(page, self.task_id, label, error=error, html=html)
 
-    async def _simulate_human_interaction(self, page: Page):
-        """High-fidelity human behavior simulation."""
+    async def _simulate_human_interaction(self, page: Page, read_time: float | None = None):
+        """High-fidelity human behavior simulation (read_time: planned reading pause, if scheduled)."""
         try:
             # 1. Jittery/Natural Scroll
             scroll_depth = random.randint(300, 800)
             await self._quivering_scroll(scroll_depth)
             
             # 2. Mouse Jitter during "reading"
-            await self._human_wait(base=3, sigma=1)
+            if read_time is None:
+                await self._human_wait(base=3, sigma=1)
+            else:
+                await self._human_wait(base=read_time, sigma=0, action="Reading page...")
             await self._jitter_move()
             
             # 3. Random small scroll back Up
             if random.random() < 0.4:
                 await self._quivering_scroll(-random.randint(50, 150))
                 
+        except SessionBlocked:
+            raise
         except Exception as e:
             logger.debug("⚠️ STEALTH: Human interaction simulation failed: %s", e)
 
     async def rotate_proxy(self):
-        """Switch to a new proxy if manager is available."""
+        """Switch to a new proxy if manager is available (new context, same browser)."""
+        if self.local_proxy:
+            # Rotation happens behind the local port: same context, only its tunnels are reopened
+            return await rotate_local_session(self.local_proxy, self._session_key())
         if self.proxy_manager:
-            new_proxy = await self.proxy_manager.get_healthy_proxy(retries=1)
+            self.proxy_manager.report_failure(self.current_proxy)
+            account_id = self._account_id()
+            if account_id is not None:
+                record_proxy_result(account_id, self.current_proxy, ok=False)
+                new_proxy = choose_proxy(account_id, self.proxy_manager, exclude=self.current_proxy)
+            else:
+                new_proxy = self.proxy_manager.pick(exclude=self.current_proxy)
             if new_proxy and new_proxy != self.current_proxy:
                 self.current_proxy = new_proxy
                 self.proxy = new_proxy
                 logger.info("🔄 Rotated to new proxy: %s", new_proxy)
-                # Proxy changes require a browser restart
-                await self.close()
-                await self.start()
+                await self._switch_context()
                 return True
             else:
                 logger.warning("🔄 Tried to rotate proxy but no valid new proxy found.")
                 return False
         return False
 
+    async def rotate_account(self) -> bool:
+        """Switch to the next pool account and its saved session (new context, same browser)."""
+        previous = self.current_account
+        await self._close_context()  # Saves the old account's session first
+        await self._refresh_account_from_pool(exclude_id=previous.id if previous else None)
+        if not self.current_account:
+            self.current_account = previous
+            logger.warning("🔄 Tried to rotate account but no other active account found.")
+            await self._switch_context()
+            return False
+        # Credentials/injected session belonged to the previous identity
+        self.username = self.password = None
+        self.storage_state = None
+        if self.proxy_manager and not self.local_proxy and self._account_id() is not None:
+            # The new account goes back to its own sticky proxy, not the previous account's
+            proxy = choose_proxy(self._account_id(), self.proxy_manager)
+            if proxy:
+                self.current_proxy = self.proxy = proxy
+        logger.info("🔄 Rotated to account: %s (proxy %s)", self.current_account.username, self.current_proxy or "direct")
+        await self._switch_context()
+        return True
+
     async def close(self):
         """Clean up browser resources."""
+        if self.delay_scheduler:
+            self.delay_scheduler.save_run()
         if self._browser:
+            stats = self.resource_stats
+            stats["peak_browser_rss_mb"] = max(stats["peak_browser_rss_mb"], self.browser_rss_mb())
             await self._browser.close()
         if self._pw:
             await self._pw.stop()
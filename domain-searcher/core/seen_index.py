@@ -0,0 +1,121 @@
+"""
+Seen-domain index for incremental ("new since last run") scraping.
+@developer: Exact set for names stored within recent_days (authoritative for that window) + Bloom
+            filter for older names only. Recent names age into the filter; a full filter gets a
+            bigger, tighter one chained after it, so the false-positive rate stays bounded.
+@analyst: Membership checks never touch the DB; false positives are bounded by error_rate.
+"""
+
+import hashlib
+import math
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, func, select
+
+from core.logger import setup_logger
+from core.models import DomainResult, engine
+
+logger = setup_logger("seen_index")
+
+SWEEP_INTERVAL = timedelta(hours=1)  # How often recent names past the window move into the filter
+GROWTH = 2  # Capacity multiplier for each chained filter
+TIGHTENING = 0.5  # Error-rate multiplier for each chained filter (total stays under error_rate)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter with double hashing over a blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.count = 0
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    @property
+    def full(self) -> bool:
+        """Past its capacity the false-positive rate climbs above the one it was sized for."""
+        return self.count >= self.capacity
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class SeenDomainIndex:
+    """Answers 'did any earlier task already collect this domain?' in memory."""
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001, recent_days: int = 7):
+        self.error_rate = error_rate
+        self.recent_days = recent_days
+        # Sum of the chained error rates: error_rate/2 + error_rate/4 + ... < error_rate
+        self._filters = [BloomFilter(capacity, error_rate * TIGHTENING)]
+        self._recent: dict[str, datetime] = {}  # Name → when it was stored
+        self._next_sweep = datetime.utcnow() + SWEEP_INTERVAL
+
+    @classmethod
+    def from_db(cls, error_rate: float = 0.001, recent_days: int = 7, headroom: int = 2) -> "SeenDomainIndex":
+        """Build the index from every stored DomainResult name."""
+        cutoff = datetime.utcnow() - timedelta(days=recent_days)
+        with Session(engine) as session:
+            total = session.exec(select(func.count(DomainResult.id))).one()
+            index = cls(capacity=max(total * headroom, 10_000), error_rate=error_rate, recent_days=recent_days)
+            for name, found_at in session.exec(select(DomainResult.name, DomainResult.found_at)):
+                if found_at and found_at >= cutoff:
+                    index._recent[name] = max(found_at, index._recent.get(name, found_at))
+                else:
+                    index._add_old(name)
+        logger.info("🧠 Seen-domain index built: %d stored, %d recent", total, len(index._recent))
+        return index
+
+    def add(self, name: str, found_at: datetime | None = None):
+        """Record a stored domain (exact while it is recent)."""
+        now = datetime.utcnow()
+        self._recent[name] = found_at or now
+        if now >= self._next_sweep:
+            self._age_out(now)
+
+    def _add_old(self, name: str):
+        bloom = self._filters[-1]
+        if bloom.full:
+            bloom = BloomFilter(bloom.capacity * GROWTH, self.error_rate * TIGHTENING ** (len(self._filters) + 1))
+            self._filters.append(bloom)
+            logger.info("🧠 Seen-domain filter full, chained one for %d more names", bloom.capacity)
+        bloom.add(name)
+
+    def _age_out(self, now: datetime):
+        """Move names stored before the recent window into the Bloom filter."""
+        cutoff = now - timedelta(days=self.recent_days)
+        expired = [name for name, found_at in self._recent.items() if found_at < cutoff]
+        for name in expired:
+            del self._recent[name]
+            self._add_old(name)
+        self._next_sweep = now + SWEEP_INTERVAL
+
+    def __contains__(self, name: str) -> bool:
+        if name in self._recent:
+            return True
+        return any(name in bloom for bloom in self._filters)
+
+
+_index: SeenDomainIndex | None = None
+
+
+def get_seen_index() -> SeenDomainIndex:
+    """Process-wide index, built from the DB on first use."""
+    global _index
+    if _index is None:
+        _index = SeenDomainIndex.from_db()
+    return _index
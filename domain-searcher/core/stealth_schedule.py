@@ -0,0 +1,224 @@
+"""
+Stealth delay budget scheduler.
+@developer: Plans a whole session's read/break delays to hit a pages-per-hour target
+            while keeping human-like (log-normal) variance. Re-plans as real work time is observed.
+@analyst: Every session is stored in StealthRun, so ban rates per profile can be compared.
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlmodel import Session, func, select
+
+from core.clock import RealClock
+from core.logger import setup_logger
+from core.models import StealthRun, engine
+
+logger = setup_logger("stealth_schedule")
+
+
+@dataclass(frozen=True)
+class RiskProfile:
+    name: str
+    min_read_s: float   # Floor for the per-page "reading" pause
+    cv: float           # Coefficient of variation of every delay (human variance)
+    break_every: int    # Mean number of pages between long breaks
+    break_share: float  # Fraction of the delay budget spent in long breaks
+
+
+PROFILES = {
+    "cautious": RiskProfile("cautious", min_read_s=4.0, cv=0.5, break_every=3, break_share=0.45),
+    "balanced": RiskProfile("balanced", min_read_s=2.5, cv=0.4, break_every=5, break_share=0.3),
+    "fast": RiskProfile("fast", min_read_s=1.0, cv=0.3, break_every=10, break_share=0.15),
+}
+DEFAULT_PROFILE = "balanced"
+
+
+def lognormal(rng: random.Random, mean: float, cv: float) -> float:
+    """Positive sample with the given mean and coefficient of variation."""
+    if mean <= 0:
+        return 0.0
+    sigma2 = math.log(1 + cv * cv)
+    return rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+
+
+class DelayScheduler:
+    """
+    Plans per-page read pauses and long breaks for a session of `planned_pages` pages.
+
+    Usage (once per page, failed loads included): page_started() → next_break() / next_read() → page_finished().
+    The session's time budget starts with the first page_started(), not at construction,
+    so browser startup and login are not paid for out of the reading pauses.
+    """
+
+    def __init__(
+        self,
+        target_pages_per_hour: float,
+        profile: str = DEFAULT_PROFILE,
+        planned_pages: int = 10,
+        clock: RealClock | None = None,
+        work_estimate_s: float = 3.0,
+        rng: random.Random | None = None,
+    ):
+        self.target_pages_per_hour = target_pages_per_hour
+        if profile not in PROFILES:
+            logger.warning("⚠️ Unknown stealth profile %r (expected %s), using %s",
+                           profile, " | ".join(PROFILES), DEFAULT_PROFILE)
+            profile = DEFAULT_PROFILE
+        self.profile = PROFILES[profile]
+        self.planned_pages = max(1, planned_pages)
+        self.clock = clock or RealClock()
+        self.rng = rng or random.Random()
+        self.page_budget_s = 3600 / target_pages_per_hour
+        self.work_estimate_s = work_estimate_s  # EWMA of non-delay time per page
+        self.pages_done = 0
+        self.banned = False
+        self._reads: list[float] = []
+        self._breaks: list[float] = []
+        self._page_started_at: float | None = None
+        self._delay_this_page = 0.0
+        self._session_started_at: float | None = None  # Set by the first page_started()
+        self._session_started_wall: datetime | None = None  # Same moment, for StealthRun.started_at
+        self._run_id: int | None = None
+        self._warned_unreachable = False
+        self._sample_shape()
+        self._plan()
+
+    # --- Planning ---
+
+    def _sample_shape(self):
+        """Draw the session's relative delays once: log-normal reads, breaks every ~N pages."""
+        p = self.profile
+        self._read_shape = [lognormal(self.rng, 1.0, p.cv) for _ in range(self.planned_pages)]
+        self._break_shape = [0.0] * self.planned_pages
+        gap = self._next_break_gap()
+        for i in range(1, self.planned_pages):
+            gap -= 1
+            if gap <= 0:
+                self._break_shape[i] = lognormal(self.rng, 1.0, p.cv)
+                gap = self._next_break_gap()
+
+    def _plan(self):
+        """Scale the remaining pages' delays so the session ends on the target rate."""
+        reads = self._read_shape[self.pages_done:]
+        breaks = self._break_shape[self.pages_done:]
+        if not reads:
+            self._reads, self._breaks = [], []
+            return
+        p = self.profile
+        budget = self._remaining_delay_budget(len(reads))
+        read_total, break_total = sum(reads), sum(breaks)
+        break_budget = budget * p.break_share if break_total else 0.0
+        read_scale = (budget - break_budget) / read_total
+        break_scale = break_budget / break_total if break_total else 0.0
+
+        self._reads = [max(p.min_read_s, r * read_scale) for r in reads]
+        self._breaks = [b * break_scale for b in breaks]
+        if sum(self._reads) > budget + 1e-6 and not self._warned_unreachable:
+            self._warned_unreachable = True
+            logger.warning("⚠️ %s profile cannot reach %.0f pages/h (floor %.1fs/page, work ~%.1fs/page)",
+                           p.name, self.target_pages_per_hour, p.min_read_s, self.work_estimate_s)
+
+    def _next_break_gap(self) -> int:
+        every = self.profile.break_every
+        return max(1, round(self.rng.uniform(0.6, 1.4) * every))
+
+    def _remaining_delay_budget(self, remaining_pages: int) -> float:
+        """Seconds of delay left so the session ends on the target rate."""
+        now = self.clock.monotonic()
+        started = self._session_started_at if self._session_started_at is not None else now
+        deadline = started + self.planned_pages * self.page_budget_s
+        left = deadline - now - remaining_pages * self.work_estimate_s
+        return max(left, 0.0)
+
+    # --- Per-page API ---
+
+    def page_started(self):
+        self._page_started_at = self.clock.monotonic()
+        self._delay_this_page = 0.0
+        if self._session_started_at is None:
+            self._session_started_at = self._page_started_at
+            self._session_started_wall = datetime.utcnow()
+            self._plan()
+
+    def next_break(self) -> float:
+        """Long break due before this page (0 if none)."""
+        delay = self._breaks.pop(0) if self._breaks else 0.0
+        self._delay_this_page += delay
+        return delay
+
+    def next_read(self) -> float:
+        """Reading pause for this page."""
+        delay = self._reads.pop(0) if self._reads else self.profile.min_read_s
+        self._delay_this_page += delay
+        return delay
+
+    def page_aborted(self):
+        """Forget the current page without counting it (it will be started again elsewhere)."""
+        self._page_started_at = None
+        self._delay_this_page = 0.0
+
+    def page_finished(self):
+        """Update the work-time estimate and re-plan the rest of the session."""
+        if self._page_started_at is not None:
+            work = max(0.0, self.clock.monotonic() - self._page_started_at - self._delay_this_page)
+            self.work_estimate_s = 0.7 * self.work_estimate_s + 0.3 * work
+        self.pages_done += 1
+        self._page_started_at = None
+        self._plan()
+
+    # --- Outcome tracking ---
+
+    def record_ban(self):
+        self.banned = True
+
+    def achieved_pages_per_hour(self) -> float:
+        if self._session_started_at is None:
+            return 0.0
+        elapsed = self.clock.monotonic() - self._session_started_at
+        return self.pages_done / elapsed * 3600 if elapsed > 0 else 0.0
+
+    def save_run(self):
+        """Persist this session's outcome (idempotent: updates the same row)."""
+        try:
+            with Session(engine) as session:
+                run = session.get(StealthRun, self._run_id) if self._run_id else None
+                finished_at = datetime.utcnow()
+                run = run or StealthRun(
+                    profile=self.profile.name,
+                    target_pages_per_hour=self.target_pages_per_hour,
+                    started_at=self._session_started_wall or finished_at,
+                )
+                run.pages = self.pages_done
+                run.banned = self.banned
+                run.achieved_pages_per_hour = round(self.achieved_pages_per_hour(), 1)
+                run.finished_at = finished_at
+                session.add(run)
+                session.commit()
+                self._run_id = run.id
+        except Exception as e:
+            logger.error("❌ Failed to save stealth run: %s", e)
+
+
+def ban_rates() -> list[dict]:
+    """Ban rate and achieved speed per profile and target rate."""
+    with Session(engine) as session:
+        statement = select(
+            StealthRun.profile,
+            StealthRun.target_pages_per_hour,
+            func.count(StealthRun.id),
+            func.sum(StealthRun.banned),
+            func.avg(StealthRun.achieved_pages_per_hour),
+        ).group_by(StealthRun.profile, StealthRun.target_pages_per_hour)
+        return [
+            {
+                "profile": profile,
+                "target_pages_per_hour": target,
+                "runs": runs,
+                "ban_rate": round((bans or 0) / runs, 3) if runs else 0.0,
+                "avg_pages_per_hour": round(avg or 0.0, 1),
+            }
+            for profile, target, runs, bans, avg in session.exec(statement)
+        ]
@@ -14,7 +14,7 @@ logger = setup_logger("verifier")
 
 DomainStatus = Literal["available", "taken", "error"]
 
-async def check_domain_rdap(domain: str) -> DomainStatus:
+async def check_domain_rdap(domain: str, proxy: str | None = None) -> DomainStatus:
     """
     Check domain availability via the official Verisign RDAP (Registry Data Access Protocol) API over HTTPS.
     This fulfills the requirement of 'Checking through a registrar/registry API' and is much more
@@ -27,7 +27,7 @@ async def check_domain_rdap(domain: str) -> DomainStatus:
     """
     url = f"https://rdap.verisign.com/com/v1/domain/{domain}"
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with httpx.AsyncClient(timeout=10.0, proxy=proxy) as client:
             response = await client.get(url)
             
             if response.status_code == 404:
@@ -46,6 +46,7 @@ async def verify_domains(
     candidates: list[dict],
     rate_limit_delay: float = 1.0,
     on_progress: callable = None,
+    proxy_manager=None,
 ) -> list[dict]:
     """
     Verify a list of domain candidates for availability via API.
@@ -54,6 +55,7 @@ async def verify_domains(
         candidates: List of {"name": str, "bl": int, ...} dicts.
         rate_limit_delay: Seconds between queries to avoid API rate limits.
         on_progress: Optional callback(domain_dict) for real-time UI updates.
+        proxy_manager: Optional scored ProxyManager; each query takes pick(), failures are reported back.
 
     Returns:
         List of candidates with updated "status" field.
@@ -65,7 +67,10 @@ async def verify_domains(
         domain = candidate["name"]
         logger.info("🔎 [%d/%d] API Rest Verifying: %s", i + 1, total, domain)
 
-        status = await check_domain_rdap(domain)
+        proxy = proxy_manager.pick() if proxy_manager else None
+        status = await check_domain_rdap(domain, proxy)
+        if status == "error" and proxy:
+            proxy_manager.report_failure(proxy)
         candidate["status"] = status
 
         if status == "available":
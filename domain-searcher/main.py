@@ -19,6 +19,7 @@ import os
 import random
 import string
 from pathlib import Path
+from urllib.parse import urlsplit
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, HTTPException
@@ -28,8 +29,21 @@ from contextlib import asynccontextmanager
 from pydantic import BaseModel
 from typing import Dict, Any, List
 
-from core.scraper import DomainScraper, apply_stealth
+from core.scraper import DomainScraper, apply_stealth, MIN_AGE_YEARS
+from core.filters import build_site_filters
+from core.http_scraper import HttpScraper
+from core.coordinator import ShardedScraper, healthy_accounts
+from core.ranking import fetch_top_candidates
+from core.seen_index import get_seen_index
+from core.proxy_manager import get_proxy_pool
+from utils.async_proxy import AsyncProxyServer
+from core.page_archive import PageArchive
+from core.debug_artifacts import get_debug_artifacts
+from core.asset_cache import get_asset_cache
+from core.stealth_schedule import DelayScheduler, ban_rates
+from core.affinity import relogin_stats
 from core.verifier import verify_domains
+from core.ban_detector import SessionBlocked
 from core.logger import setup_logger
 from core.models import init_db, SearchTask, DomainResult, engine, Account
 from sqlmodel import Session, select
@@ -43,6 +57,22 @@ logger.info("📦 Initializing database...")
 init_db()
 logger.info("✅ Database initialized.")
 
+async def start_local_proxy(proxy_pool) -> AsyncProxyServer | None:
+    """LOCAL_PROXY_URL on loopback: serve it in-process, balancing the shared pool (sticky per account)."""
+    url = urlsplit(os.getenv("LOCAL_PROXY_URL", ""))
+    if url.hostname not in ("127.0.0.1", "localhost") or not url.port:
+        return None
+    server = AsyncProxyServer(
+        host="127.0.0.1", port=url.port, proxy_manager=proxy_pool, mode="sticky", cache=get_asset_cache()
+    )
+    try:
+        await server.start()
+    except OSError as e:
+        logger.warning("⚠️ Local proxy port %d busy (%s), assuming an external instance", url.port, e)
+        return None
+    logger.info("🔀 Local proxy on %s over %d upstreams", url.geturl(), len(proxy_pool.proxies))
+    return server
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Re-verify and set policy on startup
@@ -58,7 +88,19 @@ async def lifespan(app: FastAPI):
             logger.info("🔧 Lifespan: WindowsProactorEventLoopPolicy enforced.")
         except Exception as e:
             logger.warning("🔧 Lifespan: Could not set policy or get loop: %s", e)
+    # Build the seen-domain index once, so searches skip known names without DB round trips
+    get_seen_index()
+    # Keep the proxy pool scored in the background; searches pick from it without inline checks
+    proxy_pool = get_proxy_pool()
+    proxy_pool.start_monitor()
+    local_proxy = await start_local_proxy(proxy_pool)
     yield
+    if local_proxy:
+        await local_proxy.close()
+    await proxy_pool.stop_monitor()
+    if page_archive:
+        # Queued pages would be lost with the daemon writer thread
+        await asyncio.to_thread(page_archive.close)
 
 app = FastAPI(title="Domain Searcher", version="1.0.0", lifespan=lifespan)
 
@@ -69,6 +111,9 @@ app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 # In-memory results store (per session)
 _last_results: list[dict] = []
 
+# Raw listing pages archive (PAGE_ARCHIVE=1), shared by all searches
+page_archive = PageArchive() if os.getenv("PAGE_ARCHIVE", "0") == "1" else None
+
 
 @app.get("/", response_class=HTMLResponse)
 async def index():
@@ -114,7 +159,9 @@ async def upload_session(data: SessionUpload):
 async def websocket_search(ws: WebSocket):
     """
     WebSocket endpoint for domain search with real-time progress.
-    Client sends: {"target_count": 10, "username": "manager_1"}
+    Client sends: {"target_count": 10, "username": "manager_1", "shards": 1, "max_pages": 2, "ranked": false,
+                   "min_bl": 0, "max_length": null, "only_new": true,
+                   "resume": false}
     """
     global _last_results
     await ws.accept()
@@ -123,12 +170,31 @@ async def websocket_search(ws: WebSocket):
     try:
         # Wait for search parameters
         data = await ws.receive_json()
-        target_count = data.get("target_count", 10)
         username = data.get("username", "").strip()
+        ranked = bool(data.get("ranked", False))
+        only_new = bool(data.get("only_new", True))
+        resume = bool(data.get("resume", False))
+        try:
+            target_count = int(data.get("target_count", 10))
+            shards = int(data.get("shards", 1))
+            max_pages = int(data.get("max_pages", 2))
+            max_length = data.get("max_length")
+            site_filters = build_site_filters(
+                min_bl=int(data.get("min_bl", 0)),
+                min_age_years=MIN_AGE_YEARS,
+                max_length=int(max_length) if max_length is not None else None,
+            )
+        except (TypeError, ValueError) as e:
+            await ws.send_json({"type": "error", "message": f"❌ Некорректные параметры поиска: {e}"})
+            return
         
         if not username:
              await ws.send_json({"type": "error", "message": "❌ Укажите ID сотрудника (username)"})
              return
+        if resume and shards > 1:
+            # Cursors are per account; shards split a fixed page range between accounts
+            await ws.send_json({"type": "error", "message": "❌ Продолжение с места остановки (resume) недоступно при shards > 1"})
+            return
              
         logger.info("🎯 Search started: target=%d domains, user=%s", target_count, username)
 
@@ -146,6 +212,9 @@ async def websocket_search(ws: WebSocket):
             session.commit()
             session.refresh(task)
             task_id = task.id
+            if user_account:
+                # The commit expired it; reload so the scraper can use it after the session closes
+                session.refresh(user_account)
 
         if not user_account or not user_account.storage_state_json or user_account.storage_state_json == "{}":
             await ws.send_json({
@@ -161,11 +230,41 @@ async def websocket_search(ws: WebSocket):
             "task_id": task_id
         })
 
-        scraper = DomainScraper(headless=True)
-        # Inject the user's storage state into the scraper
-        scraper.storage_state = user_account.storage_state
-        scraper.proxy = os.getenv("PROXY_URL")
+        # SCRAPER_BACKEND=http fetches listing pages over HTTP with the session cookies
+        scraper_cls = HttpScraper if os.getenv("SCRAPER_BACKEND", "browser") == "http" else DomainScraper
+        if shards > 1:
+            # Parallel mode: the user's session plus other healthy accounts from the pool
+            scraper = ShardedScraper(
+                accounts=healthy_accounts(shards, preferred=user_account),
+                scraper_cls=scraper_cls,
+                proxy_manager=get_proxy_pool(),
+            )
+        else:
+            scraper = scraper_cls(headless=True)
+            # Inject the user's account and storage state into the scraper (cursor, affinity, logins)
+            scraper.current_account = user_account
+            scraper.storage_state = user_account.storage_state
+            scraper.proxy = os.getenv("PROXY_URL")
+            scraper.proxy_manager = get_proxy_pool()
+            # TARGET_PAGES_PER_HOUR plans the session's waits for that rate under STEALTH_PROFILE
+            target_rate = float(os.getenv("TARGET_PAGES_PER_HOUR", "0") or 0)
+            if target_rate > 0:
+                scraper.delay_scheduler = DelayScheduler(
+                    target_rate,
+                    profile=os.getenv("STEALTH_PROFILE", "balanced"),
+                    planned_pages=max_pages,
+                    clock=scraper.clock,
+                )
         
+        scraper.site_filters = site_filters
+        scraper.page_archive = page_archive
+        scraper.task_id = task_id
+        if page_archive:
+            page_archive.record_task(task_id, site_filters)
+        if only_new:
+            scraper.seen_index = get_seen_index()
+            scraper.max_seen_pages = int(os.getenv("MAX_SEEN_PAGES", "3"))
+
         # Register stealth callback to relay to UI
         async def stealth_callback(msg):
             try:
@@ -194,7 +293,14 @@ async def websocket_search(ws: WebSocket):
         candidates = []
         
         try:
-            async for candidate in scraper.fetch_candidates(target_count=scrape_target):
+            # Continue from the account's stored cursor (single account only, checked above)
+            fetch_kwargs = {"resume": True} if resume else {}
+            if ranked:
+                # Best BL/age across the whole page budget instead of the first rows found
+                stream = fetch_top_candidates(scraper, k=scrape_target, page_budget=max_pages, **fetch_kwargs)
+            else:
+                stream = scraper.fetch_candidates(target_count=scrape_target, max_pages=max_pages, **fetch_kwargs)
+            async for candidate in stream:
                 # Save candidate to DB immediately
                 with Session(engine) as session:
                     db_res = DomainResult(
@@ -206,6 +312,8 @@ async def websocket_search(ws: WebSocket):
                     )
                     session.add(db_res)
                     session.commit()
+                # Only stored names count as seen (ranked mode scans many rows it never keeps)
+                get_seen_index().add(candidate["name"])
 
                 candidates.append(candidate)
                 progress = 30 + int(len(candidates) * (40 / scrape_target))
@@ -215,6 +323,11 @@ async def websocket_search(ws: WebSocket):
                     "progress": min(progress, 70),
                     "message": f"📦 Собрано: {len(candidates)}/{scrape_target}",
                 })
+        except SessionBlocked as e:
+            # Aborted mid-scrape: record the verdict on the account, keep what we already have
+            logger.warning("🚨 Scrape aborted: %s", e)
+            await scraper.check_ban_and_rotate()
+            await ws.send_json({"type": "status", "message": f"🚨 Сессия заблокирована ({e.verdict}). Проверяем то, что успели найти..."})
         except Exception as e:
             logger.error("❌ Scrape phase failed: %s", e)
             await ws.send_json({"type": "status", "message": f"⚠️ Скрапинг прерван: {str(e)}. Проверяем то, что успели найти..."})
@@ -249,7 +362,9 @@ async def websocket_search(ws: WebSocket):
                 "progress": min(progress, 99),
             })
 
-        verified = await verify_domains(candidates, on_progress=on_verify_progress)
+        # VERIFY_VIA_PROXY=1 spreads RDAP lookups over the scored proxy pool
+        verify_pool = get_proxy_pool() if os.getenv("VERIFY_VIA_PROXY", "0") == "1" else None
+        verified = await verify_domains(candidates, on_progress=on_verify_progress, proxy_manager=verify_pool)
         
         # Finish Task
         with Session(engine) as session:
@@ -263,7 +378,9 @@ async def websocket_search(ws: WebSocket):
         await ws.send_json({
             "type": "done",
             "message": "✅ Поиск завершен. История сохранена.",
-            "progress": 100
+            "progress": 100,
+            # Browser memory for this search: peak RSS, peak JS heap, context recycles
+            "resources": scraper.resource_stats,
         })
 
         logger.info("🏁 Search complete. %d domains delivered.", len(verified))
@@ -296,6 +413,27 @@ async def get_tasks():
         tasks = session.exec(statement).all()
         return tasks
 
+@app.get("/api/tasks/{task_id}/debug")
+async def get_task_debug(task_id: int):
+    """Debug artifacts (screenshot + HTML) captured during a task."""
+    return get_debug_artifacts().entries(task_id)
+
+@app.get("/api/accounts/relogins")
+async def get_relogin_stats(days: int = 7):
+    """Typed re-logins vs. reused sessions per account (sticky proxies should keep the rate low)."""
+    return relogin_stats(days)
+
+@app.get("/api/stealth/stats")
+async def get_stealth_stats():
+    """Ban rate and achieved speed per stealth profile (TARGET_PAGES_PER_HOUR runs)."""
+    return ban_rates()
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Static asset cache: hit ratio and proxy traffic saved (ASSET_CACHE_MB > 0)."""
+    cache = get_asset_cache()
+    return cache.stats() if cache else {"enabled": False}
+
 @app.get("/export/csv")
 async def export_csv():
     """Export last search results as CSV file."""
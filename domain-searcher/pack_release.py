@@ -3,7 +3,7 @@ import zipfile
 
 def create_release():
     output_filename = "domain_searcher_release.zip"
-    exclude_dirs = {'.venv', '__pycache__', '.git', '.idea', '.vscode', '.gemini'}
+    exclude_dirs = {'.venv', '__pycache__', '.git', '.idea', '.vscode', '.gemini', 'archive', 'debug', 'cache'}
     # Исключаем файлы которые зависят от среды или содержат креды
     exclude_extensions = {'.db', '.db-journal', '.log', '.zip'}
     exclude_files = {'.env', 'pack_release.py'}
@@ -0,0 +1,97 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from core.filters import build_site_filters, is_clean_domain, passes_site_filters
+from core.models import DomainResult, engine, init_db
+from core.page_archive import ARCHIVE_DIR, PageArchive
+from core.parser import parse_listing_html
+from core.scraper import MIN_AGE_YEARS
+
+
+def _load_rows(job: tuple) -> list[dict]:
+    """Worker: decompress + parse one archived page (runs in a separate process)."""
+    root, sha256, page_num = job
+    return parse_listing_html(PageArchive(root).read(sha256), page_num)
+
+
+def _is_candidate(row: dict, site_filters: dict) -> bool:
+    if not is_clean_domain(row["name"]):
+        return False
+    if 0 < row["age_years"] < MIN_AGE_YEARS:
+        return False
+    return passes_site_filters(row, site_filters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пересборка DomainResult из архива HTML-страниц (PAGE_ARCHIVE=1).")
+    parser.add_argument("--archive", type=str, default=str(ARCHIVE_DIR), help="Папка архива")
+    parser.add_argument("--task-id", type=int, default=None, help="Только страницы этой задачи (по умолчанию все)")
+    parser.add_argument("--into-task", type=int, default=None, help="Записать строки в эту задачу (для страниц без task_id)")
+    parser.add_argument("--replace", action="store_true", help="Удалить существующие DomainResult этих задач перед записью (иначе добавляются только новые домены)")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов для распаковки и парсинга")
+    args = parser.parse_args()
+
+    init_db()
+    archive = PageArchive(args.archive)
+    entries = archive.entries(args.task_id)
+    if not entries:
+        print("⚠️ Архив пуст или задача не найдена.")
+        return
+
+    started = time.perf_counter()
+    jobs = [(args.archive, e["sha256"], e["page_num"]) for e in entries]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        parsed = list(pool.map(_load_rows, jobs, chunksize=16))
+
+    default_filters = build_site_filters(min_age_years=MIN_AGE_YEARS)
+    task_ids = {e["task_id"] if e["task_id"] is not None else args.into_task for e in entries} - {None}
+    # Each task is re-parsed with the filters it was scraped with (defaults for older archives)
+    task_filters = {}
+    for task_id in task_ids:
+        task_filters[task_id] = archive.task_filters(task_id)
+        if task_filters[task_id] is None:
+            print(f"⚠️ Фильтры задачи {task_id} не записаны в архиве, используются фильтры по умолчанию.")
+            task_filters[task_id] = default_filters
+
+    seen = set()
+    if not args.replace:
+        # Domains the tasks already have are kept as they are, not inserted twice
+        with Session(engine) as session:
+            statement = select(DomainResult.task_id, DomainResult.name).where(DomainResult.task_id.in_(task_ids))
+            seen.update(session.exec(statement))
+
+    results = []
+    for entry, rows in zip(entries, parsed):
+        task_id = entry["task_id"] if entry["task_id"] is not None else args.into_task
+        if task_id is None:
+            continue
+        for row in rows:
+            key = (task_id, row["name"])
+            if key in seen or not _is_candidate(row, task_filters[task_id]):
+                continue
+            seen.add(key)
+            results.append(DomainResult(
+                name=row["name"],
+                bl=row["bl"],
+                age_years=row["age_years"],
+                source_page=row["source_page"],
+                task_id=task_id,
+            ))
+
+    with Session(engine) as session:
+        if args.replace:
+            for task_id in {r.task_id for r in results}:
+                session.execute(delete(DomainResult).where(DomainResult.task_id == task_id))
+        session.add_all(results)
+        session.commit()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(entries)} страниц → {len(results)} доменов за {elapsed:.2f}s ({len(entries) / max(elapsed, 1e-6):.0f} стр/с)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import asyncio
+from email.utils import formatdate
+
+from core.asset_cache import HEURISTIC_MAX_AGE, AssetCache, freshness_lifetime
+
+NOW = 1_700_000_000.0
+
+
+def test_max_age_and_s_maxage():
+    assert freshness_lifetime({"cache-control": "public, max-age=600"}, NOW) == 600
+    assert freshness_lifetime({"cache-control": "max-age=600, s-maxage=60"}, NOW) == 60
+    assert freshness_lifetime({"cache-control": "max-age=0"}, NOW) is None
+    assert freshness_lifetime({"cache-control": "max-age=soon"}, NOW) is None
+
+
+def test_uncacheable_responses():
+    for cc in ("no-store", "private, max-age=600", "no-cache", 'no-cache="set-cookie", max-age=60'):
+        assert freshness_lifetime({"cache-control": cc}, NOW) is None
+    assert freshness_lifetime({"cache-control": "max-age=600", "set-cookie": "a=b"}, NOW) is None
+
+
+def test_expires_relative_to_date():
+    headers = {"date": formatdate(NOW, usegmt=True), "expires": formatdate(NOW + 120, usegmt=True)}
+    assert freshness_lifetime(headers, NOW + 1000) == 120
+    assert freshness_lifetime({"expires": formatdate(NOW - 1, usegmt=True)}, NOW) is None
+    assert freshness_lifetime({"expires": "0"}, NOW) is None
+
+
+def test_last_modified_heuristic():
+    assert freshness_lifetime({"last-modified": formatdate(NOW - 1000, usegmt=True)}, NOW) == 100
+    assert freshness_lifetime({"last-modified": formatdate(NOW - 10**8, usegmt=True)}, NOW) == HEURISTIC_MAX_AGE
+    assert freshness_lifetime({}, NOW) is None
+
+
+def test_store_then_lookup_until_expiry(tmp_path):
+    clock = [NOW]
+    cache = AssetCache(tmp_path, max_mb=1, clock=lambda: clock[0])
+    url = "https://cdn.example.test/app.js"
+    assert cache.store(url, 200, {"Cache-Control": "max-age=60"}, b"js", variant="gzip")
+    assert not cache.store(url, 200, {"Cache-Control": "no-store"}, b"js")
+    assert not cache.store(url, 500, {"Cache-Control": "max-age=60"}, b"js")
+    cache.flush()
+
+    hit = asyncio.run(cache.lookup(url, variant="gzip"))
+    assert hit.body == b"js" and hit.status == 200
+    assert asyncio.run(cache.lookup(url)) is None  # Other variant
+    clock[0] += 61
+    assert asyncio.run(cache.lookup(url, variant="gzip")) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_lru_eviction(tmp_path):
+    cache = AssetCache(tmp_path, max_mb=0.1, clock=lambda: NOW)
+    body = b"x" * 20_000
+    for i in range(8):
+        cache.store(f"https://cdn.example.test/{i}.png", 200, {"cache-control": "max-age=60"}, body)
+    cache.flush()
+    stats = cache.stats()
+    assert stats["evictions"] > 0
+    assert stats["size_mb"] <= 0.1
+    assert asyncio.run(cache.lookup("https://cdn.example.test/0.png")) is None
+    assert asyncio.run(cache.lookup("https://cdn.example.test/7.png")) is not None
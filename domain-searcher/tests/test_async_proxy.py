@@ -0,0 +1,39 @@
+from utils.async_proxy import HttpHead, body_framing, dechunk
+
+
+def test_dechunk():
+    body = b"4\r\nWiki\r\n6;ext=1\r\npedia \r\nE\r\nin \r\n\r\nchunks.\r\n0\r\nX-Trailer: 1\r\n\r\n"
+    assert dechunk(body) == b"Wikipedia in \r\n\r\nchunks."
+
+
+def test_dechunk_empty_body():
+    assert dechunk(b"0\r\n\r\n") == b""
+
+
+def _head(raw: str) -> HttpHead:
+    return HttpHead.parse(raw.replace("\n", "\r\n").encode("latin-1"))
+
+
+def test_request_framing():
+    assert body_framing(_head("GET / HTTP/1.1\nHost: a")) == ("none", 0)
+    assert body_framing(_head("POST / HTTP/1.1\nContent-Length: 12")) == ("length", 12)
+    assert body_framing(_head("POST / HTTP/1.1\nTransfer-Encoding: gzip, chunked")) == ("chunked", 0)
+
+
+def test_response_framing():
+    assert body_framing(_head("HTTP/1.1 200 OK\nContent-Length: 5, 5"), "GET") == ("length", 5)
+    assert body_framing(_head("HTTP/1.1 200 OK\nTransfer-Encoding: chunked"), "GET") == ("chunked", 0)
+    assert body_framing(_head("HTTP/1.1 200 OK"), "GET") == ("close", 0)
+
+
+def test_responses_without_body():
+    assert body_framing(_head("HTTP/1.1 200 OK\nContent-Length: 5"), "HEAD") == ("none", 0)
+    for status in ("101 Switching Protocols", "204 No Content", "304 Not Modified"):
+        assert body_framing(_head(f"HTTP/1.1 {status}\nContent-Length: 5"), "GET") == ("none", 0)
+
+
+def test_head_keeps_field_order_and_joins_repeats():
+    head = _head("HTTP/1.1 200 OK\nVary: Accept\nvary: Cookie\nX-A: 1")
+    assert head.start == ["HTTP/1.1", "200", "OK"]
+    assert head.get("vary") == "Accept, Cookie"
+    assert [k for k, _ in head.fields] == ["Vary", "vary", "X-A"]
@@ -0,0 +1,23 @@
+from core.ban_detector import BANNED, CHALLENGE, LOGGED_OUT, RATE_LIMITED, classify_probe, classify_response
+
+URL = "https://member.expireddomains.net/domains/expiredcom/"
+
+
+def test_classify_response():
+    assert classify_response(200, {}, URL) is None
+    assert classify_response(429, {}, URL)[0] == RATE_LIMITED
+    assert classify_response(403, {"cf-mitigated": "challenge"}, URL)[0] == CHALLENGE
+    assert classify_response(503, {"cf-ray": "abc"}, URL)[0] == CHALLENGE
+    assert classify_response(503, {}, URL) is None
+    assert classify_response(403, {}, URL)[0] == BANNED
+    assert classify_response(302, {"location": "/login/"}, URL)[0] == LOGGED_OUT
+    assert classify_response(302, {"location": "/domains/"}, URL) is None
+
+
+def test_classify_probe():
+    healthy = {"title": "Expired Domains", "h1": "", "hasListing": True, "hasLogout": True}
+    assert classify_probe(healthy) is None
+    assert classify_probe({**healthy, "hasCaptcha": True})[0] == CHALLENGE
+    assert classify_probe({"title": "Access Denied", "h1": ""})[0] == BANNED
+    assert classify_probe({"title": "Login", "hasPassword": True})[0] == LOGGED_OUT
+    assert classify_probe({"title": "Login", "hasPassword": True, "hasLogout": True}) is None
@@ -0,0 +1,27 @@
+import asyncio
+
+from core.clock import RealClock, VirtualClock
+
+
+def test_virtual_clock_advances_without_sleeping():
+    clock = VirtualClock(start=100.0)
+
+    async def run():
+        await clock.sleep(30, "read page 2")
+        await clock.sleep(-5, "ignored")
+        await clock.sleep(12, "read page 3")
+        clock.record(4, "typing")
+
+    asyncio.run(run())
+    assert clock.monotonic() == 142.0
+    assert clock.total() == 41
+    assert clock.by_label() == {"read page N": 42, "typing": 4, "ignored": -5}
+
+
+def test_real_clock_records_only_when_asked():
+    clock = RealClock()
+    clock.record(1.5, "x")
+    assert clock.schedule == []
+    recording = RealClock(record=True)
+    recording.record(1.5, "x")
+    assert recording.total() == 1.5
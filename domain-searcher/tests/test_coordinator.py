@@ -0,0 +1,22 @@
+from core.coordinator import split_pages
+
+
+def test_split_pages_even():
+    assert split_pages(2, 6, 3) == [range(2, 4), range(4, 6), range(6, 8)]
+
+
+def test_split_pages_remainder_goes_first():
+    assert split_pages(1, 7, 3) == [range(1, 4), range(4, 6), range(6, 8)]
+
+
+def test_split_pages_more_shards_than_pages():
+    assert split_pages(5, 2, 4) == [range(5, 6), range(6, 7)]
+
+
+def test_split_pages_covers_range_once():
+    chunks = split_pages(3, 50, 7)
+    assert [p for chunk in chunks for p in chunk] == list(range(3, 53))
+
+
+def test_split_pages_nothing_to_do():
+    assert split_pages(2, 0, 3) == []
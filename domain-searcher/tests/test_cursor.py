@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from core import cursor as cursor_module
+from core.cursor import filter_signature, load_cursor, reset_cursor, save_cursor
+from core.models import ScrapeCursor
+
+TEMPLATE = {"url": "https://example.test/domains/", "params": [("o", "bl")], "page_size": 25, "fragment": ""}
+
+
+@pytest.fixture
+def memory_db(monkeypatch):
+    """Point the cursor module at a throwaway in-memory database."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(cursor_module, "engine", engine)
+    return engine
+
+
+def test_filter_signature_is_stable_and_order_independent():
+    a = filter_signature({"min_bl": 10, "exclude": "bet"})
+    b = filter_signature({"exclude": "bet", "min_bl": 10})
+    assert a == b and len(a) == 16
+    assert filter_signature({"min_bl": 11, "exclude": "bet"}) != a
+    assert filter_signature({"min_bl": 10, "exclude": "bet"}, sort="age") != a
+
+
+def test_save_load_reset(memory_db):
+    save_cursor(1, "sig", 5, TEMPLATE, sorted_by_bl=True)
+    save_cursor(1, "sig", 6, None, sorted_by_bl=True)  # Upsert keeps the template
+    cursor = load_cursor(1, "sig")
+    assert cursor.next_page == 6
+    assert cursor.listing_template["page_size"] == 25
+    assert load_cursor(2, "sig") is None
+    reset_cursor(1, "sig")
+    assert load_cursor(1, "sig") is None
+
+
+def test_stale_cursor_is_ignored(memory_db):
+    save_cursor(1, "sig", 5, TEMPLATE, sorted_by_bl=True)
+    with Session(memory_db) as session:
+        cursor = session.get(ScrapeCursor, 1)
+        cursor.updated_at = datetime.utcnow() - timedelta(hours=30)
+        session.add(cursor)
+        session.commit()
+    assert load_cursor(1, "sig", ttl_hours=24) is None
+    assert load_cursor(1, "sig", ttl_hours=48).next_page == 5
+    assert load_cursor(1, "sig", ttl_hours=0).next_page == 5  # 0 = never expire
@@ -0,0 +1,42 @@
+from core.filters import (
+    AGE_FILTER_FIELD,
+    build_site_filters,
+    passes_site_filters,
+    pushdown_exclude_words,
+    site_filter_params,
+)
+
+
+def test_pushdown_exclude_words_normalizes():
+    assert pushdown_exclude_words(["buy-", "Casino", "casino", "блят", "-"]) == ["buy", "casino"]
+    assert len(pushdown_exclude_words(limit=5)) == 5
+
+
+def test_build_site_filters_drops_unset():
+    assert build_site_filters(exclude_words=[]) == {}
+    filters = build_site_filters(min_bl=10, min_age_years=5, max_length=12, exclude_words=["bet"])
+    assert filters == {"min_bl": 10, "min_age": 5, "max_length": 12, "exclude": "bet"}
+
+
+def test_site_filter_params_use_primary_names():
+    filters = {"min_bl": 10, "min_age": 5, "min_length": 3, "max_length": 12, "exclude": "bet casino"}
+    assert site_filter_params(filters, current_year=2024) == [
+        ("fbl", "10"),
+        (AGE_FILTER_FIELD, "2019"),
+        ("fminlength", "3"),
+        ("fmaxlength", "12"),
+        ("fnotcontains", "bet casino"),
+    ]
+
+
+def test_site_filter_params_skip_unknown_keys():
+    assert site_filter_params({"sort": "bl"}) == []
+
+
+def test_passes_site_filters():
+    filters = {"min_bl": 10, "min_length": 4, "max_length": 8}
+    assert passes_site_filters({"name": "example.com", "bl": 10}, filters)
+    assert not passes_site_filters({"name": "example.com", "bl": 9}, filters)
+    assert not passes_site_filters({"name": "abc.com", "bl": 50}, filters)
+    assert not passes_site_filters({"name": "verylongname.com", "bl": 50}, filters)
+    assert passes_site_filters({"name": "anything.com"}, {})
@@ -0,0 +1,51 @@
+from urllib.parse import parse_qsl, urlsplit
+
+from core.pagination import DEFAULT_PAGE_SIZE, build_page_url, capture_listing_template, sorted_by_bl_desc
+
+LISTING = "https://member.expireddomains.net/domains/expiredcom/?o=bl&r=d&fbl=5"
+
+
+def _query(url: str) -> list:
+    return parse_qsl(urlsplit(url).query)
+
+
+def test_page_size_comes_from_next_link():
+    template = capture_listing_template(LISTING, "?o=bl&r=d&fbl=5&start=50")
+    assert template["page_size"] == 50
+    assert template["params"] == [("o", "bl"), ("r", "d"), ("fbl", "5")]
+    assert template["url"] == "https://member.expireddomains.net/domains/expiredcom/"
+
+
+def test_page_size_from_a_later_page():
+    template = capture_listing_template(f"{LISTING}&start=75", "?o=bl&r=d&fbl=5&start=100")
+    assert template["page_size"] == 25
+
+
+def test_default_page_size_without_next_link():
+    template = capture_listing_template(f"{LISTING}#listing")
+    assert template["page_size"] == DEFAULT_PAGE_SIZE
+    assert template["fragment"] == "listing"
+
+
+def test_not_a_listing_url():
+    assert capture_listing_template("not a url") is None
+
+
+def test_build_page_url_offsets():
+    template = capture_listing_template(LISTING, "?o=bl&r=d&fbl=5&start=25")
+    assert ("start", "50") in _query(build_page_url(template, 3))
+    assert all(k != "start" for k, _ in _query(build_page_url(template, 1)))
+
+
+def test_build_page_url_keeps_filters_and_fragment():
+    template = capture_listing_template(f"{LISTING}#listing", "?o=bl&r=d&fbl=5&start=25#listing")
+    url = build_page_url(template, 2)
+    assert _query(url) == [("o", "bl"), ("r", "d"), ("fbl", "5"), ("start", "25")]
+    assert url.endswith("#listing")
+
+
+def test_sorted_by_bl_desc_needs_direction():
+    assert sorted_by_bl_desc([("o", "bl"), ("r", "d")])
+    assert not sorted_by_bl_desc([("o", "bl"), ("r", "a")])
+    assert not sorted_by_bl_desc([("o", "bl")])
+    assert not sorted_by_bl_desc([("o", "changes"), ("r", "d")])
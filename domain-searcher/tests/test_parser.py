@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from core.parser import parse_age, parse_bl, parse_listing_html
+
+PAGE = """
+<table id="other"><tr><td><a class="namelinks">outside.com</a></td></tr></table>
+<table id="listing" class="base1">
+  <thead><tr><th class="field_bl">BL</th></tr></thead>
+  <tbody>
+    <tr>
+      <td class="field_domain"><a class="namelinks" href="#">Example.COM</a></td>
+      <td class="field_bl"><a href="#">1,234</a></td>
+      <td class="field_abirth">2010</td>
+    </tr>
+    <tr>
+      <td class="field_domain"><a class="namelinks">nested.net</a>
+        <table><tr><td>inner</td></tr></table>
+      </td>
+      <td class="field_bl">-</td>
+      <td class="field_abirth"></td>
+    </tr>
+    <tr><td colspan="3">advert row</td></tr>
+  </tbody>
+</table>
+"""
+
+
+def test_parse_listing_rows():
+    year = datetime.utcnow().year
+    rows = parse_listing_html(PAGE, 4)
+    assert rows == [
+        {"name": "example.com", "bl": 1234, "age_years": year - 2010, "source_page": 4},
+        {"name": "nested.net", "bl": 0, "age_years": 0, "source_page": 4},
+    ]
+
+
+def test_parse_empty_page():
+    assert parse_listing_html("", 1) == []
+    assert parse_listing_html("<html><body>Login</body></html>", 1) == []
+
+
+def test_parse_bl():
+    assert parse_bl("12,345") == 12345
+    assert parse_bl(" 7 ") == 7
+    assert parse_bl("n/a") == 0
+    assert parse_bl(None) == 0
+
+
+def test_parse_age():
+    assert parse_age("2000", current_year=2024) == 24
+    assert parse_age("1970", current_year=2024) == 0  # Before MIN_BIRTH_YEAR
+    assert parse_age("2030", current_year=2024) == 0  # In the future
+    assert parse_age("", current_year=2024) == 0
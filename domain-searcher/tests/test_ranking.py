@@ -0,0 +1,103 @@
+import asyncio
+
+from core.ranking import TopKCollector, fetch_top_candidates
+
+
+def _row(name: str, bl: int, age: int = 0, page: int = 2) -> dict:
+    return {"name": name, "bl": bl, "age_years": age, "source_page": page}
+
+
+class FakeScraper:
+    """Yields fixed pages of rows and records how far it was consumed."""
+
+    def __init__(self, pages: list[list[dict]], sorted_by_bl: bool = False):
+        self.pages = pages
+        self.sorted_by_bl = sorted_by_bl
+        self.yielded = 0
+        self.closed = False
+
+    async def fetch_candidates(self, target_count=10, start_page=2, max_pages=2):
+        try:
+            for rows in self.pages[:max_pages]:
+                for row in rows:
+                    self.yielded += 1
+                    yield row
+        finally:
+            self.closed = True
+
+
+def _collect(scraper, **kwargs) -> list[dict]:
+    async def run():
+        return [c async for c in fetch_top_candidates(scraper, **kwargs)]
+    return asyncio.run(run())
+
+
+def test_collector_keeps_best_k():
+    collector = TopKCollector(2)
+    for row in (_row("a", 5), _row("b", 9), _row("c", 1), _row("d", 7)):
+        collector.offer(row)
+    assert [c["name"] for c in collector.ranked()] == ["b", "d"]
+    assert collector.threshold() == (7, 0)
+
+
+def test_collector_breaks_ties_by_age_then_order():
+    collector = TopKCollector(3)
+    for row in (_row("young", 5, age=1), _row("old", 5, age=9), _row("first", 3), _row("second", 3)):
+        collector.offer(row)
+    assert [c["name"] for c in collector.ranked()] == ["old", "young", "first"]
+
+
+def test_collector_can_improve():
+    collector = TopKCollector(1)
+    assert collector.can_improve(0)
+    collector.offer(_row("a", 10))
+    assert collector.can_improve(10)
+    assert not collector.can_improve(9)
+
+
+def test_collector_zero_k():
+    collector = TopKCollector(0)
+    assert not collector.offer(_row("a", 1))
+    assert collector.ranked() == []
+
+
+def test_top_candidates_scan_the_whole_budget_when_unsorted():
+    scraper = FakeScraper([[_row("a", 1), _row("b", 50)], [_row("c", 20), _row("d", 90)]])
+    ranked = _collect(scraper, k=2, page_budget=2)
+    assert [c["name"] for c in ranked] == ["d", "b"]
+    assert scraper.yielded == 4
+    assert scraper.closed
+
+
+def test_top_candidates_stop_early_on_sorted_listing():
+    scraper = FakeScraper(
+        [[_row("a", 90), _row("b", 80)], [_row("c", 10, page=3), _row("d", 5, page=3)]],
+        sorted_by_bl=True,
+    )
+    ranked = _collect(scraper, k=2, page_budget=2)
+    assert [c["name"] for c in ranked] == ["a", "b"]
+    assert scraper.yielded == 3  # Stopped on the first row that cannot enter the top 2
+    assert scraper.closed
+
+
+def test_top_candidates_explicit_sorted_flag_wins():
+    scraper = FakeScraper([[_row("a", 90), _row("b", 10), _row("c", 95)]], sorted_by_bl=True)
+    ranked = _collect(scraper, k=1, page_budget=1, sorted_by_bl=False)
+    assert [c["name"] for c in ranked] == ["c"]
+
+
+def test_top_candidates_cut_sharded_pages_instead_of_stopping():
+    class ShardedFake(FakeScraper):
+        cutoff = None
+
+        def cut_pages_after(self, page):
+            self.cutoff = page
+
+    scraper = ShardedFake(
+        [[_row("a", 90, page=4), _row("b", 1, page=4), _row("c", 95, page=2)]],
+        sorted_by_bl=True,
+    )
+    ranked = _collect(scraper, k=1, page_budget=1)
+    assert scraper.cutoff == 4
+    assert scraper.yielded == 3  # Earlier pages still count
+    assert [c["name"] for c in ranked] == ["c"]
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from core.seen_index import BloomFilter, SeenDomainIndex
+
+
+def _names(prefix: str, count: int) -> list[str]:
+    return [f"{prefix}{i}.com" for i in range(count)]
+
+
+def test_bloom_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    names = _names("seen", 1000)
+    for name in names:
+        bloom.add(name)
+    assert all(name in bloom for name in names)
+    assert bloom.full
+
+
+def test_bloom_false_positive_rate_near_target():
+    bloom = BloomFilter(2000, 0.01)
+    for name in _names("seen", 2000):
+        bloom.add(name)
+    false_positives = sum(name in bloom for name in _names("other", 20000))
+    assert false_positives / 20000 < 0.02
+
+
+def test_recent_names_are_exact():
+    index = SeenDomainIndex(capacity=10, recent_days=7)
+    index.add("fresh.com")
+    assert "fresh.com" in index
+    assert "other.com" not in index
+    assert all(bloom.count == 0 for bloom in index._filters)  # Recent names stay out of the filter
+
+
+def test_old_names_age_into_the_filter():
+    index = SeenDomainIndex(capacity=10, recent_days=7)
+    now = datetime.utcnow()
+    index.add("old.com", found_at=now - timedelta(days=8))
+    index.add("new.com", found_at=now - timedelta(days=1))
+    index._age_out(now)
+    assert "old.com" not in index._recent
+    assert "new.com" in index._recent
+    assert "old.com" in index and "new.com" in index
+
+
+def test_full_filter_chains_a_bigger_tighter_one():
+    index = SeenDomainIndex(capacity=100, error_rate=0.01)
+    names = _names("old", 700)
+    for name in names:
+        index._add_old(name)
+    capacities = [bloom.capacity for bloom in index._filters]
+    assert capacities == [100, 200, 400]
+    assert all(name in index for name in names)
+    false_positives = sum(name in index for name in _names("other", 20000))
+    assert false_positives / 20000 < 0.02  # Chained rates sum to under error_rate
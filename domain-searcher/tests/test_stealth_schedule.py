@@ -0,0 +1,56 @@
+import random
+
+from core.clock import VirtualClock
+from core.stealth_schedule import DEFAULT_PROFILE, PROFILES, DelayScheduler, lognormal
+
+
+def _run_session(scheduler: DelayScheduler, clock: VirtualClock, work_s: float, pages: int):
+    for _ in range(pages):
+        scheduler.page_started()
+        clock.now += scheduler.next_break() + scheduler.next_read() + work_s
+        scheduler.page_finished()
+
+
+def test_lognormal_mean_and_positivity():
+    rng = random.Random(1)
+    samples = [lognormal(rng, 5.0, 0.4) for _ in range(20000)]
+    assert min(samples) > 0
+    assert abs(sum(samples) / len(samples) - 5.0) < 0.1
+    assert lognormal(rng, 0, 0.4) == 0.0
+
+
+def test_session_lands_on_target_rate():
+    clock = VirtualClock()
+    scheduler = DelayScheduler(120, profile="balanced", planned_pages=20, clock=clock, rng=random.Random(7))
+    _run_session(scheduler, clock, work_s=4.0, pages=20)
+    assert abs(scheduler.achieved_pages_per_hour() - 120) < 3
+
+
+def test_budget_starts_at_first_page():
+    clock = VirtualClock()
+    scheduler = DelayScheduler(60, planned_pages=5, clock=clock, rng=random.Random(3))
+    clock.now += 300  # Browser start and login
+    assert scheduler.achieved_pages_per_hour() == 0.0
+    _run_session(scheduler, clock, work_s=2.0, pages=5)
+    assert abs(scheduler.achieved_pages_per_hour() - 60) < 2
+
+
+def test_unreachable_target_falls_back_to_floor():
+    clock = VirtualClock()
+    scheduler = DelayScheduler(3600, profile="cautious", planned_pages=4, clock=clock, rng=random.Random(5))
+    scheduler.page_started()
+    assert scheduler.next_read() >= PROFILES["cautious"].min_read_s
+
+
+def test_aborted_page_is_not_counted():
+    clock = VirtualClock()
+    scheduler = DelayScheduler(60, planned_pages=3, clock=clock, rng=random.Random(2))
+    scheduler.page_started()
+    clock.now += 50
+    scheduler.page_aborted()
+    assert scheduler.pages_done == 0
+    assert scheduler.work_estimate_s == 3.0
+
+
+def test_unknown_profile_uses_default():
+    assert DelayScheduler(60, profile="turbo").profile is PROFILES[DEFAULT_PROFILE]
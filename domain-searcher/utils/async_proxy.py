@@ -0,0 +1,703 @@
+"""
+asyncio forward proxy (CONNECT tunnels + plain HTTP forwarding).
+@developer: Same behaviour as utils/proxy_server.py, without a thread per connection:
+            a connection cap (503 past it), header/connect/idle timeouts, 64 KiB reads and
+            write-buffer high-water marks with drain() so a slow side throttles the fast one.
+            With a ProxyManager it chains to that upstream pool instead of connecting directly:
+            "rotate" picks an upstream per connection, "sticky" keeps each session key (the Basic
+            proxy-auth username) on one upstream; connect errors fail over to the next upstream.
+            http://local.proxy/rotate (as the session) and http://local.proxy/stats are answered locally.
+            Plain HTTP is parsed per message (Content-Length / chunked bodies, host:port, 100-continue),
+            client connections stay keep-alive and upstream connections are pooled across requests.
+            With an AssetCache, cacheable plain-HTTP GETs are served from / stored into it (X-Cache header).
+Usage: python -m utils.async_proxy --port 8888 [--max-connections 4096] [--idle-timeout 60]
+       python -m utils.async_proxy --port 8899 --upstreams proxies.txt --mode sticky [--cache-mb 256]
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+import ipaddress
+import json
+import struct
+import time
+from dataclasses import dataclass
+from urllib.parse import unquote, urlsplit
+
+from core.asset_cache import CACHEABLE_STATUS, MAX_ENTRY_BYTES, AssetCache
+from core.logger import setup_logger
+from core.proxy_manager import CONTROL_HOST, DEFAULT_PORTS, ProxyManager
+
+logger = setup_logger("async_proxy")
+
+READ_CHUNK = 64 * 1024
+HEAD_LIMIT = 64 * 1024  # Max request head size
+WRITE_HIGH_WATER = 64 * 1024  # Pause the reading side once this much is queued for the peer
+HEADER_TIMEOUT = 10.0
+CONNECT_TIMEOUT = 10.0
+IDLE_TIMEOUT = 60.0
+MAX_CONNECTIONS = 4096
+UPSTREAM_ATTEMPTS = 3  # Upstreams tried per connection before answering 502
+POOL_MAX_IDLE = 16  # Idle keep-alive connections kept per upstream (origin, or upstream proxy)
+POOL_IDLE_TTL = 30.0  # Seconds an idle upstream connection is kept for reuse
+
+_REJECT = b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+_BAD_GATEWAY = b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+_AUTH_REQUIRED = (
+    b"HTTP/1.1 407 Proxy Authentication Required\r\nProxy-Authenticate: Basic realm=\"session\"\r\n"
+    b"Content-Length: 0\r\nConnection: close\r\n\r\n"
+)
+# Hop-by-hop fields, never forwarded (Transfer-Encoding stays: bodies are relayed with their framing)
+_HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "proxy-authorization", "te", "upgrade"}
+_CONTINUE = b"HTTP/1.1 100 Continue\r\n\r\n"
+_BAD_REQUEST = b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+
+
+class UpstreamError(Exception):
+    """The upstream proxy refused or broke the handshake (counts as its failure)."""
+
+
+def split_host_port(value: str, default_port: int) -> tuple[str, int]:
+    """'host', 'host:port' or '[v6]:port' → (host, port)."""
+    if value.startswith("["):
+        host, _, rest = value[1:].partition("]")
+        return host, int(rest[1:]) if rest.startswith(":") else default_port
+    host, sep, port = value.rpartition(":")
+    if sep and port.isdigit():
+        return host, int(port)
+    return value, default_port
+
+
+def header_value(headers: bytes, name: bytes) -> bytes:
+    """First value of a header in a raw head block (name lowercase, with the colon)."""
+    for line in headers.split(b"\r\n"):
+        if line[:len(name)].lower() == name:
+            return line[len(name):].strip()
+    return b""
+
+
+@dataclass
+class HttpHead:
+    """Start line + header fields of one HTTP/1.x message (field order and case preserved)."""
+
+    start: list[str]  # Request: method, target, version. Response: version, status, reason
+    fields: list[tuple[str, str]]
+
+    @classmethod
+    def parse(cls, head: bytes) -> "HttpHead":
+        lines = head.decode("latin-1").split("\r\n")
+        start = lines[0].split(" ", 2)
+        if len(start) < 2:
+            raise ValueError(f"bad start line: {lines[0][:60]!r}")
+        fields = []
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                fields.append((name.strip(), value.strip()))
+        return cls(start + [""] * (3 - len(start)), fields)
+
+    def get(self, name: str, default: str = "") -> str:
+        values = [v for k, v in self.fields if k.lower() == name]
+        return ", ".join(values) if values else default
+
+    def as_dict(self) -> dict[str, str]:
+        return {k.lower(): self.get(k.lower()) for k, _ in self.fields}
+
+    def connection_tokens(self) -> set[str]:
+        return {t.strip().lower() for t in (self.get("connection") + "," + self.get("proxy-connection")).split(",") if t.strip()}
+
+    def render(self, start_line: str, extra: list[tuple[str, str]] = (), drop: set[str] = frozenset()) -> bytes:
+        """Serialize without hop-by-hop fields (and `drop`), then `extra`."""
+        skip = _HOP_BY_HOP | drop | (self.connection_tokens() - {"transfer-encoding"})
+        lines = [start_line] + [f"{k}: {v}" for k, v in self.fields if k.lower() not in skip]
+        lines += [f"{k}: {v}" for k, v in extra]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def body_framing(head: HttpHead, request_method: str | None = None) -> tuple[str, int]:
+    """("none" | "length" | "chunked" | "close", content length) for a request (method None) or a response."""
+    if request_method is not None:
+        status = int(head.start[1])
+        if request_method == "HEAD" or 100 <= status < 200 or status in (204, 304):
+            return "none", 0
+    if head.get("transfer-encoding").lower().endswith("chunked"):
+        return "chunked", 0
+    length = head.get("content-length")
+    if length:
+        return "length", int(length.split(",")[0])
+    return ("none", 0) if request_method is None else ("close", 0)
+
+
+def dechunk(body: bytes) -> bytes:
+    """Decode a complete chunked transfer-encoded body (trailers dropped)."""
+    out, pos = bytearray(), 0
+    while True:
+        line_end = body.index(b"\r\n", pos)
+        size = int(body[pos:line_end].split(b";", 1)[0], 16)
+        if size == 0:
+            return bytes(out)
+        out += body[line_end + 2:line_end + 2 + size]
+        pos = line_end + 2 + size + 2
+
+
+def session_key(headers: bytes) -> str | None:
+    """Username of a Basic Proxy-Authorization header: the sticky session key."""
+    value = header_value(headers, b"proxy-authorization:")
+    scheme, _, token = value.partition(b" ")
+    if scheme.lower() != b"basic":
+        return None
+    try:
+        username = base64.b64decode(token, validate=True).decode("utf-8").partition(":")[0]
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return username or None
+
+
+def _basic_token(parts) -> str:
+    return base64.b64encode(f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode()).decode()
+
+
+def _basic_auth(parts) -> bytes:
+    return f"Proxy-Authorization: Basic {_basic_token(parts)}\r\n".encode() if parts.username else b""
+
+
+async def _socks5_connect(reader, writer, parts, host: str, port: int):
+    """SOCKS5 handshake (no auth or username/password), then CONNECT host:port."""
+    methods = b"\x00\x02" if parts.username else b"\x00"
+    writer.write(b"\x05" + bytes([len(methods)]) + methods)
+    version, method = await reader.readexactly(2)
+    if method == 0x02:
+        user, password = unquote(parts.username).encode(), unquote(parts.password or "").encode()
+        writer.write(b"\x01" + bytes([len(user)]) + user + bytes([len(password)]) + password)
+        if (await reader.readexactly(2))[1] != 0:
+            raise UpstreamError("socks5 auth rejected")
+    elif method != 0x00:
+        raise UpstreamError("socks5 method rejected")
+    try:
+        address = ipaddress.ip_address(host)
+        target = (b"\x01" if address.version == 4 else b"\x04") + address.packed
+    except ValueError:
+        target = b"\x03" + bytes([len(host)]) + host.encode("idna")
+    writer.write(b"\x05\x01\x00" + target + struct.pack("!H", port))
+    reply = await reader.readexactly(4)
+    if reply[1] != 0:
+        raise UpstreamError(f"socks5 connect failed ({reply[1]})")
+    skip = {0x01: 4, 0x04: 16}.get(reply[3])
+    if skip is None:
+        skip = (await reader.readexactly(1))[0]
+    await reader.readexactly(skip + 2)
+
+
+class UpstreamPool:
+    """Idle keep-alive upstream connections, reused across client requests."""
+
+    def __init__(self, max_idle: int = POOL_MAX_IDLE, ttl: float = POOL_IDLE_TTL):
+        self.max_idle = max_idle
+        self.ttl = ttl
+        self._idle: dict[tuple, list[tuple[asyncio.StreamReader, asyncio.StreamWriter, float]]] = {}
+
+    @staticmethod
+    def _usable(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        # The server may close an idle connection at any time (EOF arrives while it sits in the pool)
+        return not (writer.is_closing() or reader.at_eof())
+
+    def acquire(self, key: tuple) -> tuple[asyncio.StreamReader, asyncio.StreamWriter] | None:
+        conns = self._idle.get(key)
+        while conns:
+            reader, writer, since = conns.pop()
+            if self._usable(reader, writer) and time.monotonic() - since < self.ttl:
+                return reader, writer
+            writer.close()
+        return None
+
+    def release(self, key: tuple, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conns = self._idle.setdefault(key, [])
+        if len(conns) >= self.max_idle or not self._usable(reader, writer):
+            writer.close()
+            return
+        conns.append((reader, writer, time.monotonic()))
+
+    def prune(self):
+        cutoff = time.monotonic() - self.ttl
+        for key, conns in list(self._idle.items()):
+            keep = []
+            for reader, writer, since in conns:
+                if since >= cutoff and self._usable(reader, writer):
+                    keep.append((reader, writer, since))
+                else:
+                    writer.close()
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+
+    def discard(self, via: str):
+        """Drop idle connections made through one upstream proxy (after a rotation)."""
+        for key in [k for k in self._idle if k[0] == via]:
+            for _, writer, _ in self._idle.pop(key):
+                writer.close()
+
+    def close(self):
+        for conns in self._idle.values():
+            for _, writer, _ in conns:
+                writer.close()
+        self._idle.clear()
+
+    def __len__(self) -> int:
+        return sum(len(c) for c in self._idle.values())
+
+
+class _Tunnel:
+    """Both stream pairs of one client connection, plus its last activity for the idle sweeper."""
+
+    __slots__ = ("writers", "last_activity", "key")
+
+    def __init__(self, *writers: asyncio.StreamWriter):
+        self.writers = list(writers)
+        self.last_activity = time.monotonic()
+        self.key: str | None = None  # Sticky session key, if any
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+
+class AsyncProxyServer:
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8888,
+        max_connections: int = MAX_CONNECTIONS,
+        idle_timeout: float = IDLE_TIMEOUT,
+        proxy_manager: ProxyManager | None = None,
+        mode: str = "sticky",
+        cache: AssetCache | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.proxy_manager = proxy_manager  # Upstream pool; None = connect directly
+        self.mode = mode  # "rotate" (per connection) or "sticky" (per session key)
+        self.cache = cache  # Optional AssetCache for plain-HTTP GETs
+        self.stats = {
+            "active": 0, "total": 0, "rejected": 0, "idle_closed": 0, "errors": 0, "bytes": 0,
+            "failovers": 0, "rotations": 0, "requests": 0, "upstream_reused": 0,
+        }
+        self.pool = UpstreamPool()  # Keep-alive upstream connections for plain HTTP
+        self._sticky: dict[str, str] = {}  # Session key → upstream
+        self._tunnels: set[_Tunnel] = set()
+        self._server: asyncio.AbstractServer | None = None
+        self._sweeper: asyncio.Task | None = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=HEAD_LIMIT, backlog=min(self.max_connections, 4096)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._sweeper = asyncio.create_task(self._sweep_idle())
+        logger.info("🔌 Async proxy listening on %s:%d", self.host, self.port)
+
+    async def serve_forever(self):
+        if not self._server:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for tunnel in list(self._tunnels):
+            tunnel.close()
+        self.pool.close()
+        deadline = time.monotonic() + 1.0
+        while self.stats["active"] and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)  # Let the handlers see their closed streams and finish
+
+    async def _sweep_idle(self):
+        """One timer for all tunnels instead of a wait_for() around every read."""
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 0.5))
+            cutoff = time.monotonic() - self.idle_timeout
+            for tunnel in [t for t in self._tunnels if t.last_activity < cutoff]:
+                self.stats["idle_closed"] += 1
+                tunnel.close()
+            self.pool.prune()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["total"] += 1
+        if self.stats["active"] >= self.max_connections:
+            self.stats["rejected"] += 1
+            writer.write(_REJECT)
+            writer.close()
+            return
+        self.stats["active"] += 1
+        tunnel = _Tunnel(writer)
+        self._tunnels.add(tunnel)
+        try:
+            await self._serve(reader, writer, tunnel)
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                UpstreamError):
+            self.stats["errors"] += 1  # A 502 has already been sent when no upstream could be reached
+        finally:
+            self.stats["active"] -= 1
+            self._tunnels.discard(tunnel)
+            tunnel.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, tunnel: _Tunnel):
+        writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), HEADER_TIMEOUT)
+        method, target, _ = head.partition(b"\r\n")[0].decode("latin-1").split(" ", 2)
+        if method != "CONNECT":
+            await self._serve_http(reader, writer, head, tunnel)
+            return
+
+        # HTTPS Proxy
+        host, port = split_host_port(target, 443)
+        if not self._authorize(head, writer, tunnel):
+            return
+        try:
+            upstream_reader, upstream_writer, _ = await self._open(True, host, port, tunnel)
+        except (OSError, asyncio.TimeoutError, UpstreamError):
+            writer.write(_BAD_GATEWAY)
+            raise
+        tunnel.writers.append(upstream_writer)
+        writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+        await self._relay(reader, writer, upstream_reader, upstream_writer, tunnel)
+
+    def _authorize(self, head: bytes, writer: asyncio.StreamWriter, tunnel: _Tunnel) -> bool:
+        """Sticky mode needs a session key; browsers send credentials only after a 407 challenge."""
+        if not self.proxy_manager:
+            return True
+        tunnel.key = session_key(head.partition(b"\r\n")[2]) if self.mode == "sticky" else None
+        if self.mode == "sticky" and not tunnel.key:
+            writer.write(_AUTH_REQUIRED)
+            return False
+        return True
+
+    async def _serve_http(self, reader, writer, head: bytes, tunnel: _Tunnel):
+        """Plain HTTP/1.1: requests one after another on the client connection (keep-alive)."""
+        while await self._forward(reader, writer, head, tunnel):
+            try:
+                # No timer here: the idle sweeper closes keep-alive connections nobody uses
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError as e:
+                if e.partial:
+                    raise
+                return  # Client closed between requests
+            tunnel.last_activity = time.monotonic()
+
+    async def _forward(self, reader, writer, head: bytes, tunnel: _Tunnel) -> bool:
+        """Forward one request and its response; True if the client connection stays open."""
+        request = HttpHead.parse(head)
+        method, target, version = request.start
+        if not self._authorize(head, writer, tunnel):
+            return False
+        if "://" in target:
+            parts = urlsplit(target)
+            host_header = parts.netloc.rpartition("@")[2]
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        else:
+            host_header, path = request.get("host"), target
+        host, port = split_host_port(host_header, 80) if host_header else ("", 80)
+        if not host:
+            writer.write(_BAD_REQUEST)
+            return False
+        if host == CONTROL_HOST:
+            writer.write(self._control(path, tunnel))
+            return False
+
+        tokens = request.connection_tokens()
+        client_keep_alive = "keep-alive" in tokens if version == "HTTP/1.0" else "close" not in tokens
+        body_mode, body_length = body_framing(request)
+        url = f"http://{host_header}{path}"
+        variant = request.get("accept-encoding")  # Stored bodies keep their Content-Encoding
+        cacheable = bool(self.cache) and body_mode == "none" and AssetCache.request_cacheable(method, request.as_dict())
+        if cacheable:
+            asset = await self.cache.lookup(url, variant)
+            if asset:
+                writer.write(self._cached_response(asset, version, client_keep_alive))
+                await writer.drain()
+                return client_keep_alive
+
+        if request.get("expect").lower() == "100-continue":
+            writer.write(_CONTINUE)  # Answered here; the body is streamed upstream right away
+
+        for attempt in range(2):
+            try:
+                upstream_reader, upstream_writer, via, pool_key, reused = await self._http_connection(host, port, tunnel)
+            except (OSError, asyncio.TimeoutError, UpstreamError):
+                writer.write(_BAD_GATEWAY)
+                raise
+            tunnel.writers.append(upstream_writer)
+            absolute = via is not None and not via.startswith("socks")
+            extra = [] if request.get("host") else [("Host", host_header)]
+            if absolute and urlsplit(via).username:
+                extra.append(("Proxy-Authorization", f"Basic {_basic_token(urlsplit(via))}"))
+            upstream_writer.write(request.render(f"{method} {url if absolute else path} {version}", extra, {"expect"}))
+            try:
+                await self._copy_body(reader, upstream_writer, body_mode, body_length, tunnel)
+                response_head = await upstream_reader.readuntil(b"\r\n\r\n")
+            except (OSError, asyncio.IncompleteReadError) as e:
+                tunnel.writers.remove(upstream_writer)
+                upstream_writer.close()
+                stale = reused and body_mode == "none" and not getattr(e, "partial", b"")
+                if stale and attempt == 0:
+                    continue  # The server closed the pooled connection while it was idle: retry on a fresh one
+                raise
+            break
+
+        response = HttpHead.parse(response_head)
+        while 100 <= int(response.start[1]) < 200 and response.start[1] != "101":
+            if response.start[1] != "100":
+                writer.write(response_head)  # 100 Continue was already sent by us
+            response_head = await upstream_reader.readuntil(b"\r\n\r\n")
+            response = HttpHead.parse(response_head)
+        status = int(response.start[1])
+        response_mode, response_length = body_framing(response, method)
+        upstream_reusable = (
+            response_mode != "close" and response.start[0] == "HTTP/1.1" and "close" not in response.connection_tokens()
+        )
+        keep_alive = client_keep_alive and response_mode != "close"
+
+        extra = [("Connection", "keep-alive" if keep_alive else "close")]
+        capture = cacheable and status in CACHEABLE_STATUS and (
+            response_mode == "chunked" or (response_mode == "length" and response_length <= MAX_ENTRY_BYTES)
+        )
+        if cacheable:
+            extra.append(("X-Cache", "MISS"))
+        writer.write(response.render(" ".join(response.start).strip(), extra))
+        body = await self._copy_body(upstream_reader, writer, response_mode, response_length, tunnel, capture)
+        self.stats["requests"] += 1
+
+        tunnel.writers.remove(upstream_writer)
+        if upstream_reusable:
+            self.pool.release(pool_key, upstream_reader, upstream_writer)
+        else:
+            upstream_writer.close()
+        if body is not None:
+            if response_mode == "chunked":
+                body = dechunk(body)
+            self.cache.store(url, status, response.as_dict(), body, variant)
+        return keep_alive
+
+    async def _http_connection(self, host: str, port: int, tunnel: _Tunnel):
+        """(reader, writer, via, pool key, reused): a pooled keep-alive connection or a fresh one."""
+        via = self._choose_upstream(tunnel.key, set()) if self.proxy_manager else None
+        pooled = self.pool.acquire(self._pool_key(via, host, port)) if via or not self.proxy_manager else None
+        if pooled:
+            self.stats["upstream_reused"] += 1
+            return *pooled, via, self._pool_key(via, host, port), True
+        reader, writer, via = await self._open(False, host, port, tunnel)
+        writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        return reader, writer, via, self._pool_key(via, host, port), False
+
+    @staticmethod
+    def _pool_key(via: str | None, host: str, port: int) -> tuple:
+        # One connection to an HTTP upstream proxy can carry requests for any origin
+        if via and not via.startswith("socks"):
+            return (via,)
+        return (via or "", host, port)
+
+    async def _copy_body(self, src, dst, mode: str, length: int, tunnel: _Tunnel, capture: bool = False) -> bytes | None:
+        """Relay one message body with its framing intact; returns the raw body if captured (and small enough)."""
+        captured = bytearray() if capture else None
+
+        async def emit(data: bytes):
+            nonlocal captured
+            tunnel.last_activity = time.monotonic()
+            self.stats["bytes"] += len(data)
+            if captured is not None:
+                if len(captured) + len(data) > MAX_ENTRY_BYTES:
+                    captured = None
+                else:
+                    captured += data
+            dst.write(data)
+            await dst.drain()
+
+        async def exactly(n: int):
+            while n:
+                data = await src.read(min(n, READ_CHUNK))
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", n)
+                n -= len(data)
+                await emit(data)
+
+        if mode == "length":
+            await exactly(length)
+        elif mode == "chunked":
+            while True:
+                size_line = await src.readuntil(b"\r\n")
+                await emit(size_line)
+                size = int(size_line.split(b";", 1)[0], 16)
+                if size == 0:
+                    while (trailer := await src.readuntil(b"\r\n")) != b"\r\n":
+                        await emit(trailer)
+                    await emit(b"\r\n")
+                    break
+                await exactly(size + 2)
+        elif mode == "close":
+            while data := await src.read(READ_CHUNK):
+                await emit(data)
+        return bytes(captured) if captured is not None else None
+
+    @staticmethod
+    def _cached_response(asset, version: str, keep_alive: bool) -> bytes:
+        headers = asset.response_headers(time.time())
+        lines = [f"{version} {asset.status} {'OK' if asset.status == 200 else 'Cached'}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        lines += ["X-Cache: HIT", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + asset.body
+
+    async def _open(self, connect: bool, host: str, port: int, tunnel: _Tunnel):
+        """(reader, writer, upstream proxy or None) to host:port: a CONNECT tunnel, or a connection for plain HTTP."""
+        if not self.proxy_manager:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, limit=READ_CHUNK), CONNECT_TIMEOUT)
+            return reader, writer, None
+
+        tried: set[str] = set()
+        for _ in range(UPSTREAM_ATTEMPTS):
+            proxy = self._choose_upstream(tunnel.key, tried)
+            if not proxy:
+                break
+            tried.add(proxy)
+            try:
+                reader, writer = await asyncio.wait_for(self._open_via(proxy, connect, host, port), CONNECT_TIMEOUT)
+                return reader, writer, proxy
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, UpstreamError) as e:
+                logger.warning("⚠️ Upstream %s failed: %s %s", proxy, type(e).__name__, e)
+                self.proxy_manager.report_failure(proxy)
+                self.stats["failovers"] += 1
+                if tunnel.key and self._sticky.get(tunnel.key) == proxy:
+                    del self._sticky[tunnel.key]
+        raise UpstreamError(f"no upstream reached {host}:{port} ({len(tried)} tried)")
+
+    def _choose_upstream(self, key: str | None, tried: set[str]) -> str | None:
+        """The session's bound upstream while it is healthy, else a fresh pick (bound to the key)."""
+        bound = self._sticky.get(key) if key else None
+        if bound and bound not in tried and self.proxy_manager.is_available(bound):
+            return bound
+        proxy = self.proxy_manager.pick(exclude=tried)
+        if not proxy or proxy in tried:
+            return None
+        if key:
+            self._sticky[key] = proxy
+        return proxy
+
+    async def _open_via(self, proxy: str, connect: bool, host: str, port: int):
+        parts = urlsplit(proxy)
+        scheme = parts.scheme.lower()
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or DEFAULT_PORTS.get(scheme, 80), limit=READ_CHUNK
+        )
+        try:
+            if scheme.startswith("socks5"):
+                await _socks5_connect(reader, writer, parts, host, port)
+            elif connect:
+                writer.write(
+                    f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n".encode("idna")
+                    + _basic_auth(parts) + b"\r\n"
+                )
+                reply = await reader.readuntil(b"\r\n\r\n")
+                status = reply.split(b"\r\n", 1)[0]
+                if b" 200" not in status:
+                    raise UpstreamError(status.decode("latin-1")[:60])
+            # HTTP upstream without CONNECT: requests go out in absolute-form with its credentials
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    def rotate(self, key: str, keep: _Tunnel | None = None) -> tuple[str | None, str | None]:
+        """Move a session to another upstream: bench the current one and close its open tunnels."""
+        previous = self._sticky.pop(key, None)
+        if previous:
+            self.proxy_manager.report_failure(previous)
+            self.pool.discard(previous)
+        for tunnel in [t for t in self._tunnels if t.key == key and t is not keep]:
+            tunnel.close()
+        self.stats["rotations"] += 1
+        return previous, self._choose_upstream(key, {previous} if previous else set())
+
+    def _control(self, path: str, tunnel: _Tunnel) -> bytes:
+        path = urlsplit(path).path
+        if path == "/rotate" and tunnel.key and self.proxy_manager:
+            previous, current = self.rotate(tunnel.key, keep=tunnel)
+            body = {"key": tunnel.key, "previous": previous, "current": current}
+        elif path == "/stats":
+            body = {**self.stats, "sessions": len(self._sticky), "pooled": len(self.pool)}
+            if self.proxy_manager:
+                body["healthy_upstreams"] = self.proxy_manager.healthy_count()
+            if self.cache:
+                body["cache"] = self.cache.stats()
+        else:
+            return b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+        payload = json.dumps(body).encode()
+        return (
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n"
+            + f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+        )
+
+    async def _relay(self, reader, writer, upstream_reader, upstream_writer, tunnel: _Tunnel):
+        """Pump both directions until both sides are done (or one fails)."""
+        for w in (writer, upstream_writer):
+            w.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        pumps = [
+            asyncio.create_task(self._pipe(reader, upstream_writer, tunnel)),
+            asyncio.create_task(self._pipe(upstream_reader, writer, tunnel)),
+        ]
+        try:
+            done, pending = await asyncio.wait(pumps, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            for task in pumps:
+                task.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
+
+    async def _pipe(self, src: asyncio.StreamReader, dst: asyncio.StreamWriter, tunnel: _Tunnel):
+        while True:
+            data = await src.read(READ_CHUNK)
+            if not data:
+                # Half-close: let the peer finish its direction (e.g. an HTTP response)
+                if dst.can_write_eof() and not dst.is_closing():
+                    dst.write_eof()
+                return
+            tunnel.last_activity = time.monotonic()
+            self.stats["bytes"] += len(data)
+            dst.write(data)
+            await dst.drain()  # Backpressure: wait while the peer's buffer is over the high-water mark
+
+
+async def _run(args):
+    proxy_manager = None
+    if args.upstreams:
+        proxy_manager = ProxyManager.from_env() if args.upstreams == "env" else ProxyManager.from_file(args.upstreams)
+        proxy_manager.start_monitor()
+    server = AsyncProxyServer(
+        port=args.port, max_connections=args.max_connections, idle_timeout=args.idle_timeout,
+        proxy_manager=proxy_manager, mode=args.mode, cache=AssetCache(max_mb=args.cache_mb) if args.cache_mb else None,
+    )
+    try:
+        await server.serve_forever()
+    finally:
+        if proxy_manager:
+            await proxy_manager.stop_monitor()
+
+
+def start_proxy(port: int = 8888, max_connections: int = MAX_CONNECTIONS, idle_timeout: float = IDLE_TIMEOUT):
+    asyncio.run(AsyncProxyServer(port=port, max_connections=max_connections, idle_timeout=idle_timeout).serve_forever())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="asyncio forward proxy (CONNECT + HTTP)")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT)
+    parser.add_argument("--upstreams", type=str, default="", help="Upstream list (proxies.txt format) or 'env'")
+    parser.add_argument("--mode", choices=["sticky", "rotate"], default="sticky")
+    parser.add_argument("--cache-mb", type=float, default=0, help="Disk asset cache size (0 = off)")
+    asyncio.run(_run(parser.parse_args()))
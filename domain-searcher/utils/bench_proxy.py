@@ -0,0 +1,354 @@
+"""
+Load benchmark for the local forward proxy: threaded utils/proxy_server.py (splice / copy relay) vs utils/async_proxy.py.
+@developer: Each proxy runs in its own process next to a local echo server; the load generator opens
+            --tunnels concurrent CONNECT tunnels and pushes --rounds round-trips of --payload bytes
+            through each. Reports throughput, failures, peak RSS/threads and CPU per GB of the proxy process.
+            --http: many small plain-HTTP GETs instead (keep-alive unless --close), reported as req/s and latency.
+            The threaded server always dials port 80 and needs Connection: close, so it needs the origin on :80 (root).
+Usage: python -m utils.bench_proxy --tunnels 2000 --payload 65536 --rounds 4 [--impl threaded,async] [--json]
+       python -m utils.bench_proxy --tunnels 32 --payload 1048576 --rounds 50 --impl threaded,threaded-copy
+       python -m utils.bench_proxy --http --tunnels 64 --requests 500 --body 512 [--close] [--impl async]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import resource
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from core.procstats import rss_mb
+
+ROOT = Path(__file__).resolve().parent.parent
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _threaded(port: int) -> list[str]:
+    return [sys.executable, "-c", f"from utils.proxy_server import start_proxy; start_proxy({port})"]
+
+
+# name → (command for a port, extra environment)
+IMPLEMENTATIONS = {
+    "threaded": (_threaded, {}),  # os.splice relay on Linux
+    "threaded-copy": (_threaded, {"PROXY_SPLICE": "0"}),
+    "async": (lambda port: [sys.executable, "-m", "utils.async_proxy", "--port", str(port)], {}),
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _raise_fd_limit():
+    """Thousands of tunnels need ~4 fds each across client, proxy and echo; children inherit this."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def cpu_seconds(pid: int) -> float:
+    """utime + stime of a process from /proc/<pid>/stat."""
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / _CLK_TCK
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def thread_count(pid: int) -> int:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("Threads:"):
+                return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+# --- Echo target ---
+
+async def _echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while data := await reader.read(64 * 1024):
+            writer.write(data)
+            await writer.drain()
+    except OSError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _serve_echo(port: int):
+    server = await asyncio.start_server(_echo, "127.0.0.1", port, backlog=4096)
+    async with server:
+        await server.serve_forever()
+
+
+async def _serve_http_origin(port: int, body_size: int):
+    """Minimal keep-alive HTTP/1.1 origin: every request gets the same small body."""
+    response = b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: %d\r\n\r\n" % body_size
+    response += b"x" * body_size
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                writer.write(response)
+                await writer.drain()
+                if b"connection: close" in head.lower():
+                    break
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", port, backlog=4096)
+    async with server:
+        await server.serve_forever()
+
+
+def _spawn(cmd: list[str], port: int, env: dict | None = None) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        cmd, cwd=ROOT, env={**os.environ, **(env or {})}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError(f"{cmd[-1]} did not start listening on {port}")
+
+
+# --- Load generator ---
+
+async def _tunnel(proxy_port: int, echo_port: int, payload: bytes, rounds: int) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", proxy_port)
+    try:
+        writer.write(f"CONNECT 127.0.0.1:{echo_port} HTTP/1.1\r\nHost: 127.0.0.1:{echo_port}\r\n\r\n".encode())
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        if b" 200" not in head.split(b"\r\n", 1)[0]:
+            raise ConnectionError(head[:40])
+        for _ in range(rounds):
+            writer.write(payload)
+            await writer.drain()
+            await reader.readexactly(len(payload))
+        return 2 * len(payload) * rounds
+    finally:
+        writer.close()
+
+
+async def _load(proxy_pid: int, proxy_port: int, echo_port: int, args) -> dict:
+    payload = os.urandom(args.payload)
+    peak = {"rss_mb": rss_mb(proxy_pid), "threads": thread_count(proxy_pid)}
+    done = asyncio.Event()
+
+    async def sample():
+        while not done.is_set():
+            peak["rss_mb"] = max(peak["rss_mb"], rss_mb(proxy_pid))
+            peak["threads"] = max(peak["threads"], thread_count(proxy_pid))
+            await asyncio.sleep(0.1)
+
+    async def one() -> int:
+        try:
+            return await asyncio.wait_for(_tunnel(proxy_port, echo_port, payload, args.rounds), args.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return -1
+
+    sampler = asyncio.create_task(sample())
+    cpu_before = cpu_seconds(proxy_pid)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(args.tunnels)))
+    elapsed = time.perf_counter() - started
+    cpu = cpu_seconds(proxy_pid) - cpu_before
+    done.set()
+    await sampler
+
+    relayed = sum(r for r in results if r > 0)
+    gigabytes = relayed / 1e9
+    return {
+        "tunnels": args.tunnels,
+        "ok": sum(r > 0 for r in results),
+        "failed": sum(r < 0 for r in results),
+        "seconds": round(elapsed, 2),
+        "mb_per_s": round(relayed / 1e6 / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": round(peak["rss_mb"], 1),
+        "peak_threads": peak["threads"],
+        "cpu_s": round(cpu, 2),
+        "cpu_s_per_gb": round(cpu / gigabytes, 2) if gigabytes else None,
+    }
+
+
+async def _http_client(proxy_port: int, origin: str, requests: int, keep_alive: bool, latencies: list) -> int:
+    """Sequential GETs over one client connection (reopened after Connection: close); returns failures."""
+    connection = "" if keep_alive else "Connection: close\r\n"
+    request = f"GET http://{origin}/ HTTP/1.1\r\nHost: {origin}\r\n{connection}\r\n".encode()
+    conn, failed = None, 0
+    for _ in range(requests):
+        try:
+            if conn is None:
+                conn = await asyncio.open_connection("127.0.0.1", proxy_port)
+            reader, writer = conn
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = re.search(rb"content-length:\s*(\d+)", head, re.IGNORECASE)
+            if not head.startswith(b"HTTP/1.1 200") or not length:
+                raise ConnectionError(head[:40])
+            await reader.readexactly(int(length.group(1)))
+            latencies.append(time.perf_counter() - started)
+            if not keep_alive or b"connection: close" in head.lower():
+                writer.close()
+                conn = None
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            failed += 1
+            if conn:
+                conn[1].close()
+            conn = None
+    if conn:
+        conn[1].close()
+    return failed
+
+
+async def _load_http(proxy_pid: int, proxy_port: int, origin: str, args, keep_alive: bool) -> dict:
+    latencies: list[float] = []
+    peak_rss = rss_mb(proxy_pid)
+    cpu_before = cpu_seconds(proxy_pid)
+    started = time.perf_counter()
+    failures = await asyncio.gather(*(
+        asyncio.wait_for(_http_client(proxy_port, origin, args.requests, keep_alive, latencies), args.timeout)
+        for _ in range(args.tunnels)
+    ), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    cpu = cpu_seconds(proxy_pid) - cpu_before
+    peak_rss = max(peak_rss, rss_mb(proxy_pid))
+    latencies.sort()
+    failed = sum(f if isinstance(f, int) else args.requests for f in failures)
+
+    def pct(q: float) -> float | None:
+        return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 2) if latencies else None
+
+    return {
+        "connections": args.tunnels,
+        "keep_alive": keep_alive,
+        "ok": len(latencies),
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "req_per_s": round(len(latencies) / elapsed) if elapsed else 0,
+        "p50_ms": pct(0.5),
+        "p99_ms": pct(0.99),
+        "peak_rss_mb": round(peak_rss, 1),
+        "cpu_s": round(cpu, 2),
+        "cpu_ms_per_1k_req": round(cpu * 1e6 / len(latencies), 1) if latencies else None,
+    }
+
+
+def run_http_benchmark(args) -> dict:
+    _raise_fd_limit()
+    impls = args.impl.split(",")
+    # The threaded proxy ignores the port in Host and always dials :80
+    origin_port = 80 if any(name.startswith("threaded") for name in impls) else _free_port()
+    origin_cmd = [sys.executable, "-m", "utils.bench_proxy", "--http-server", str(origin_port), "--body", str(args.body)]
+    origin = _spawn(origin_cmd, origin_port)
+    host = "127.0.0.1" if origin_port == 80 else f"127.0.0.1:{origin_port}"
+    report = {}
+    try:
+        for name in impls:
+            port = _free_port()
+            command, env = IMPLEMENTATIONS[name]
+            proxy = _spawn(command(port), port, env)
+            keep_alive = not args.close and not name.startswith("threaded")  # Threaded: one response per connection
+            try:
+                report[name] = asyncio.run(_load_http(proxy.pid, port, host, args, keep_alive))
+            finally:
+                proxy.kill()
+                proxy.wait()
+    finally:
+        origin.kill()
+        origin.wait()
+    return report
+
+
+def run_benchmark(args) -> dict:
+    _raise_fd_limit()
+    echo_port = _free_port()
+    echo = _spawn([sys.executable, "-m", "utils.bench_proxy", "--echo-server", str(echo_port)], echo_port)
+    report = {}
+    try:
+        for name in args.impl.split(","):
+            port = _free_port()
+            command, env = IMPLEMENTATIONS[name]
+            proxy = _spawn(command(port), port, env)
+            try:
+                report[name] = asyncio.run(_load(proxy.pid, port, echo_port, args))
+            finally:
+                proxy.kill()
+                proxy.wait()
+    finally:
+        echo.kill()
+        echo.wait()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proxy load benchmark (threaded vs asyncio)")
+    parser.add_argument("--tunnels", type=int, default=2000, help="Concurrent CONNECT tunnels")
+    parser.add_argument("--payload", type=int, default=64 * 1024, help="Bytes per round-trip")
+    parser.add_argument("--rounds", type=int, default=4, help="Round-trips per tunnel")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-tunnel deadline, s")
+    parser.add_argument("--impl", type=str, default="threaded,async", help="Comma-separated: " + ", ".join(IMPLEMENTATIONS))
+    parser.add_argument("--http", action="store_true", help="Many small plain-HTTP requests instead of tunnels")
+    parser.add_argument("--requests", type=int, default=500, help="--http: requests per connection")
+    parser.add_argument("--body", type=int, default=512, help="--http: response body size, bytes")
+    parser.add_argument("--close", action="store_true", help="--http: Connection: close on every request")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--echo-server", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--http-server", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.echo_server:
+        asyncio.run(_serve_echo(args.echo_server))
+        return
+    if args.http_server:
+        asyncio.run(_serve_http_origin(args.http_server, args.body))
+        return
+
+    if args.http:
+        report = run_http_benchmark(args)
+        if args.json:
+            print(json.dumps(report, indent=2))
+            return
+        print(f"{args.tunnels} connections × {args.requests} GETs × {args.body} B")
+        for name, r in report.items():
+            print(
+                f"  {name:<13} {'keep-alive' if r['keep_alive'] else 'close     '}  ok {r['ok']:>7}  failed {r['failed']:>5}  "
+                f"{r['req_per_s']:>6} req/s  p50 {r['p50_ms']} ms  p99 {r['p99_ms']} ms  "
+                f"peak RSS {r['peak_rss_mb']} MB  CPU {r['cpu_ms_per_1k_req']} ms/1k req"
+            )
+        return
+
+    report = run_benchmark(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{args.tunnels} tunnels × {args.rounds} round-trips × {args.payload} B")
+    for name, r in report.items():
+        print(
+            f"  {name:<13} ok {r['ok']:>5}  failed {r['failed']:>4}  {r['mb_per_s']:>8} MB/s  "
+            f"{r['seconds']:>6}s  peak RSS {r['peak_rss_mb']:>7} MB  threads {r['peak_threads']:>5}  "
+            f"CPU {r['cpu_s']}s ({r['cpu_s_per_gb']} s/GB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
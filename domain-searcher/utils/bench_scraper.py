@@ -0,0 +1,180 @@
+"""
+End-to-end scraper benchmark against the local expireddomains.net stand-in.
+@developer: Drives the real scraper (start → login → fetch_candidates) and reports
+            pages/min, RSS and time split by phase.
+            Stealth delays are recorded on the scraper clock and reported separately;
+            --virtual-clock skips them entirely (simulated time).
+Usage: python -m utils.bench_scraper --pages 5 --latency 0.1 [--backend http] [--virtual-clock] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+
+import uvicorn
+
+from utils.fake_expireddomains import SESSION_COOKIE, SESSION_VALUE, create_app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve_fake_site(port: int, latency: float, ban_probability: float) -> tuple[uvicorn.Server, object]:
+    """Run the stand-in site on a background thread; returns (server, app)."""
+    app = create_app(latency=latency, ban_probability=ban_probability)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, app
+
+
+async def run_benchmark(args) -> dict:
+    port = _free_port()
+    server, app = serve_fake_site(port, args.latency, args.ban_probability)
+    # Must be set before core.scraper is imported: BASE_URL is resolved at import time
+    os.environ["ED_BASE_URL"] = f"http://127.0.0.1:{port}"
+
+    from core.clock import RealClock, VirtualClock
+    from core.http_scraper import HttpScraper
+    from core.procstats import process_tree_rss_mb
+    from core.proxy_manager import ProxyManager
+    from core.scraper import DomainScraper
+    from core.stealth_schedule import DelayScheduler
+
+    scraper_cls = HttpScraper if args.backend == "http" else DomainScraper
+    scraper = scraper_cls(username="bench", password="bench", headless=not args.headed)
+    scraper.proxy_manager = ProxyManager([])  # No proxy health checks against the internet
+    scraper.clock = VirtualClock() if args.virtual_clock else RealClock(record=True)
+    if args.target_rate:
+        scraper.delay_scheduler = DelayScheduler(
+            args.target_rate, profile=args.profile, planned_pages=args.pages, clock=scraper.clock
+        )
+    if args.backend == "http" or args.session:
+        scraper.storage_state = {"cookies": [{
+            "name": SESSION_COOKIE, "value": SESSION_VALUE, "domain": "127.0.0.1", "path": "/",
+        }], "origins": []}
+
+    phases = {"start": 0.0, "login": 0.0, "navigation": 0.0, "paging": 0.0}
+    peak_rss = {"self": 0.0, "children": 0.0, "total": 0.0}
+
+    def sample_rss():
+        current = process_tree_rss_mb()
+        for key, value in current.items():
+            peak_rss[key] = max(peak_rss[key], value)
+
+    # Time the home/filter/sort prelude separately from paging
+    open_listing = getattr(scraper, "_open_listing", None)
+    if open_listing:
+        async def timed_open_listing(*a, **kw):
+            t0 = time.perf_counter()
+            try:
+                return await open_listing(*a, **kw)
+            finally:
+                phases["navigation"] += time.perf_counter() - t0
+        scraper._open_listing = timed_open_listing
+
+    candidates = 0
+    try:
+        t0 = time.perf_counter()
+        await scraper.start()
+        phases["start"] = time.perf_counter() - t0
+        sample_rss()
+
+        t0 = time.perf_counter()
+        logged_in = await scraper.login()
+        phases["login"] = time.perf_counter() - t0
+        sample_rss()
+
+        t0 = time.perf_counter()
+        async for _ in scraper.fetch_candidates(target_count=10**9, start_page=args.start_page, max_pages=args.pages):
+            candidates += 1
+            sample_rss()
+        phases["paging"] = time.perf_counter() - t0 - phases["navigation"]
+        sample_rss()
+    finally:
+        await scraper.close()
+        server.should_exit = True
+
+    pages = (scraper.last_page_done - args.start_page + 1) if scraper.last_page_done else 0
+    scheduler = scraper.delay_scheduler
+    fetch_time = phases["navigation"] + phases["paging"]
+    stealth = scraper.clock.total()
+    # Virtual clock: wall time is all real work. Real clock: subtract the recorded delays
+    wall = sum(phases.values())
+    work = wall if args.virtual_clock else max(wall - stealth, 0.0)
+    return {
+        "backend": args.backend,
+        "logged_in": logged_in,
+        "pages": pages,
+        "candidates": candidates,
+        "pages_per_min": round(pages / fetch_time * 60, 2) if fetch_time else 0.0,
+        "phases_s": {k: round(v, 2) for k, v in phases.items()},
+        "stealth": {
+            "clock": "virtual" if args.virtual_clock else "real",
+            "total_s": round(stealth, 2),
+            "per_page_s": round(stealth / pages, 2) if pages else 0.0,
+            "work_s": round(work, 2),
+            "share": round(stealth / (stealth + work), 3) if stealth + work else 0.0,
+            "by_action_s": {k: round(v, 2) for k, v in scraper.clock.by_label().items()},
+        },
+        "schedule": {
+            "profile": scheduler.profile.name,
+            "target_pages_per_hour": scheduler.target_pages_per_hour,
+            "achieved_pages_per_hour": round(scheduler.achieved_pages_per_hour(), 1),
+        } if scheduler else None,
+        "peak_rss_mb": peak_rss,
+        "resources": scraper.resource_stats,
+        "site": dict(app.state.stats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a local expireddomains stand-in")
+    parser.add_argument("--backend", choices=["browser", "http"], default="browser")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--start-page", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument("--ban-probability", type=float, default=0.0)
+    parser.add_argument("--session", action="store_true", help="Inject a valid session instead of typing the login")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--virtual-clock", action="store_true", help="Run stealth delays on simulated time")
+    parser.add_argument("--target-rate", type=float, default=0.0, help="Plan delays for N pages/hour (0 = legacy waits)")
+    parser.add_argument("--profile", choices=["cautious", "balanced", "fast"], default="balanced")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n📊 Benchmark ({report['backend']}): {report['pages']} pages, {report['candidates']} candidates")
+    print(f"   Pages/min:  {report['pages_per_min']}")
+    for phase, seconds in report["phases_s"].items():
+        print(f"   {phase:<11} {seconds:>8.2f}s")
+    stealth = report["stealth"]
+    print(f"   Stealth:    {stealth['total_s']}s ({stealth['clock']} clock), {stealth['per_page_s']}s/page, "
+          f"{stealth['share']:.0%} of run; real work {stealth['work_s']}s")
+    for action, seconds in list(stealth["by_action_s"].items())[:6]:
+        print(f"      {seconds:>8.2f}s  {action}")
+    if report["schedule"]:
+        sched = report["schedule"]
+        print(f"   Schedule:   {sched['profile']} → {sched['achieved_pages_per_hour']} of {sched['target_pages_per_hour']} pages/h")
+    rss = report["peak_rss_mb"]
+    print(f"   Peak RSS:   {rss['total']} MB (python {rss['self']} MB + browser {rss['children']} MB)")
+    res = report["resources"]
+    print(f"   Contexts:   {res['recycles']} recycles, peak JS heap {res['peak_js_heap_mb']} MB, "
+          f"browser RSS {res['peak_browser_rss_mb']} MB")
+    print(f"   Site:       {report['site']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Local stand-in for member.expireddomains.net (benchmarks and end-to-end runs).
+@developer: Mimics login, the Deleted .com listing, the filter form, BL sort links,
+            `a.next` pagination and ban pages, with configurable latency and ban probability.
+            /health and /ip (egress IP echo) serve as local proxy-check targets.
+Usage: python -m utils.fake_expireddomains --port 8765 --latency 0.2 --ban-probability 0.01
+"""
+
+import argparse
+import asyncio
+import html
+import random
+from datetime import datetime
+from urllib.parse import parse_qs, urlencode
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse
+
+SESSION_COOKIE = "ExpiredDomainssessid"
+SESSION_VALUE = "fake-session"
+PAGE_SIZE = 25
+
+_SYLLABLES = [
+    "nova", "blue", "tech", "sun", "river", "pixel", "cloud", "green", "data", "smart",
+    "urban", "alpha", "north", "bright", "stone", "swift", "maple", "echo", "prime", "lumen",
+    "casino", "bet", "vape", "deal",  # Some rows the local stop-word filter must drop
+]
+
+
+def generate_domains(count: int, seed: int = 0) -> list[dict]:
+    """Deterministic fake listing: name, BL and Whois birth year."""
+    rng = random.Random(seed)
+    year = datetime.utcnow().year
+    domains, seen = [], set()
+    while len(domains) < count:
+        name = "".join(rng.sample(_SYLLABLES, rng.randint(2, 3))) + f"{rng.randint(0, 99) if rng.random() < 0.3 else ''}.com"
+        if name in seen:
+            continue
+        seen.add(name)
+        domains.append({
+            "name": name,
+            "bl": int(rng.paretovariate(1.2) * 3),
+            "abirth": rng.choice([rng.randint(1995, year), 0]),
+        })
+    return domains
+
+
+def _page(title: str, body: str, logged_in: bool) -> str:
+    auth_link = '<a href="/logout/">Logout</a>' if logged_in else '<a href="/login/">Login</a>'
+    return f"""<!DOCTYPE html><html><head><title>{title}</title></head><body>
+<nav><a href="/">Home</a> <a href="/domains/expiredcom/">Deleted .com</a> {auth_link}</nav>
+{body}
+</body></html>"""
+
+
+def create_app(latency: float = 0.0, ban_probability: float = 0.0, total_domains: int = 2500, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="Fake expireddomains.net")
+    domains = generate_domains(total_domains, seed)
+    rng = random.Random(seed + 1)
+    stats = {"requests": 0, "listing_pages": 0, "bans": 0}
+    app.state.stats = stats
+
+    @app.middleware("http")
+    async def slow_network(request: Request, call_next):
+        stats["requests"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        return await call_next(request)
+
+    def logged_in(request: Request) -> bool:
+        return request.cookies.get(SESSION_COOKIE) == SESSION_VALUE
+
+    @app.get("/", response_class=HTMLResponse)
+    async def home(request: Request):
+        return _page("Home", "<h1>Expired Domains</h1>", logged_in(request))
+
+    @app.get("/login/", response_class=HTMLResponse)
+    async def login_form(request: Request):
+        form = """<form method="post" action="/login/">
+<input name="username"> <input name="password" type="password">
+<button type="submit">Login</button></form>"""
+        return _page("Login", form, logged_in(request))
+
+    @app.post("/login/")
+    async def login(request: Request):
+        form = parse_qs((await request.body()).decode("utf-8"))
+        resp = RedirectResponse("/", status_code=302)
+        if form.get("username") and form.get("password"):
+            resp.set_cookie(SESSION_COOKIE, SESSION_VALUE)
+        return resp
+
+    @app.get("/logout/")
+    async def logout():
+        resp = RedirectResponse("/", status_code=302)
+        resp.delete_cookie(SESSION_COOKIE)
+        return resp
+
+    @app.get("/health", response_class=PlainTextResponse)
+    async def health():
+        return "ok"
+
+    @app.get("/ip", response_class=PlainTextResponse)
+    async def echo_ip(request: Request):
+        """Egress IP of the caller (stand-in for api.ipify.org)."""
+        return request.client.host if request.client else ""
+
+    @app.get("/domains/expiredcom/", response_class=HTMLResponse)
+    async def listing(request: Request):
+        if not logged_in(request):
+            return RedirectResponse("/login/", status_code=302)
+        if ban_probability and rng.random() < ban_probability:
+            stats["bans"] += 1
+            return HTMLResponse(_page("Blocked", "<h1>Your IP address is blocked</h1>", True), status_code=403)
+        stats["listing_pages"] += 1
+
+        q = request.query_params
+        rows = _apply_filters(domains, q)
+        if q.get("o") == "bl":
+            rows = sorted(rows, key=lambda d: d["bl"], reverse=q.get("r", "d") == "d")
+
+        start = int(q.get("start", "0") or 0)
+        page_rows = rows[start:start + PAGE_SIZE]
+        keep = [(k, v) for k, v in q.multi_items() if k != "start"]
+        sort_query = urlencode([(k, v) for k, v in keep if k not in ("o", "r")] + [("o", "bl"), ("r", "d")])
+        next_link = ""
+        if start + PAGE_SIZE < len(rows):
+            next_query = urlencode(keep + [("start", start + PAGE_SIZE)])
+            next_link = f'<a class="next" href="/domains/expiredcom/?{next_query}#listing">Next Page &raquo;</a>'
+
+        body = _filter_form(q) + f"""
+<table id="listing"><thead><tr>
+<th class="field_domain">Domain</th>
+<th class="field_bl"><a href="/domains/expiredcom/?{sort_query}#listing">BL</a></th>
+<th class="field_abirth">ABY</th></tr></thead><tbody>
+{"".join(_row(d) for d in page_rows)}
+</tbody></table>
+<div class="pagescroll">{next_link}</div>"""
+        return _page("Deleted .com Domains", body, True)
+
+    return app
+
+
+def _apply_filters(domains: list[dict], q) -> list[dict]:
+    rows = domains
+    max_birth = q.get("fwhoisage", "")
+    if max_birth.isdigit():
+        rows = [d for d in rows if d["abirth"] and d["abirth"] <= int(max_birth)]
+    min_bl = q.get("fbl", "")
+    if min_bl.isdigit():
+        rows = [d for d in rows if d["bl"] >= int(min_bl)]
+    max_len = q.get("fmaxlength", "")
+    if max_len.isdigit():
+        rows = [d for d in rows if len(d["name"].split(".")[0]) <= int(max_len)]
+    words = q.get("fnotcontains", "").split()
+    if words:
+        rows = [d for d in rows if not any(w in d["name"] for w in words)]
+    return rows
+
+
+def _filter_form(q) -> str:
+    year = datetime.utcnow().year
+    options = "".join(
+        f'<option value="{y}">{y} ({year - y} Years)</option>' for y in range(year - 1, 1994, -1)
+    )
+    value = lambda name: html.escape(q.get(name, ""), quote=True)
+    return f"""<a class="showfilter" href="#">Show Filter</a>
+<form method="get" action="/domains/expiredcom/">
+<select id="fwhoisage" name="fwhoisage"><option value="">Any</option>{options}</select>
+<input name="fbl" value="{value('fbl')}"> <input name="fmaxlength" value="{value('fmaxlength')}">
+<input name="fnotcontains" value="{value('fnotcontains')}">
+<input type="submit" name="button_submit" value="Apply Filter"></form>"""
+
+
+def _row(d: dict) -> str:
+    return (
+        f'<tr><td class="field_domain"><a class="namelinks" href="#">{d["name"]}</a></td>'
+        f'<td class="field_bl"><a href="#">{d["bl"]:,}</a></td>'
+        f'<td class="field_abirth">{d["abirth"] or "-"}</td></tr>'
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local stand-in for expireddomains.net")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--ban-probability", type=float, default=0.0, help="Chance a listing page is a ban page")
+    parser.add_argument("--domains", type=int, default=2500)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.ban_probability, args.domains), host="127.0.0.1", port=args.port)
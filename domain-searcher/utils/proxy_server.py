@@ -1,7 +1,70 @@
+import errno
+import os
 import socket
 import threading
 import select
 
+RELAY_CHUNK = 64 * 1024
+# Linux: move tunnel bytes socket -> pipe -> socket inside the kernel (PROXY_SPLICE=0 disables)
+USE_SPLICE = hasattr(os, 'splice') and os.getenv('PROXY_SPLICE', '1') != '0'
+SPLICE_FLAGS = getattr(os, 'SPLICE_F_MOVE', 0)
+
+
+class SpliceUnsupported(Exception):
+    pass
+
+
+def _splice_relay(client_socket, remote_socket):
+    # One pipe per direction so a half-drained pipe never mixes streams
+    pipes = {client_socket: os.pipe(), remote_socket: os.pipe()}
+    peers = {client_socket: remote_socket, remote_socket: client_socket}
+    moved = False
+    try:
+        while True:
+            readable, _, _ = select.select(list(peers), [], [])
+            for s in readable:
+                pipe_r, pipe_w = pipes[s]
+                try:
+                    n = os.splice(s.fileno(), pipe_w, RELAY_CHUNK, flags=SPLICE_FLAGS)
+                except OSError as e:
+                    if not moved and e.errno in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+                        raise SpliceUnsupported() from e
+                    raise
+                if not n:
+                    return
+                moved = True
+                while n:
+                    n -= os.splice(pipe_r, peers[s].fileno(), n, flags=SPLICE_FLAGS)
+    finally:
+        for pipe_r, pipe_w in pipes.values():
+            os.close(pipe_r)
+            os.close(pipe_w)
+
+
+def _copy_relay(client_socket, remote_socket):
+    # Portable path: one reusable buffer, no per-chunk bytes objects
+    buffer = bytearray(RELAY_CHUNK)
+    view = memoryview(buffer)
+    peers = {client_socket: remote_socket, remote_socket: client_socket}
+    while True:
+        readable, _, _ = select.select(list(peers), [], [])
+        for s in readable:
+            n = s.recv_into(buffer)
+            if not n:
+                return
+            peers[s].sendall(view[:n])
+
+
+def relay(client_socket, remote_socket):
+    """Forward data bidirectionally until either side closes."""
+    if USE_SPLICE:
+        try:
+            return _splice_relay(client_socket, remote_socket)
+        except SpliceUnsupported:
+            pass
+    _copy_relay(client_socket, remote_socket)
+
+
 def handle_client(client_socket):
     try:
         request = client_socket.recv(4096)
@@ -28,17 +91,8 @@ def handle_client(client_socket):
             client_socket.send(b'HTTP/1.1 200 Connection Established\r\n\r\n')
             
             # Forward data bidirectionally
-            sockets = [client_socket, remote_socket]
-            while True:
-                readable, _, _ = select.select(sockets, [], [])
-                for s in readable:
-                    data = s.recv(4096)
-                    if not data:
-                        return
-                    if s is client_socket:
-                        remote_socket.send(data)
-                    else:
-                        client_socket.send(data)
+            relay(client_socket, remote_socket)
+            remote_socket.close()
         else:
             # Simple HTTP Proxy (Forwarding)
             # Find Host header
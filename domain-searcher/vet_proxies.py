@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import base64
+import ssl
+import time
+from datetime import datetime
+from urllib.parse import quote, unquote, urlsplit
+
+import httpx
+
+from core.proxy_manager import split_proxy_line
+
+SUPPORTED_SCHEMES = {"http", "https", "socks5", "socks5h"}
+
+
+def normalize_proxy(line: str) -> str | None:
+    """
+    One list line → scheme://[user:pass@]host:port, or None if unusable.
+    Accepts URLs, host:port, user:pass@host:port and the host:port:user:pass export format.
+    Credentials are percent-encoded, so a '#' or '@' in a password survives URL parsing.
+    """
+    line = split_proxy_line(line)[0]
+    if not line:
+        return None
+    scheme, sep, rest = line.partition("://")
+    if not sep:
+        scheme, rest = "http", line
+        parts = rest.split(":")
+        if len(parts) == 4 and "@" not in rest:
+            host, port, user, password = parts
+            rest = f"{user}:{password}@{host}:{port}"
+    userinfo, _, hostport = rest.rpartition("@")
+    if userinfo:
+        user, has_password, password = userinfo.partition(":")
+        userinfo = quote(unquote(user), safe="")
+        if has_password:
+            userinfo += ":" + quote(unquote(password), safe="")
+        userinfo += "@"
+    try:
+        parts = urlsplit(f"{scheme}://{hostport}")
+        scheme, host, port = parts.scheme.lower(), parts.hostname, parts.port
+    except ValueError:
+        return None
+    if scheme not in SUPPORTED_SCHEMES or not host or not port:
+        return None
+    host = f"[{host}]" if ":" in host else host
+    return f"{scheme}://{userinfo}{host}:{port}"
+
+
+def iter_proxies(path: str):
+    """Stream normalized, deduplicated proxies from a (possibly huge) list."""
+    seen = set()
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            proxy = normalize_proxy(line)
+            if proxy and proxy not in seen:
+                seen.add(proxy)
+                yield proxy
+
+
+def _proxy_auth_header(parts) -> str:
+    if not parts.username:
+        return ""
+    token = base64.b64encode(f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode()).decode()
+    return f"Proxy-Authorization: Basic {token}\r\n"
+
+
+async def probe(proxy: str, args, ssl_context: ssl.SSLContext) -> dict:
+    """Connect time (incl. TLS to an https:// proxy), TLS-through-CONNECT time and egress IP of one proxy."""
+    result = {"proxy": proxy, "ok": False, "connect_ms": None, "tls_ms": None, "echo_ms": None, "ip": None, "error": ""}
+    parts = urlsplit(proxy)
+
+    started = time.perf_counter()
+    try:
+        # https:// proxies speak TLS themselves: CONNECT goes inside that session
+        proxy_tls = {"ssl": ssl_context, "server_hostname": parts.hostname} if parts.scheme == "https" else {}
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, parts.port, **proxy_tls), args.connect_timeout
+        )
+    except (OSError, ssl.SSLError, asyncio.TimeoutError) as e:
+        result["error"] = f"connect: {type(e).__name__}"
+        return result
+    result["connect_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    try:
+        if args.tls_target and parts.scheme in ("http", "https"):
+            host, port = args.tls_target.rsplit(":", 1)
+            started = time.perf_counter()
+            writer.write(f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n{_proxy_auth_header(parts)}\r\n".encode())
+            await writer.drain()
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), args.timeout)
+            status = head.split(b"\r\n", 1)[0]
+            if b" 200" not in status:
+                result["error"] = f"tunnel: {status.decode(errors='replace')[:60]}"
+                return result
+            await asyncio.wait_for(writer.start_tls(ssl_context, server_hostname=host), args.timeout)
+            result["tls_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    except (OSError, ssl.SSLError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+        result["error"] = f"tls: {type(e).__name__}"
+        return result
+    finally:
+        writer.close()
+
+    try:
+        started = time.perf_counter()
+        async with httpx.AsyncClient(proxy=proxy, timeout=args.timeout) as client:
+            resp = await client.get(args.echo_url)
+        result["echo_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if resp.status_code != 200:
+            result["error"] = f"echo: HTTP {resp.status_code}"
+            return result
+        result["ip"] = resp.text.strip()[:45]
+    except Exception as e:
+        result["error"] = f"echo: {type(e).__name__}"
+        return result
+
+    result["ok"] = True
+    return result
+
+
+def score(result: dict) -> float:
+    """Seconds spent on connect + TLS + echo; lower is better (loaded as the initial latency)."""
+    return round(sum(result[k] or 0 for k in ("connect_ms", "tls_ms", "echo_ms")) / 1000, 3)
+
+
+async def vet(args) -> list[dict]:
+    ssl_context = ssl.create_default_context()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 2)
+    results: list[dict] = []
+    counters = {"done": 0, "ok": 0}
+
+    async def worker():
+        while True:
+            proxy = await queue.get()
+            try:
+                if proxy is None:
+                    return
+                result = await probe(proxy, args, ssl_context)
+                results.append(result)
+                counters["done"] += 1
+                counters["ok"] += result["ok"]
+                if counters["done"] % 500 == 0:
+                    print(f"   … проверено {counters['done']}, рабочих {counters['ok']}")
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(args.concurrency)]
+    for proxy in iter_proxies(args.input):
+        await queue.put(proxy)
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+    return results
+
+
+def write_output(path: str, results: list[dict], unique_ip: bool):
+    """Working proxies sorted by score, one per line with an inline '# score=...' note."""
+    good = sorted((r for r in results if r["ok"]), key=score)
+    seen_ips = set()
+    lines = []
+    for r in good:
+        if unique_ip and r["ip"] in seen_ips:
+            continue
+        seen_ips.add(r["ip"])
+        lines.append(
+            f"{r['proxy']}  # score={score(r)} connect_ms={r['connect_ms']} tls_ms={r['tls_ms']} "
+            f"echo_ms={r['echo_ms']} ip={r['ip']}"
+        )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# vet_proxies {datetime.now():%Y-%m-%d %H:%M} — {len(lines)} of {len(results)} passed\n")
+        f.write("\n".join(lines) + ("\n" if lines else ""))
+    return len(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Массовая проверка списка прокси: дедупликация, скорость, TLS и внешний IP.")
+    parser.add_argument("input", type=str, help="Файл со списком прокси (любого размера)")
+    parser.add_argument("-o", "--output", type=str, default="proxies.vetted.txt", help="Куда записать отсортированный список (формат proxies.txt)")
+    parser.add_argument("--concurrency", type=int, default=200, help="Одновременных проверок")
+    parser.add_argument("--connect-timeout", type=float, default=3.0, help="Таймаут TCP-подключения, с")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Таймаут TLS и запроса эха, с")
+    parser.add_argument("--tls-target", type=str, default="www.google.com:443", help="host:port для проверки TLS через CONNECT ('' — пропустить)")
+    parser.add_argument("--echo-url", type=str, default="https://api.ipify.org", help="Эхо внешнего IP (локально: http://127.0.0.1:8765/ip)")
+    parser.add_argument("--unique-ip", action="store_true", help="Оставить по одному прокси на каждый внешний IP")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = asyncio.run(vet(args))
+    if not results:
+        print("⚠️ Список пуст или не содержит корректных прокси.")
+        return
+    kept = write_output(args.output, results, args.unique_ip)
+
+    errors: dict[str, int] = {}
+    for r in results:
+        if not r["ok"]:
+            kind = r["error"].split(":", 1)[0]
+            errors[kind] = errors.get(kind, 0) + 1
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(results)} уникальных прокси проверено за {elapsed:.1f}s, в {args.output} записано {kept}")
+    if errors:
+        print("   Ошибки: " + ", ".join(f"{k}={v}" for k, v in sorted(errors.items())))
+
+
+if __name__ == "__main__":
+    main()